@@ -1,28 +1,322 @@
+import base64
+import re
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.utils import quote
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.models import Group, User
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.functional import cached_property
 
 from credentials.models import Credential
 from profiles.models import Profile
 
+# Query string parameter carrying the last primary key of the previous page.
+KEYSET_VAR = "after"
+
+# Characters of a blob shown in changelists.
+PREVIEW_LENGTH = 16
+
+BASE64_PREFIX = re.compile(r"[A-Za-z0-9+/]+")
+
+
+def encode_base64(value):
+    """Render stored bytes as base64 text."""
+    if value is None:
+        return None
+    return base64.b64encode(value).decode("ascii")
+
+
+def preview(text):
+    """Truncate ``text`` for display in a changelist."""
+    if text is None or len(text) <= PREVIEW_LENGTH:
+        return text
+    return f"{text[:PREVIEW_LENGTH]}…"
+
+
+def key_range(prefix, size):
+    """Range of the ``size``-byte keys whose base64 starts with ``prefix``.
+
+    A full key yields the range of that key alone.
+
+    Returns:
+        tuple | None: The ``(low, high)`` bounds, ``high`` being None when
+        unbounded, or None if no key can match.
+    """
+    prefix = prefix.rstrip("=")
+    if not BASE64_PREFIX.fullmatch(prefix):
+        return None
+    padding = -len(prefix) % 4
+    value = int.from_bytes(
+        base64.b64decode(prefix + "A" * padding), "big"
+    ) >> (6 * padding)
+    bits = 6 * len(prefix)
+    excess = bits - 8 * size
+    if excess > 0:
+        # Only the padding bits of a full key may be left over.
+        if excess >= 6 or value & ((1 << excess) - 1):
+            return None
+        value >>= excess
+        bits -= excess
+    shift = 8 * size - bits
+    low = value << shift
+    high = (value + 1) << shift
+    return (
+        low.to_bytes(size, "big"),
+        high.to_bytes(size, "big") if high < 1 << (8 * size) else None,
+    )
+
+
+def estimate_count(queryset):
+    """Planner estimate of the number of rows of the table of ``queryset``.
+
+    Returns:
+        int | None: The estimate, or None where the database keeps none.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == "postgresql":
+        # The partitions of a partitioned table hold its rows and statistics.
+        sql = (
+            "SELECT CASE WHEN MIN(reltuples) >= 0 THEN SUM(reltuples) END "
+            "FROM pg_class WHERE relkind = 'r' AND (oid = to_regclass(%s) "
+            "OR oid IN (SELECT inhrelid FROM pg_inherits "
+            "WHERE inhparent = to_regclass(%s)))"
+        )
+    elif connection.vendor == "mysql":
+        sql = (
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s"
+        )
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table] * sql.count("%s"))
+        row = cursor.fetchone()
+    # PostgreSQL reports -1 for tables never analyzed.
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Count unfiltered tables from the planner statistics.
+
+    ``COUNT(*)`` reads the whole table; tables estimated below
+    ``ADMIN_EXACT_COUNT_LIMIT`` rows and filtered results are still counted.
+    """
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= settings.ADMIN_EXACT_COUNT_LIMIT:
+                self.estimated = True
+                return estimate
+        return self.object_list.count()
+
+
+class KeysetChangeList(ChangeList):
+    """Page through rows in primary key order without ``OFFSET``.
+
+    The next page link carries the last key of the page, so deep pages are
+    an index seek rather than a scan of every row before them.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.after = None
+        if KEYSET_VAR in request.GET:
+            try:
+                self.after = args[0]._meta.pk.to_python(request.GET[KEYSET_VAR])
+            except (ValidationError, ValueError):
+                raise IncorrectLookupParameters
+        super().__init__(request, *args, **kwargs)
+        # Searching starts over from the first page.
+        self.params.pop(KEYSET_VAR, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(KEYSET_VAR, None)
+        return lookup_params
+
+    def get_ordering(self, request, queryset):
+        return ["pk"]
+
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).defer(
+            *self.model_admin.list_deferred
+        )
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        queryset = self.queryset
+        if self.after is not None:
+            queryset = queryset.filter(pk__gt=self.after)
+        # The extra row tells whether there is a next page.
+        rows = list(queryset[:self.list_per_page + 1])
+        self.result_list = rows[:self.list_per_page]
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.can_show_all = False
+        self.multi_page = self.after is not None or len(rows) > self.list_per_page
+        self.paginator = paginator
+        self.first_page_url = (
+            self.get_query_string(remove=[KEYSET_VAR])
+            if self.after is not None
+            else None
+        )
+        self.next_page_url = (
+            self.get_query_string({
+                KEYSET_VAR: self.opts.pk.value_to_string(self.result_list[-1]),
+            })
+            if len(rows) > self.list_per_page
+            else None
+        )
+
+
+class Base64ChangeList(KeysetChangeList):
+    """Link rows by their base64 primary key, which ``BinaryField`` parses."""
+
+    def url_for_result(self, result):
+        return reverse(
+            f"admin:{self.opts.app_label}_{self.opts.model_name}_change",
+            args=(quote(encode_base64(result.pk)),),
+            current_app=self.model_admin.admin_site.name,
+        )
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelists that stay fast on tables of millions of rows.
+
+    Rows are listed in primary key order only, paged by key and counted
+    from the planner statistics. ``search_fields`` name indexed binary keys,
+    searched by base64 prefix as index ranges; ``list_deferred`` names the
+    blob columns left out of the changelist query.
+    """
+
+    change_list_template = "admin/keyset_change_list.html"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    sortable_by = ()
+    list_deferred = ()
+    search_help_text = "Base64 key or its prefix."
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        condition = Q()
+        for name in self.search_fields:
+            field = self.model._meta.get_field(name)
+            bounds = key_range(
+                search_term, getattr(field, "target_field", field).max_length
+            )
+            if bounds is None:
+                continue
+            low, high = bounds
+            match = Q(**{f"{field.attname}__gte": low})
+            if high is not None:
+                match &= Q(**{f"{field.attname}__lt": high})
+            condition |= match
+        if not condition:
+            return queryset.none(), False
+        return queryset.filter(condition), False
+
 
 @admin.register(Profile)
-class ProfileAdmin(admin.ModelAdmin):
-    list_filter = (
-        "public_key",
-        "services",
+class ProfileAdmin(LargeTableAdmin):
+    list_display = (
+        "encoded_public_key",
+        "services_size",
+        "services_version",
+        "pending_patches",
+    )
+    list_deferred = ("services",)
+    search_fields = ("public_key",)
+    # Bulk actions post the selected primary keys as text, which raw keys
+    # are not; profiles are deleted one at a time from their change form.
+    actions = None
+    # Services are encrypted and versioned for delta sync: an edit here would
+    # bypass both, so the change form only shows them.
+    exclude = ("services",)
+    readonly_fields = (
+        "encoded_public_key",
+        "services_preview",
+        "services_hash",
+        "services_version",
+        "snapshot_version",
+        "services_size",
     )
-    ordering = ("public_key",)
+
+    def get_changelist(self, request, **kwargs):
+        return Base64ChangeList
+
+    def has_add_permission(self, request):
+        # Profiles are created through the API, by their owner's key.
+        return False
+
+    @admin.display(description="Public key")
+    def encoded_public_key(self, obj):
+        return encode_base64(obj.public_key)
+
+    @admin.display(description="Pending patches")
+    def pending_patches(self, obj):
+        return obj.pending_patches
+
+    @admin.display(description="Services")
+    def services_preview(self, obj):
+        return preview(obj.services)
 
 
 @admin.register(Credential)
-class CredentialAdmin(admin.ModelAdmin):
+class CredentialAdmin(LargeTableAdmin):
     list_display = (
-        "profile",
-        "pin",
-        "protector",
-        "entropy",
+        "encoded_profile",
+        "encoded_pin",
+        "encoded_protector",
+        "encoded_entropy",
+        "last_used_at",
     )
-    ordering = ("profile",)
+    search_fields = ("profile", "protector")
+    search_help_text = "Base64 public key or protector, or their prefix."
+    # A select of every profile would not render; credentials are created
+    # through the API, with their keys, and only shown here.
+    exclude = ("profile",)
+    readonly_fields = ("encoded_profile",)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description="Profile")
+    def encoded_profile(self, obj):
+        return encode_base64(obj.profile_id)
+
+    @admin.display(description="Pin")
+    def encoded_pin(self, obj):
+        return preview(encode_base64(obj.pin))
+
+    @admin.display(description="Protector")
+    def encoded_protector(self, obj):
+        return encode_base64(obj.protector)
+
+    @admin.display(description="Entropy")
+    def encoded_entropy(self, obj):
+        return preview(encode_base64(obj.entropy))
 
 
 admin.site.unregister(Group)
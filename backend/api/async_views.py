@@ -0,0 +1,313 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from credentials.models import Credential
+from profiles.cache import ainvalidate_profile, aprofile_exists
+from profiles.models import Profile
+
+from .metrics import observe_phase, record_api_exception
+from .verify_keys import get_verify_key
+from .views import (AuthConfig, CredentialMixin, HttpMethod, ServicesMixin,
+                    etag_matches, require_auth_headers)
+
+
+@observe_phase("serialize")
+def json_response(data, **kwargs):
+    """Render ``data`` like DRF's JSONRenderer does."""
+    kwargs.setdefault("json_dumps_params", {"separators": (",", ":")})
+    return JsonResponse(data, safe=False, **kwargs)
+
+
+class AsyncAPIMixin:
+    """Async counterpart of the DRF plumbing used by the sync views.
+
+    Enforces allowed methods and renders ``APIException`` the way DRF does,
+    while body decoding and signature checks run in a thread pool and the
+    ORM is used through its async API.
+    """
+
+    allowed_methods = [
+        HttpMethod.GET.value,
+        HttpMethod.POST.value,
+        HttpMethod.DELETE.value,
+    ]
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Enforce allowed methods and convert API errors to responses."""
+        if request.method not in self.allowed_methods:
+            return HttpResponse(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            record_api_exception(exc)
+            detail = exc.detail
+            if not isinstance(detail, (list, dict)):
+                detail = {"detail": detail}
+            response = json_response(detail, status=exc.status_code)
+            if getattr(exc, "wait", None):
+                response["Retry-After"] = "%d" % exc.wait
+            return response
+
+    async def aread_body(self, request, max_size):
+        """Read and decode the request body in a worker thread.
+
+        Decompressing and decoding a large body would otherwise block the
+        event loop; the ASGI handler has already spooled the body.
+        """
+        return await sync_to_async(self.read_body, thread_sensitive=False)(
+            request, max_size
+        )
+
+    async def averify_signature(self, verify_key, message, signature=None):
+        """Verify a cryptographic signature in a worker thread."""
+        await sync_to_async(self.verify_signature, thread_sensitive=False)(
+            verify_key, message, signature
+        )
+
+
+class AsyncCredentialView(AsyncAPIMixin, CredentialMixin, View):
+    """Async API view for managing credentials."""
+
+    @require_auth_headers([
+        AuthConfig.PUBLIC_KEY_HEADER,
+        AuthConfig.HASHED_PIN_HEADER,
+        AuthConfig.PROTECTOR_HEADER,
+        AuthConfig.TIMESTAMP_HEADER,
+    ])
+    async def get(self, request):
+        """Handle GET request to retrieve credential entropy."""
+        auth_data = request.auth_data
+        public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
+        hashed_pin = auth_data[AuthConfig.HASHED_PIN_HEADER]
+        protector = auth_data[AuthConfig.PROTECTOR_HEADER]
+        await self.acheck_rate_limit(public_key, protector)
+
+        credential = await self._credential_queryset(
+            public_key, protector, hashed_pin
+        ).live().afirst()
+        if await self.arecord_unlock(
+            public_key, protector, credential is not None
+        ):
+            await self._credential_queryset(public_key, protector).adelete()
+        if not credential:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        now = timezone.now()
+        if credential.touch_due(now):
+            await Credential.objects.filter(
+                profile_id=credential.profile_id, pk=credential.pk
+            ).aupdate(last_used_at=now)
+
+        return json_response(self.encode_entropy(credential.entropy))
+
+    @require_auth_headers([
+        AuthConfig.PUBLIC_KEY_HEADER,
+        AuthConfig.HASHED_PIN_HEADER,
+    ])
+    async def post(self, request):
+        """Handle POST request to create a credential."""
+        auth_data = request.auth_data
+        public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
+        hashed_pin = auth_data[AuthConfig.HASHED_PIN_HEADER]
+        body = await self.aread_body(request, AuthConfig.MAX_ENTROPY_SIZE)
+
+        timestamp = body[64:68]
+        entropy = body[68:]
+
+        self.validate_timestamp(timestamp)
+        await self.averify_signature(get_verify_key(public_key), body)
+
+        if not await aprofile_exists(public_key):
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        # The row lock needs a transaction, which the async ORM cannot open.
+        protector = await sync_to_async(self._rotate_credential)(
+            public_key, hashed_pin, entropy
+        )
+        if not protector:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        return json_response(protector)
+
+    @require_auth_headers([
+        AuthConfig.PUBLIC_KEY_HEADER,
+        AuthConfig.PROTECTOR_HEADER,
+        AuthConfig.TIMESTAMP_HEADER,
+    ])
+    async def delete(self, request):
+        """Handle DELETE request to remove a credential without requiring hashed_pin."""
+        auth_data = request.auth_data
+        public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
+        protector = auth_data[AuthConfig.PROTECTOR_HEADER]
+
+        deleted, _ = await self._credential_queryset(
+            public_key, protector
+        ).adelete()
+        if not deleted:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        return HttpResponse(status=status.HTTP_200_OK)
+
+
+class AsyncCredentialBatchView(AsyncAPIMixin, CredentialMixin, View):
+    """Async API view for applying many credential operations in one request."""
+
+    allowed_methods = [
+        HttpMethod.POST.value,
+    ]
+
+    @require_auth_headers([AuthConfig.PUBLIC_KEY_HEADER])
+    async def post(self, request):
+        """Handle POST request with a signed list of credential operations."""
+        auth_data = request.auth_data
+        public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
+        body = await self.aread_body(request, AuthConfig.MAX_BATCH_SIZE)
+
+        timestamp = body[64:68]
+
+        self.validate_timestamp(timestamp)
+        await self.averify_signature(get_verify_key(public_key), body)
+        operations = self._parse_batch(body[68:])
+
+        results = await sync_to_async(self._apply_batch)(public_key, operations)
+        if results is None:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        return json_response(results)
+
+
+class AsyncProfileView(AsyncAPIMixin, ServicesMixin, View):
+    """Async API view for managing profiles."""
+
+    allowed_methods = [
+        HttpMethod.GET.value,
+        HttpMethod.POST.value,
+        HttpMethod.PATCH.value,
+        HttpMethod.DELETE.value,
+    ]
+
+    async def _aget_profile(self, public_key, *fields):
+        """Retrieve a profile by public key, optionally loading only ``fields``."""
+        if not await aprofile_exists(public_key):
+            return None
+        profiles = Profile.objects.filter(public_key=public_key)
+        if fields:
+            profiles = profiles.only(*fields)
+        profile = await profiles.afirst()
+        if not profile:
+            await ainvalidate_profile(public_key)
+        return profile
+
+    @require_auth_headers([
+        AuthConfig.PUBLIC_KEY_HEADER,
+        AuthConfig.TIMESTAMP_HEADER,
+        AuthConfig.SIGNATURE_HEADER,
+    ], verify_signature=True)
+    async def get(self, request):
+        """Handle GET request to retrieve profile services."""
+        auth_data = request.auth_data
+        public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
+        if_none_match = request.headers.get("If-None-Match")
+        since = self.get_since(request)
+
+        if if_none_match:
+            profile = await self._aget_profile(public_key, *self.VERSION_FIELDS)
+            if not profile:
+                return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+            etag = f'"{profile.services_hash}"'
+            if profile.services_hash and etag_matches(if_none_match, etag):
+                return HttpResponse(
+                    headers={"ETag": etag},
+                    status=status.HTTP_304_NOT_MODIFIED,
+                )
+
+        # Patches may have to be applied or re-read; keep that off the loop.
+        if since is None:
+            profile, data = await sync_to_async(self._get_services)(public_key)
+        else:
+            profile, data = await sync_to_async(self._get_services_delta)(
+                public_key, since
+            )
+        if not profile:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        if not profile.services_hash:
+            return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+        return json_response(
+            data, headers={"ETag": f'"{profile.services_hash}"'}
+        )
+
+    @require_auth_headers([AuthConfig.PUBLIC_KEY_HEADER])
+    async def post(self, request):
+        """Handle POST request to replace profile services."""
+        auth_data = request.auth_data
+        public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
+        body = await self.aread_body(request, settings.PROFILE_SERVICES_MAX_SIZE)
+
+        timestamp = body[64:68]
+        services = memoryview(body)[68:]
+
+        self.validate_timestamp(timestamp)
+        await self.averify_signature(get_verify_key(public_key), body)
+
+        if not await aprofile_exists(public_key):
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        if not await sync_to_async(self._replace_services)(public_key, services):
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        return HttpResponse(status=status.HTTP_200_OK)
+
+    @require_auth_headers([AuthConfig.PUBLIC_KEY_HEADER])
+    async def patch(self, request):
+        """Handle PATCH request to change profile services incrementally."""
+        auth_data = request.auth_data
+        public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
+        body = await self.aread_body(request, settings.SERVICES_PATCH_MAX_SIZE)
+
+        timestamp = body[64:68]
+
+        self.validate_timestamp(timestamp)
+        await self.averify_signature(get_verify_key(public_key), body)
+
+        if not await aprofile_exists(public_key):
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        # The row lock needs a transaction, which the async ORM cannot open.
+        profile = await sync_to_async(self._append_patch)(
+            public_key, memoryview(body)
+        )
+        if not profile:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        return json_response(
+            {"version": profile.services_version},
+            headers={"ETag": f'"{profile.services_hash}"'},
+        )
+
+    @require_auth_headers([
+        AuthConfig.PUBLIC_KEY_HEADER,
+        AuthConfig.TIMESTAMP_HEADER,
+        AuthConfig.SIGNATURE_HEADER,
+    ], verify_signature=True)
+    async def delete(self, request):
+        """Handle DELETE request to clear profile services."""
+        auth_data = request.auth_data
+        public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
+
+        profile = await self._aget_profile(public_key, "services_hash")
+        if not profile:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        if not profile.services_hash:
+            return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+        if not await sync_to_async(self._replace_services)(public_key, None):
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+        return HttpResponse(status=status.HTTP_200_OK)
@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+import zlib
+from collections import namedtuple
+
+from django.conf import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_CACHE_PREFIX = "compressed:"
+
+# zlib window bits selecting the gzip container.
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+Codec = namedtuple("Codec", ["compress", "reader", "errors"])
+
+
+def gzip_compress(data):
+    compressor = zlib.compressobj(
+        settings.COMPRESSION_GZIP_LEVEL,
+        zlib.DEFLATED,
+        GZIP_WBITS,
+        strategy=(
+            zlib.Z_HUFFMAN_ONLY
+            if settings.COMPRESSION_GZIP_HUFFMAN_ONLY
+            else zlib.Z_DEFAULT_STRATEGY
+        ),
+    )
+    return compressor.compress(data) + compressor.flush()
+
+
+def gzip_reader(stream):
+    return gzip.GzipFile(fileobj=stream, mode="rb")
+
+
+def zstd_compress(data):
+    return zstandard.ZstdCompressor(
+        level=settings.COMPRESSION_ZSTD_LEVEL
+    ).compress(data)
+
+
+def zstd_reader(stream):
+    return zstandard.ZstdDecompressor().stream_reader(stream)
+
+
+# Supported content codings, in order of preference.
+CODECS = {}
+if zstandard is not None:
+    CODECS["zstd"] = Codec(zstd_compress, zstd_reader, (zstandard.ZstdError,))
+CODECS["gzip"] = Codec(gzip_compress, gzip_reader, (OSError, EOFError, zlib.error))
+
+
+def negotiate(accept_encoding):
+    """Pick the supported coding preferred by an ``Accept-Encoding`` header.
+
+    Codings are ranked by their q-value, ties by ``CODECS`` order.
+
+    Returns:
+        str | None: The coding, or None to send the response as is.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.strip().lower().split(";")
+        weight = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in CODECS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def cache_key(coding, *parts):
+    """Cache key of a compressed representation identified by ``parts``."""
+    digest = hashlib.blake2b(
+        "\n".join(parts).encode(), digest_size=16
+    ).hexdigest()
+    return f"{COMPRESSION_CACHE_PREFIX}{coding}:{digest}"
@@ -0,0 +1,69 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY_DATABASE = "default"
+STICKY_CACHE_PREFIX = "dbsticky:"
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+class ReplicaRouter:
+    """Send reads to ``settings.DATABASE_REPLICAS`` inside ``replica_reads``.
+
+    Reads anywhere else (writes, transactions of write requests, management
+    commands, the admin) and all writes go to the primary. Migrations only
+    run on the primary; replicas receive them through replication.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return PRIMARY_DATABASE
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DATABASE
+
+
+def _sticky_key(public_key):
+    return f"{STICKY_CACHE_PREFIX}{bytes(public_key).hex()}"
+
+
+def replica_reads_enabled():
+    """Report whether reads in the current context may go to a replica."""
+    return _replica_reads.get()
+
+
+@contextmanager
+def replica_reads(public_key):
+    """Route the reads made for ``public_key`` to the replicas.
+
+    Keys written within the last ``DB_REPLICA_STICKY_SECONDS`` keep reading
+    from the primary, so that clients see their own writes despite
+    replication lag.
+    """
+    if not settings.DATABASE_REPLICAS or cache.get(_sticky_key(public_key)):
+        yield
+        return
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def pin_to_primary(public_key):
+    """Keep reads for ``public_key`` on the primary after a write."""
+    if settings.DATABASE_REPLICAS:
+        cache.set(
+            _sticky_key(public_key), True, settings.DB_REPLICA_STICKY_SECONDS
+        )
@@ -0,0 +1,183 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORT_TIME_PREFIX = "import time:"
+
+
+def parse_import_times(stderr):
+    """Parse ``-X importtime`` output into ``{module: (self_us, cumulative_us)}``."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        fields = line[len(IMPORT_TIME_PREFIX):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue
+        modules[fields[2].strip()] = (self_us, cumulative_us)
+    return modules
+
+
+def module_group(module, apps):
+    """Attribute a module to an installed app, or to its package otherwise.
+
+    Django's own modules are split by subpackage (``django.db``, ...) so the
+    framework does not show up as a single opaque entry.
+    """
+    for app in apps:
+        if module == app or module.startswith(app + "."):
+            return app
+    parts = module.split(".")
+    if parts[0] == "django" and len(parts) > 1:
+        return ".".join(parts[:2])
+    return parts[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot the project in fresh interpreters like a server worker does "
+        "and report import time per app/module, time to first request and "
+        "memory usage"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--server-mode",
+            choices=("wsgi", "asgi"),
+            default=os.getenv("SERVER_MODE", "wsgi"),
+        )
+        parser.add_argument(
+            "--path",
+            default=f"{settings.API_PATH_PREFIX}profiles/",
+            help="Path of the first request",
+        )
+        parser.add_argument(
+            "--env",
+            action="append",
+            default=[],
+            metavar="NAME=VALUE",
+            help="Environment override for the probed process, e.g. API_ONLY=1",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument("--json", action="store_true")
+
+    def probe(self, env, server_mode, path):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-m",
+                "api.startup",
+                server_mode,
+                path,
+            ],
+            capture_output=True,
+            cwd=settings.BASE_DIR,
+            env=env,
+            text=True,
+        )
+        elapsed = time.perf_counter() - start
+        if result.returncode:
+            raise CommandError(f"Startup probe failed:\n{result.stderr[-2000:]}")
+        report = json.loads(result.stdout)
+        report["process_ms"] = 1000 * elapsed
+        report["imports"] = parse_import_times(result.stderr)
+        return report
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        for override in options["env"]:
+            name, separator, value = override.partition("=")
+            if not separator:
+                raise CommandError(f"Invalid --env {override!r}, use NAME=VALUE")
+            env[name] = value
+
+        runs = [
+            self.probe(env, options["server_mode"], options["path"])
+            for _ in range(max(options["repeat"], 1))
+        ]
+        first = runs[0]
+        groups = defaultdict(lambda: [0, 0])
+        apps = sorted(first["installed_apps"], key=len, reverse=True)
+        for module, (self_us, _) in first["imports"].items():
+            group = groups[module_group(module, apps)]
+            group[0] += self_us
+            group[1] += 1
+
+        report = {
+            "server_mode": first["server_mode"],
+            "path": first["path"],
+            "status": first["status"],
+            "env": options["env"],
+            "runs": len(runs),
+            "phases_ms": {
+                phase: statistics.median(run["phases_ms"][phase] for run in runs)
+                for phase in first["phases_ms"]
+            },
+            "process_ms": statistics.median(run["process_ms"] for run in runs),
+            "rss_kib": statistics.median(run["rss_kib"] or 0 for run in runs),
+            "max_rss_kib": statistics.median(run["max_rss_kib"] for run in runs),
+            "modules": first["modules"],
+            "import_ms": sum(s for s, _ in first["imports"].values()) / 1000,
+            "groups": [
+                {"name": name, "self_ms": self_us / 1000, "modules": count}
+                for name, (self_us, count) in sorted(
+                    groups.items(), key=lambda item: item[1][0], reverse=True
+                )[:options["top"]]
+            ],
+            "slowest_modules": [
+                {
+                    "name": module,
+                    "self_ms": self_us / 1000,
+                    "cumulative_ms": cumulative_us / 1000,
+                }
+                for module, (self_us, cumulative_us) in sorted(
+                    first["imports"].items(),
+                    key=lambda item: item[1][0],
+                    reverse=True,
+                )[:options["top"]]
+            ],
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        phases = report["phases_ms"]
+        self.stdout.write(
+            f"{report['server_mode']} boot, median of {report['runs']} runs, "
+            f"first request {report['path']} -> {report['status']}"
+        )
+        for phase in ("setup", "application", "first_request", "total"):
+            self.stdout.write(f"  {phase:<16}{phases[phase]:9.1f} ms")
+        self.stdout.write(f"  {'process':<16}{report['process_ms']:9.1f} ms")
+        self.stdout.write(
+            f"  {'rss':<16}{report['rss_kib'] / 1024:9.1f} MiB "
+            f"(max {report['max_rss_kib'] / 1024:.1f} MiB), "
+            f"{report['modules']} modules, "
+            f"{report['import_ms']:.1f} ms importing"
+        )
+        self.stdout.write("\nImport time by app/package (self):")
+        for group in report["groups"]:
+            self.stdout.write(
+                f"  {group['self_ms']:8.1f} ms  {group['modules']:4d}  "
+                f"{group['name']}"
+            )
+        self.stdout.write("\nSlowest modules (self / cumulative):")
+        for module in report["slowest_modules"]:
+            self.stdout.write(
+                f"  {module['self_ms']:8.1f} / {module['cumulative_ms']:8.1f} ms  "
+                f"{module['name']}"
+            )
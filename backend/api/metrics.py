@@ -0,0 +1,197 @@
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess, push_to_gateway)
+from rest_framework.exceptions import ValidationError
+from rest_framework.views import exception_handler
+
+REQUEST_LATENCY = Histogram(
+    "passcryptum_request_duration_seconds",
+    "Total request latency.",
+    ["view", "method"],
+)
+PHASE_LATENCY = Histogram(
+    "passcryptum_request_phase_duration_seconds",
+    "Time spent per request in the decode, verify, db and serialize phases.",
+    ["view", "method", "phase"],
+)
+RESPONSES = Counter(
+    "passcryptum_responses_total",
+    "Responses by status code.",
+    ["view", "method", "status"],
+)
+VALIDATION_FAILURES = Counter(
+    "passcryptum_validation_failures_total",
+    "Rejected requests by offending field.",
+    ["field"],
+)
+CREDENTIAL_EVICTIONS = Counter(
+    "passcryptum_credential_evictions_total",
+    "Credentials evicted to enforce the per-profile limit.",
+)
+CREDENTIALS_PURGED = Counter(
+    "passcryptum_credentials_purged_total",
+    "Expired credentials deleted by purge_expired_credentials.",
+)
+CREDENTIAL_PURGE_ROWS = Histogram(
+    "passcryptum_credential_purge_rows",
+    "Expired credentials deleted per purge run.",
+    buckets=(0, 10, 100, 1000, 10000, 100000, 1000000, float("inf")),
+)
+SERVICES_COMPACTIONS = Counter(
+    "passcryptum_services_compactions_total",
+    "Services snapshots rewritten to fold in pending patches.",
+)
+
+PHASES = ("decode", "verify", "db", "serialize")
+
+_request_timings = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def observe_phase(phase):
+    """Add the time spent in the block to the current request's ``phase``.
+
+    Usable as a context manager or decorator; a no-op outside of a request
+    instrumented by ``MetricsMiddleware``.
+    """
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] += perf_counter() - start
+
+
+def _observe_query(execute, sql, params, many, context):
+    with observe_phase("db"):
+        return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Time every query run on new database connections."""
+    if _observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_observe_query)
+
+
+def record_api_exception(exc):
+    """Count the fields of a rejected request."""
+    if isinstance(exc, ValidationError) and isinstance(exc.detail, dict):
+        for field in exc.detail:
+            VALIDATION_FAILURES.labels(field=field).inc()
+
+
+def api_exception_handler(exc, context):
+    """DRF exception handler that records validation failures."""
+    record_api_exception(exc)
+    return exception_handler(exc, context)
+
+
+class MetricsMiddleware:
+    """Record latency, phase timings and response codes for every request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _request_timings.set(defaultdict(float))
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+            self.record(request, response, perf_counter() - start)
+            return response
+        finally:
+            _request_timings.reset(token)
+
+    async def __acall__(self, request):
+        token = _request_timings.set(defaultdict(float))
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+            self.record(request, response, perf_counter() - start)
+            return response
+        finally:
+            _request_timings.reset(token)
+
+    def process_template_response(self, request, response):
+        timings = _request_timings.get()
+        if timings is not None:
+            start = perf_counter()
+
+            def stop_serialize(rendered):
+                timings["serialize"] += perf_counter() - start
+
+            response.add_post_render_callback(stop_serialize)
+        return response
+
+    def record(self, request, response, duration):
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else "unmatched"
+        method = request.method
+        REQUEST_LATENCY.labels(view=view, method=method).observe(duration)
+        RESPONSES.labels(
+            view=view, method=method, status=response.status_code
+        ).inc()
+        timings = _request_timings.get()
+        for phase in PHASES:
+            PHASE_LATENCY.labels(view=view, method=method, phase=phase).observe(
+                timings.get(phase, 0.0)
+            )
+
+
+def metrics_view(request):
+    """Expose metrics in the Prometheus text format.
+
+    Aggregates all gunicorn workers when PROMETHEUS_MULTIPROC_DIR is set.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def push_metrics(job, *collectors):
+    """Push ``collectors`` to ``settings.PROMETHEUS_PUSHGATEWAY`` as ``job``.
+
+    For processes that serve no ``/metrics/``, such as management commands.
+    Nothing is pushed under PROMETHEUS_MULTIPROC_DIR, whose samples the
+    workers already serve, or without a gateway.
+
+    Returns:
+        bool: Whether the metrics were pushed.
+
+    Raises:
+        OSError: If the gateway cannot be reached.
+    """
+    gateway = settings.PROMETHEUS_PUSHGATEWAY
+    if not gateway or os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return False
+    registry = CollectorRegistry()
+    for collector in collectors:
+        registry.register(collector)
+    push_to_gateway(gateway, job=job, registry=registry)
+    return True
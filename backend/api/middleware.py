@@ -0,0 +1,173 @@
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+
+from .compression import CODECS, cache_key, negotiate
+
+
+class WebOnlyMiddleware:
+    """Run ``settings.WEB_ONLY_MIDDLEWARE`` for every path except the API.
+
+    API views authenticate with signed headers and never touch sessions,
+    users, messages or CSRF tokens, so requests under ``API_PATH_PREFIX`` go
+    straight to the next handler. Everything else (e.g. the admin) gets the
+    wrapped middleware, including their view/exception/template hooks.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+        self.middleware = []
+        handler = get_response
+        for middleware_path in reversed(settings.WEB_ONLY_MIDDLEWARE):
+            handler = import_string(middleware_path)(handler)
+            self.middleware.insert(0, handler)
+        self.web_handler = handler
+
+    def is_api_request(self, request):
+        return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.is_api_request(request):
+            return self.get_response(request)
+        return self.web_handler(request)
+
+    async def __acall__(self, request):
+        if self.is_api_request(request):
+            return await self.get_response(request)
+        return await self.web_handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api_request(request):
+            return None
+        for middleware in self.middleware:
+            if hasattr(middleware, "process_view"):
+                response = middleware.process_view(
+                    request, view_func, view_args, view_kwargs
+                )
+                if response is not None:
+                    return response
+        return None
+
+    def process_template_response(self, request, response):
+        if self.is_api_request(request):
+            return response
+        for middleware in reversed(self.middleware):
+            if hasattr(middleware, "process_template_response"):
+                response = middleware.process_template_response(
+                    request, response
+                )
+        return response
+
+    def process_exception(self, request, exception):
+        if self.is_api_request(request):
+            return None
+        for middleware in reversed(self.middleware):
+            if hasattr(middleware, "process_exception"):
+                response = middleware.process_exception(request, exception)
+                if response is not None:
+                    return response
+        return None
+
+
+class CompressionMiddleware:
+    """Compress API responses with the coding negotiated by Accept-Encoding.
+
+    Responses smaller than ``COMPRESSION_MIN_SIZE`` are sent as is. Those
+    with an ``ETag`` (profile services) of at least
+    ``COMPRESSION_CACHE_MIN_SIZE`` bytes are compressed once per coding and
+    kept in the ``COMPRESSION_CACHE`` cache, if configured, keyed by ETag,
+    URL and public key; unless they compress to more than
+    ``COMPRESSION_CACHE_MAX_SIZE`` bytes. Compressed
+    responses carry a weak ETag, as their bytes differ from the original.
+    Under ASGI, compression runs in a worker thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        coding = self.get_coding(request, response)
+        if coding:
+            self.compress(request, response, coding)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        coding = self.get_coding(request, response)
+        if coding:
+            await sync_to_async(self.compress, thread_sensitive=False)(
+                request, response, coding
+            )
+        return response
+
+    def get_coding(self, request, response):
+        """Content coding to apply to ``response``, or None."""
+        if (
+            not request.path_info.startswith(settings.API_PATH_PREFIX)
+            or response.streaming
+            or response.status_code != 200
+            or response.has_header("Content-Encoding")
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return None
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return negotiate(request.headers.get("Accept-Encoding", ""))
+
+    def compress(self, request, response, coding):
+        content = response.content
+        etag = response.get("ETag")
+        cache = key = None
+        if (
+            settings.COMPRESSION_CACHE
+            and etag
+            and len(content) >= settings.COMPRESSION_CACHE_MIN_SIZE
+        ):
+            cache = caches[settings.COMPRESSION_CACHE]
+            key = cache_key(
+                coding,
+                etag,
+                request.get_full_path(),
+                request.headers.get("Public-Key", ""),
+            )
+            compressed = cache.get(key)
+            if compressed is not None:
+                self.set_content(response, compressed, coding)
+                return
+        compressed = CODECS[coding].compress(content)
+        if len(compressed) >= len(content):
+            return
+        if key and len(compressed) <= settings.COMPRESSION_CACHE_MAX_SIZE:
+            cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+        self.set_content(response, compressed, coding)
+
+    def set_content(self, response, compressed, coding):
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        response.headers["Content-Encoding"] = coding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = f"W/{etag}"
@@ -0,0 +1,96 @@
+import os
+import secrets
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+PROTECTOR_SIZE = 32
+
+
+class ProtectorPool:
+    """Pool of pre-generated random protectors refilled in the background.
+
+    Protectors come from ``secrets.token_bytes``. When the pool holds no more
+    than ``refill_threshold`` (half of ``size`` by default), a daemon thread
+    tops it up to ``size`` with a single CSPRNG call; the empty pool is
+    filled on first use. A ``size`` of 0 disables pooling. The pool is discarded after
+    a fork so that worker processes never hand out the same protectors.
+    """
+
+    def __init__(self, size, refill_threshold=None):
+        self.size = size
+        if refill_threshold is None:
+            refill_threshold = size // 2
+        self.refill_threshold = refill_threshold
+        self._pool = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._pid = os.getpid()
+
+    def get(self):
+        """Return a fresh random protector as raw bytes."""
+        if self.size <= 0:
+            return secrets.token_bytes(PROTECTOR_SIZE)
+
+        if self._pid != os.getpid():
+            self._reset()
+
+        try:
+            protector = self._pool.popleft()
+        except IndexError:
+            protector = secrets.token_bytes(PROTECTOR_SIZE)
+
+        if len(self._pool) <= self.refill_threshold:
+            self._schedule_refill()
+        return protector
+
+    def _reset(self):
+        with self._lock:
+            self._pool.clear()
+            self._refilling = False
+            self._pid = os.getpid()
+
+    def _schedule_refill(self):
+        with self._lock:
+            if self._refilling:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill, daemon=True).start()
+
+    def _refill(self):
+        try:
+            missing = self.size - len(self._pool)
+            if missing > 0:
+                data = secrets.token_bytes(PROTECTOR_SIZE * missing)
+                self._pool.extend(
+                    data[i:i + PROTECTOR_SIZE]
+                    for i in range(0, len(data), PROTECTOR_SIZE)
+                )
+        finally:
+            with self._lock:
+                self._refilling = False
+
+
+protector_pool = ProtectorPool(
+    size=settings.PROTECTOR_POOL_SIZE,
+    refill_threshold=settings.PROTECTOR_POOL_REFILL_THRESHOLD,
+)
+
+
+@receiver(setting_changed)
+def configure_protector_pool(setting, **kwargs):
+    """Apply changed pool settings, e.g. under ``override_settings``."""
+    if setting in ("PROTECTOR_POOL_SIZE", "PROTECTOR_POOL_REFILL_THRESHOLD"):
+        protector_pool.size = settings.PROTECTOR_POOL_SIZE
+        protector_pool.refill_threshold = (
+            settings.PROTECTOR_POOL_REFILL_THRESHOLD
+        )
+        protector_pool._reset()
+
+
+def generate_protector():
+    """Return a fresh random protector as raw bytes."""
+    return protector_pool.get()
@@ -0,0 +1,198 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+RATE_LIMIT_CACHE_PREFIX = "ratelimit:"
+PIN_FAILURES_CACHE_PREFIX = "pinfail:"
+
+
+class MemoryRateLimitStore:
+    """Per-process token buckets and failure counters in bounded LRU dicts.
+
+    A bucket is kept as its theoretical arrival time (GCRA), a single float
+    per key, so a decision is one dict lookup and one assignment. Evicting a
+    key refills its bucket, hence ``max_keys`` should exceed the number of
+    clients seen within a refill period.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _put(self, entries, key, value):
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.max_keys:
+            entries.popitem(last=False)
+
+    def acquire(self, key, capacity, rate, take=True):
+        """Take a token from a bucket, or with ``take=False`` only look.
+
+        Returns:
+            float: 0 if a token was (or could be) taken, else seconds until
+            one is available.
+        """
+        interval = 1 / rate
+        now = time.monotonic()
+        with self._lock:
+            arrival = max(self._buckets.get(key, now), now) + interval
+            wait = arrival - now - capacity * interval
+            if wait > 0:
+                return wait
+            if take:
+                self._put(self._buckets, key, arrival)
+        return 0
+
+    def add_failure(self, key, timeout):
+        """Count a failure and return the number recorded within ``timeout``."""
+        now = time.monotonic()
+        with self._lock:
+            count, expires = self._failures.get(key, (0, now + timeout))
+            if expires <= now:
+                count, expires = 0, now + timeout
+            self._put(self._failures, key, (count + 1, expires))
+        return count + 1
+
+    def clear_failures(self, key):
+        """Forget the failures of a key."""
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+class CacheRateLimitStore:
+    """Token buckets and failure counters on Django's cache, shared by workers.
+
+    Buckets use the same GCRA arrival time as the memory store. The cache
+    API has no compare-and-set, so concurrent requests for one key may
+    occasionally both pass; failure counters rely on ``cache.incr`` and are
+    exact on the shared backends (memcached, Redis).
+    """
+
+    def acquire(self, key, capacity, rate, take=True):
+        """Take a token from a bucket, or with ``take=False`` only look.
+
+        Returns:
+            float: 0 if a token was (or could be) taken, else seconds until
+            one is available.
+        """
+        interval = 1 / rate
+        now = time.time()
+        cache_key = f"{RATE_LIMIT_CACHE_PREFIX}{key}"
+        arrival = max(cache.get(cache_key, now), now) + interval
+        wait = arrival - now - capacity * interval
+        if wait > 0:
+            return wait
+        if take:
+            cache.set(cache_key, arrival, math.ceil(arrival - now))
+        return 0
+
+    def add_failure(self, key, timeout):
+        """Count a failure and return the number recorded within ``timeout``."""
+        cache_key = f"{PIN_FAILURES_CACHE_PREFIX}{key}"
+        if cache.add(cache_key, 1, timeout):
+            return 1
+        try:
+            return cache.incr(cache_key)
+        except ValueError:
+            cache.add(cache_key, 1, timeout)
+            return 1
+
+    def clear_failures(self, key):
+        """Forget the failures of a key."""
+        cache.delete(f"{PIN_FAILURES_CACHE_PREFIX}{key}")
+
+
+class CredentialRateLimiter:
+    """Rate limit credential unlocks per public key and per protector.
+
+    Every attempt takes a token from the protector's bucket. The public
+    key's bucket is only checked up front and charged by failed attempts
+    (unknown protector or PIN mismatch), so that a client's successful
+    unlocks never use it up while guessing does. ``max_failures``
+    consecutive PIN mismatches (0 disables) mark the credential for
+    deletion.
+    """
+
+    def __init__(self, store, key_limit, protector_limit, max_failures,
+                 failure_window):
+        self.store = store
+        self.key_limit = key_limit
+        self.protector_limit = protector_limit
+        self.max_failures = max_failures
+        self.failure_window = failure_window
+
+    @staticmethod
+    def _key(*parts):
+        return hashlib.blake2b(b":".join(parts), digest_size=16).hexdigest()
+
+    def acquire(self, public_key, protector):
+        """Take an attempt for raw ``public_key`` and ``protector`` bytes.
+
+        Returns:
+            float: 0 if the attempt is allowed, else seconds to wait.
+        """
+        wait = self.store.acquire(
+            self._key(b"key", public_key), *self.key_limit, take=False
+        )
+        if wait:
+            return wait
+        return self.store.acquire(
+            self._key(b"protector", public_key, protector),
+            *self.protector_limit,
+        )
+
+    def record_failure(self, public_key, protector):
+        """Charge a failed attempt to its public key and count a PIN mismatch.
+
+        Returns:
+            bool: Whether the mismatch limit of the credential is reached.
+        """
+        self.store.acquire(self._key(b"key", public_key), *self.key_limit)
+        if not self.max_failures:
+            return False
+        key = self._key(b"failures", public_key, protector)
+        if self.store.add_failure(key, self.failure_window) < self.max_failures:
+            return False
+        self.store.clear_failures(key)
+        return True
+
+    def record_success(self, public_key, protector):
+        """Reset the PIN mismatch count after a successful unlock."""
+        if self.max_failures:
+            self.store.clear_failures(
+                self._key(b"failures", public_key, protector)
+            )
+
+
+def create_credential_rate_limiter():
+    """Build the limiter selected by ``settings.CREDENTIAL_RATE_LIMIT``.
+
+    Returns None when rate limiting is disabled.
+    """
+    backend = settings.CREDENTIAL_RATE_LIMIT
+    if backend == "memory":
+        store = MemoryRateLimitStore(settings.CREDENTIAL_RATE_LIMIT_MAX_KEYS)
+    elif backend == "cache":
+        store = CacheRateLimitStore()
+    else:
+        return None
+    return CredentialRateLimiter(
+        store,
+        key_limit=(
+            settings.CREDENTIAL_RATE_LIMIT_KEY_BURST,
+            settings.CREDENTIAL_RATE_LIMIT_KEY_PER_MINUTE / 60,
+        ),
+        protector_limit=(
+            settings.CREDENTIAL_RATE_LIMIT_BURST,
+            settings.CREDENTIAL_RATE_LIMIT_PER_MINUTE / 60,
+        ),
+        max_failures=settings.CREDENTIAL_MAX_PIN_FAILURES,
+        failure_window=settings.CREDENTIAL_PIN_FAILURE_WINDOW,
+    )
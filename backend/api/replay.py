@@ -0,0 +1,119 @@
+import hashlib
+import math
+import os
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLAY_CACHE_PREFIX = "replay:"
+
+
+class BloomFilter:
+    """Fixed-size set of byte strings with a bounded false positive rate.
+
+    Sized for ``capacity`` items at ``false_positive_rate``; more items only
+    raise the rate, never the memory used. Positions come from a keyed
+    BLAKE2b digest (double hashing), so clients cannot pick signatures that
+    collide on purpose.
+    """
+
+    def __init__(self, capacity, false_positive_rate, key):
+        self.bits = math.ceil(
+            -capacity * math.log(false_positive_rate) / math.log(2) ** 2
+        )
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray(-(-self.bits // 8))
+        self._key = key
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item, digest_size=16, key=self._key).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hashes):
+            yield divmod((first + index * step) % self.bits, 8)
+
+    def __contains__(self, item):
+        array = self._array
+        return all(array[byte] >> bit & 1 for byte, bit in self._positions(item))
+
+    def add(self, item):
+        """Add ``item`` and report whether it was (probably) present."""
+        array = self._array
+        present = True
+        for byte, bit in self._positions(item):
+            if not array[byte] >> bit & 1:
+                present = False
+                array[byte] |= 1 << bit
+        return present
+
+
+class MemoryReplayGuard:
+    """Per-process record of accepted signatures, bucketed by signed timestamp.
+
+    Buckets form a ring covering the whole ``[now - window, now + window]``
+    range of acceptable timestamps. A slot is reset when a newer bucket maps
+    onto it, so expired signatures are dropped without any sweeping. Each
+    bucket is a ``BloomFilter`` sized for ``bucket_capacity`` signatures, so
+    memory stays fixed whatever the request rate; the price is that a fresh
+    signature is rejected with probability ``false_positive_rate`` (higher
+    once a bucket holds more than its capacity).
+    """
+
+    def __init__(
+        self, window, bucket_seconds, bucket_capacity, false_positive_rate
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.bucket_capacity = bucket_capacity
+        self.false_positive_rate = false_positive_rate
+        self.size = -(-2 * window // bucket_seconds) + 1
+        self._epochs = [None] * self.size
+        self._buckets = [None] * self.size
+        self._key = os.urandom(32)
+        self._lock = threading.Lock()
+
+    def is_replay(self, signature, timestamp):
+        """Record a signature and report whether it was already seen."""
+        epoch = timestamp // self.bucket_seconds
+        slot = epoch % self.size
+        with self._lock:
+            if self._epochs[slot] != epoch:
+                self._epochs[slot] = epoch
+                self._buckets[slot] = BloomFilter(
+                    self.bucket_capacity, self.false_positive_rate, self._key
+                )
+            return self._buckets[slot].add(signature)
+
+
+class CacheReplayGuard:
+    """Replay guard on Django's cache, shared by all workers using it.
+
+    Relies on ``cache.add`` being atomic, which holds for the shared
+    backends (memcached, Redis, database).
+    """
+
+    def __init__(self, window):
+        self.timeout = 2 * window
+
+    def is_replay(self, signature, timestamp):
+        """Record a signature and report whether it was already seen."""
+        key = f"{REPLAY_CACHE_PREFIX}{signature.hex()}"
+        return not cache.add(key, timestamp, self.timeout)
+
+
+def create_replay_guard(window):
+    """Build the replay guard selected by ``settings.REPLAY_GUARD``.
+
+    Returns None when replay protection is disabled.
+    """
+    backend = settings.REPLAY_GUARD
+    if backend == "memory":
+        return MemoryReplayGuard(
+            window,
+            settings.REPLAY_GUARD_BUCKET_SECONDS,
+            settings.REPLAY_GUARD_BUCKET_CAPACITY,
+            settings.REPLAY_GUARD_FALSE_POSITIVE_RATE,
+        )
+    if backend == "cache":
+        return CacheReplayGuard(window)
+    return None
@@ -0,0 +1,142 @@
+"""Boot probe run by the ``profile_startup`` command in a fresh interpreter.
+
+Boots Django the way a gunicorn worker does, serves one request and prints
+the phase timings and memory usage as JSON on stdout. Run it with
+``python -X importtime -m api.startup`` to also get per-module import times
+on stderr.
+"""
+import asyncio
+import io
+import json
+import os
+import resource
+import sys
+import time
+
+START = time.perf_counter()
+
+
+def request_host(allowed_hosts):
+    """Pick a Host header accepted by ``ALLOWED_HOSTS``."""
+    for host in allowed_hosts:
+        if host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+def wsgi_request(application, host, path):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": host,
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": host,
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    statuses = []
+    body = application(environ, lambda status, headers: statuses.append(status))
+    b"".join(body)
+    return int(statuses[0].split()[0])
+
+
+def asgi_request(application, host, path):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", host.encode())],
+        "server": (host, 80),
+    }
+    statuses = []
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # Stay connected until Django stops listening for a disconnect.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    asyncio.run(application(scope, receive, send))
+    return statuses[0]
+
+
+def rss_kib():
+    """Current resident set size, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def main():
+    server_mode = sys.argv[1] if len(sys.argv) > 1 else "wsgi"
+    path = sys.argv[2] if len(sys.argv) > 2 else "/api/profiles/"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup(set_prefix=False)
+    setup = time.perf_counter()
+
+    from django.conf import settings
+
+    if server_mode == "asgi":
+        from django.core.asgi import get_asgi_application
+
+        application = get_asgi_application()
+    else:
+        from django.core.wsgi import get_wsgi_application
+
+        application = get_wsgi_application()
+    loaded = time.perf_counter()
+
+    host = request_host(settings.ALLOWED_HOSTS)
+    if server_mode == "asgi":
+        status = asgi_request(application, host, path)
+    else:
+        status = wsgi_request(application, host, path)
+    served = time.perf_counter()
+
+    json.dump(
+        {
+            "server_mode": server_mode,
+            "path": path,
+            "status": status,
+            "installed_apps": settings.INSTALLED_APPS,
+            "phases_ms": {
+                "setup": 1000 * (setup - START),
+                "application": 1000 * (loaded - setup),
+                "first_request": 1000 * (served - loaded),
+                "total": 1000 * (served - START),
+            },
+            "rss_kib": rss_kib(),
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "modules": len(sys.modules),
+        },
+        sys.stdout,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+# Text formats worth compressing; images and fonts such as PNG and WOFF2
+# already are.
+COMPRESSIBLE_EXTENSIONS = (
+    ".css",
+    ".eot",
+    ".html",
+    ".ico",
+    ".js",
+    ".json",
+    ".map",
+    ".mjs",
+    ".otf",
+    ".svg",
+    ".ttf",
+    ".txt",
+    ".xml",
+)
+
+# Smaller files fit in a packet either way.
+COMPRESS_MIN_SIZE = 256
+
+
+def gzip_compress(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+# Precompressed siblings, by file suffix. Only those the gateway serves:
+# stock nginx has gzip_static but no brotli_static.
+COMPRESSORS = {".gz": gzip_compress}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Content-hashed static files with precompressed siblings.
+
+    After the files are hashed, each compressible one gets a ``.gz``
+    sibling, which the gateway serves instead of compressing on every
+    request. Siblings no smaller than the file are not written, and
+    existing ones are kept: a hashed name always has the same content.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        if self.size(name) < COMPRESS_MIN_SIZE:
+            return
+        with self.open(name) as file:
+            data = file.read()
+        for suffix, compress in COMPRESSORS.items():
+            # The hash in the name pins the content of an existing sibling.
+            if self.exists(name + suffix):
+                continue
+            compressed = compress(data)
+            if len(compressed) < len(data):
+                self._save(name + suffix, ContentFile(compressed))
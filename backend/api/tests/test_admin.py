@@ -0,0 +1,102 @@
+import os
+import unittest
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin import helpers
+from django.test import TestCase, override_settings
+from django.urls import path, reverse
+
+from benchmarks.signing import encode
+from credentials.models import Credential
+from profiles.models import Profile
+
+ADMIN_INSTALLED = apps.is_installed("django.contrib.admin")
+
+urlpatterns = [path("admin/", admin.site.urls)] if ADMIN_INSTALLED else []
+
+
+@unittest.skipUnless(ADMIN_INSTALLED, "API_ONLY leaves out the admin")
+# Admin pages link static files, which are not collected for tests.
+@override_settings(
+    ROOT_URLCONF=__name__,
+    STORAGES={
+        **settings.STORAGES,
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        },
+    },
+)
+class AdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from django.contrib.auth.models import User
+
+        cls.user = User.objects.create_superuser("admin", password="admin")
+        cls.profiles = [
+            Profile.objects.create(public_key=os.urandom(32)) for _ in range(2)
+        ]
+        cls.credentials = [
+            Credential.objects.create(
+                profile=profile, pin=os.urandom(32), protector=os.urandom(32)
+            )
+            for profile in cls.profiles
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def run_action(self, model, action, selected):
+        opts = model._meta
+        return self.client.post(
+            reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist"),
+            {
+                "action": action,
+                helpers.ACTION_CHECKBOX_NAME: selected,
+                "post": "yes",
+            },
+        )
+
+    def test_delete_selected_credentials(self):
+        response = self.run_action(
+            Credential, "delete_selected", [self.credentials[0].pk]
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertQuerySetEqual(
+            Credential.objects.all(), [self.credentials[1]]
+        )
+
+    def test_profiles_have_no_actions(self):
+        response = self.client.get(reverse("admin:profiles_profile_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, helpers.ACTION_CHECKBOX_NAME)
+
+        response = self.run_action(
+            Profile,
+            "delete_selected",
+            [encode(profile.pk) for profile in self.profiles],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Profile.objects.count(), 2)
+
+    def test_profiles_cannot_be_added(self):
+        response = self.client.get(reverse("admin:profiles_profile_add"))
+        self.assertEqual(response.status_code, 403)
+        self.assertNotContains(
+            self.client.get(reverse("admin:profiles_profile_changelist")),
+            reverse("admin:profiles_profile_add"),
+        )
+
+    def test_delete_profile(self):
+        profile = self.profiles[0]
+        response = self.client.post(
+            reverse(
+                "admin:profiles_profile_delete",
+                args=(encode(profile.pk),),
+            ),
+            {"post": "yes"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Profile.objects.filter(pk=profile.pk).exists())
+        self.assertFalse(Credential.objects.filter(profile=profile).exists())
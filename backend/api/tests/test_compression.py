@@ -0,0 +1,63 @@
+import os
+
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api.middleware import CompressionMiddleware
+
+COMPRESSION_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "compression": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-compression",
+    },
+}
+
+
+@override_settings(
+    CACHES=COMPRESSION_CACHES,
+    COMPRESSION_ENABLED=True,
+    COMPRESSION_MIN_SIZE=1,
+    COMPRESSION_CACHE_MIN_SIZE=1024,
+)
+class CompressionCacheTests(SimpleTestCase):
+    def setUp(self):
+        # Hex of random bytes compresses to about half its size.
+        self.content = os.urandom(12 * 1024).hex().encode()
+        for alias in COMPRESSION_CACHES:
+            caches[alias].clear()
+
+    def get_response(self, request):
+        return HttpResponse(self.content, headers={"ETag": '"services"'})
+
+    def request(self):
+        request = RequestFactory().get(
+            "/api/profiles/", headers={"Accept-Encoding": "gzip"}
+        )
+        return CompressionMiddleware(self.get_response)(request)
+
+    @override_settings(COMPRESSION_CACHE=None)
+    def test_not_cached_without_a_compression_cache(self):
+        response = self.request()
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertFalse(caches["default"]._cache)
+        self.assertFalse(caches["compression"]._cache)
+
+    @override_settings(COMPRESSION_CACHE="compression")
+    def test_cached_in_the_compression_cache(self):
+        first, second = self.request(), self.request()
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second.headers["ETag"], 'W/"services"')
+        self.assertEqual(len(caches["compression"]._cache), 1)
+        self.assertFalse(caches["default"]._cache)
+
+    @override_settings(
+        COMPRESSION_CACHE="compression",
+        COMPRESSION_CACHE_MAX_SIZE=1024,
+    )
+    def test_not_cached_above_the_max_size(self):
+        response = self.request()
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertGreater(len(response.content), 1024)
+        self.assertFalse(caches["compression"]._cache)
@@ -0,0 +1,58 @@
+import os
+import threading
+import unittest
+
+from django.db import connection, connections
+from django.test import Client, TransactionTestCase
+
+from api.views import AuthConfig
+from benchmarks.signing import Identity
+from credentials.models import Credential
+from profiles.models import Profile
+
+CREDENTIALS_PATH = "/api/credentials/"
+
+
+def create_credential(identity):
+    """POST a new credential for ``identity`` and return the response."""
+    return Client().post(
+        CREDENTIALS_PATH,
+        identity.signed_body(os.urandom(32)),
+        content_type="text/plain",
+        headers={"Public-Key": identity.public_key, "Hashed-Pin": identity.pin},
+    )
+
+
+@unittest.skipUnless(
+    connection.features.has_select_for_update,
+    "Needs row locks, which this database lacks",
+)
+class ConcurrentCredentialCreationTests(TransactionTestCase):
+    """Credential creation keeps the per-profile cap under contention."""
+
+    clients = 20
+
+    def test_concurrent_creates_keep_cap(self):
+        identity = Identity()
+        Profile.objects.create(public_key=identity.raw_public_key)
+        barrier = threading.Barrier(self.clients)
+        statuses = []
+
+        def create():
+            try:
+                barrier.wait()
+                statuses.append(create_credential(identity).status_code)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=create) for _ in range(self.clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses, [200] * self.clients)
+        self.assertEqual(
+            Credential.objects.filter(profile_id=identity.raw_public_key).count(),
+            AuthConfig.MAX_CREDENTIALS_PER_PROFILE,
+        )
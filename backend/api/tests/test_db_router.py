@@ -0,0 +1,129 @@
+import os
+import unittest
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from api.db_router import (PRIMARY_DATABASE, ReplicaRouter, pin_to_primary,
+                           replica_reads, replica_reads_enabled)
+from benchmarks.signing import Identity
+from profiles.models import Profile
+
+REPLICA = "replica1"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.public_key = os.urandom(32)
+        cache.clear()
+
+    def test_reads_use_the_primary_by_default(self):
+        self.assertEqual(self.router.db_for_read(Profile), PRIMARY_DATABASE)
+        self.assertFalse(replica_reads_enabled())
+
+    def test_reads_use_a_replica_inside_replica_reads(self):
+        with replica_reads(self.public_key):
+            self.assertTrue(replica_reads_enabled())
+            self.assertEqual(self.router.db_for_read(Profile), REPLICA)
+            self.assertEqual(
+                self.router.db_for_write(Profile), PRIMARY_DATABASE
+            )
+        self.assertFalse(replica_reads_enabled())
+
+    def test_pinned_public_key_reads_from_the_primary(self):
+        pin_to_primary(self.public_key)
+        with replica_reads(self.public_key):
+            self.assertEqual(self.router.db_for_read(Profile), PRIMARY_DATABASE)
+        # Other public keys still read from the replicas.
+        with replica_reads(os.urandom(32)):
+            self.assertEqual(self.router.db_for_read(Profile), REPLICA)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        with replica_reads(self.public_key):
+            self.assertFalse(replica_reads_enabled())
+        pin_to_primary(self.public_key)
+        self.assertFalse(cache.get(f"dbsticky:{self.public_key.hex()}"))
+
+    def test_only_the_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate(PRIMARY_DATABASE, "profiles"))
+        self.assertFalse(self.router.allow_migrate(REPLICA, "profiles"))
+
+
+@unittest.skipUnless(
+    settings.DATABASE_REPLICAS,
+    "Set DB_REPLICA_HOSTS to test routing to the replicas",
+)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Requests are routed between the primary and a replica.
+
+    The replicas of DB_REPLICA_HOSTS mirror the test database of the primary,
+    so their queries are told apart by connection.
+    """
+
+    databases = {PRIMARY_DATABASE, *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.identity = Identity()
+        Profile.objects.create(public_key=self.identity.raw_public_key)
+
+    def request(self, method, path, **kwargs):
+        """Make a request and return it with the queries per database."""
+        with ExitStack() as stack:
+            contexts = {
+                alias: stack.enter_context(
+                    CaptureQueriesContext(connections[alias])
+                )
+                for alias in self.databases
+            }
+            response = getattr(self.client, method)(path, **kwargs)
+        return response, {
+            alias: len(context) for alias, context in contexts.items()
+        }
+
+    def get_profile(self):
+        response, queries = self.request(
+            "get", "/api/profiles/", headers=self.identity.signed_headers()
+        )
+        # The profile has no services yet.
+        self.assertEqual(response.status_code, 204)
+        return queries
+
+    def create_credential(self):
+        response, queries = self.request(
+            "post",
+            "/api/credentials/",
+            data=self.identity.signed_body(os.urandom(32)),
+            content_type="text/plain",
+            headers={
+                "Public-Key": self.identity.public_key,
+                "Hashed-Pin": self.identity.pin,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        return queries
+
+    def assert_used_only(self, queries, alias):
+        self.assertTrue(queries.pop(alias))
+        self.assertFalse(any(queries.values()), queries)
+
+    def test_gets_read_from_a_replica(self):
+        queries = self.get_profile()
+        replicas = sum(queries.pop(alias) for alias in settings.DATABASE_REPLICAS)
+        self.assertTrue(replicas)
+        self.assertEqual(queries, {PRIMARY_DATABASE: 0})
+
+    def test_writes_go_to_the_primary(self):
+        self.assert_used_only(self.create_credential(), PRIMARY_DATABASE)
+
+    def test_gets_read_from_the_primary_after_a_write(self):
+        self.create_credential()
+        self.assert_used_only(self.get_profile(), PRIMARY_DATABASE)
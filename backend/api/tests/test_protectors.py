@@ -0,0 +1,65 @@
+import time
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from api.protectors import PROTECTOR_SIZE, ProtectorPool, protector_pool
+
+
+def wait_for_refill(pool, timeout=5):
+    """Wait until the refill ``pool.get`` may have started has finished."""
+    deadline = time.monotonic() + timeout
+    while pool._refilling:
+        if time.monotonic() > deadline:
+            raise AssertionError("The protector pool was not refilled")
+        time.sleep(0.001)
+
+
+class ProtectorPoolTests(SimpleTestCase):
+    def test_default_threshold_is_half_the_size(self):
+        self.assertEqual(ProtectorPool(100).refill_threshold, 50)
+
+    def test_serves_pooled_protectors(self):
+        pool = ProtectorPool(8)
+        self.assertEqual(len(pool.get()), PROTECTOR_SIZE)
+        wait_for_refill(pool)
+
+        pooled = list(pool._pool)
+        served = [pool.get() for _ in range(4)]
+        self.assertEqual(served, pooled[:4])
+
+    def test_zero_threshold_fills_on_first_use(self):
+        pool = ProtectorPool(8, refill_threshold=0)
+        pool.get()
+        wait_for_refill(pool)
+
+        pooled = list(pool._pool)
+        self.assertEqual([pool.get() for _ in range(8)], pooled)
+        # Emptied, the pool is topped up again.
+        wait_for_refill(pool)
+        self.assertEqual(len(pool._pool), 8)
+
+    def test_protectors_are_distinct(self):
+        pool = ProtectorPool(16)
+        protectors = set()
+        for _ in range(100):
+            protectors.add(pool.get())
+            wait_for_refill(pool)
+        self.assertEqual(len(protectors), 100)
+
+    def test_size_zero_disables_pooling(self):
+        pool = ProtectorPool(0)
+        self.assertEqual(len(pool.get()), PROTECTOR_SIZE)
+        self.assertFalse(pool._pool)
+        self.assertFalse(pool._refilling)
+
+    def test_follows_the_settings(self):
+        with override_settings(
+            PROTECTOR_POOL_SIZE=8, PROTECTOR_POOL_REFILL_THRESHOLD=2
+        ):
+            self.assertEqual(protector_pool.size, 8)
+            self.assertEqual(protector_pool.refill_threshold, 2)
+            protector_pool.get()
+            wait_for_refill(protector_pool)
+            self.assertEqual(len(protector_pool._pool), 8)
+        self.assertEqual(protector_pool.size, settings.PROTECTOR_POOL_SIZE)
@@ -0,0 +1,97 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.ratelimit import CredentialRateLimiter, MemoryRateLimitStore
+from benchmarks.signing import Identity, encode
+from credentials.models import Credential
+from profiles.models import Profile
+
+KEY_BURST = 5
+# No refill within a test.
+KEY_LIMIT = (KEY_BURST, 1e-6)
+PROTECTOR_LIMIT = (100, 1e-6)
+
+
+def create_limiter(max_failures=0):
+    return CredentialRateLimiter(
+        MemoryRateLimitStore(1000), KEY_LIMIT, PROTECTOR_LIMIT, max_failures, 60
+    )
+
+
+class CredentialRateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.limiter = create_limiter()
+        self.public_key = os.urandom(32)
+
+    def test_successful_unlocks_do_not_charge_the_public_key(self):
+        protector = os.urandom(32)
+        for _ in range(3 * KEY_BURST):
+            self.assertEqual(self.limiter.acquire(self.public_key, protector), 0)
+            self.limiter.record_success(self.public_key, protector)
+
+    def test_failed_attempts_exhaust_the_public_key(self):
+        for _ in range(KEY_BURST):
+            protector = os.urandom(32)
+            self.assertEqual(self.limiter.acquire(self.public_key, protector), 0)
+            self.limiter.record_failure(self.public_key, protector)
+
+        self.assertGreater(
+            self.limiter.acquire(self.public_key, os.urandom(32)), 0
+        )
+        self.assertEqual(self.limiter.acquire(os.urandom(32), os.urandom(32)), 0)
+
+    def test_protector_bucket_takes_every_attempt(self):
+        limiter = CredentialRateLimiter(
+            MemoryRateLimitStore(1000), KEY_LIMIT, (2, 1e-6), 0, 60
+        )
+        protector = os.urandom(32)
+        self.assertEqual(limiter.acquire(self.public_key, protector), 0)
+        self.assertEqual(limiter.acquire(self.public_key, protector), 0)
+        self.assertGreater(limiter.acquire(self.public_key, protector), 0)
+
+    def test_max_failures(self):
+        limiter = create_limiter(max_failures=2)
+        protector = os.urandom(32)
+        self.assertFalse(limiter.record_failure(self.public_key, protector))
+        self.assertTrue(limiter.record_failure(self.public_key, protector))
+
+
+# Replicas would not see the rows of the test transaction.
+@override_settings(DATABASE_REPLICAS=[])
+class CredentialUnlockRateLimitTests(TestCase):
+    def setUp(self):
+        self.identity = Identity()
+        profile = Profile.objects.create(public_key=self.identity.raw_public_key)
+        protector = os.urandom(32)
+        self.protector = encode(protector)
+        Credential.objects.create(
+            profile=profile, pin=self.identity.raw_pin, protector=protector
+        )
+        patcher = mock.patch("api.views.credential_rate_limiter", create_limiter())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def unlock(self, pin=None):
+        return self.client.get(
+            "/api/credentials/",
+            headers={
+                "Public-Key": self.identity.public_key,
+                "Hashed-Pin": pin or self.identity.pin,
+                "Protector": self.protector,
+                "Timestamp": encode(self.identity.timestamp()),
+            },
+        )
+
+    def test_owner_is_not_throttled_by_its_own_unlocks(self):
+        for _ in range(3 * KEY_BURST):
+            self.assertEqual(self.unlock().status_code, 200)
+
+    def test_wrong_pins_throttle_the_public_key(self):
+        wrong_pin = encode(os.urandom(32))
+        for _ in range(KEY_BURST):
+            self.assertEqual(self.unlock(wrong_pin).status_code, 403)
+        response = self.unlock()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response.headers)
@@ -0,0 +1,54 @@
+import os
+
+from django.test import SimpleTestCase
+
+from api.replay import BloomFilter, MemoryReplayGuard
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_reports_added_items(self):
+        bloom = BloomFilter(1000, 1e-6, os.urandom(32))
+        items = [os.urandom(64) for _ in range(1000)]
+        self.assertFalse(any(bloom.add(item) for item in items))
+        self.assertTrue(all(item in bloom for item in items))
+        self.assertTrue(all(bloom.add(item) for item in items))
+
+    def test_false_positive_rate_at_capacity(self):
+        bloom = BloomFilter(1000, 0.01, os.urandom(32))
+        for _ in range(1000):
+            bloom.add(os.urandom(64))
+        false_positives = sum(os.urandom(64) in bloom for _ in range(10000))
+        self.assertLess(false_positives, 200)
+
+    def test_size_is_fixed(self):
+        bloom = BloomFilter(100, 0.01, os.urandom(32))
+        size = len(bloom._array)
+        for _ in range(10000):
+            bloom.add(os.urandom(64))
+        self.assertEqual(len(bloom._array), size)
+
+
+class MemoryReplayGuardTests(SimpleTestCase):
+    def setUp(self):
+        self.guard = MemoryReplayGuard(300, 10, 1000, 1e-6)
+
+    def test_rejects_replays(self):
+        signature = os.urandom(64)
+        self.assertFalse(self.guard.is_replay(signature, 1000))
+        self.assertTrue(self.guard.is_replay(signature, 1000))
+        self.assertFalse(self.guard.is_replay(os.urandom(64), 1000))
+
+    def test_buckets_are_per_timestamp_range(self):
+        signature = os.urandom(64)
+        self.assertFalse(self.guard.is_replay(signature, 1000))
+        self.assertTrue(self.guard.is_replay(signature, 1009))
+        self.assertFalse(self.guard.is_replay(signature, 1010))
+
+    def test_slot_is_reset_by_a_newer_bucket(self):
+        signature = os.urandom(64)
+        self.guard.is_replay(signature, 1000)
+        later = 1000 + self.guard.size * self.guard.bucket_seconds
+        self.assertFalse(self.guard.is_replay(signature, later))
+        self.assertEqual(
+            sum(bucket is not None for bucket in self.guard._buckets), 1
+        )
@@ -0,0 +1,23 @@
+import os
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from api.verify_keys import get_verify_key, verify_key_cache
+
+
+class VerifyKeyCacheTests(SimpleTestCase):
+    def setUp(self):
+        verify_key_cache.clear()
+
+    def test_follows_the_settings(self):
+        public_key = os.urandom(32)
+        get_verify_key(public_key)
+        with override_settings(VERIFY_KEY_CACHE_SIZE=0):
+            self.assertEqual(verify_key_cache.stats()["size"], 0)
+            get_verify_key(public_key)
+            get_verify_key(public_key)
+            self.assertEqual(verify_key_cache.stats()["hits"], 0)
+        self.assertEqual(
+            verify_key_cache.stats()["maxsize"], settings.VERIFY_KEY_CACHE_SIZE
+        )
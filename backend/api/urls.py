@@ -1,8 +1,27 @@
+from django.conf import settings
 from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
 
-from .views import CredentialView, ProfileView
+from .views import CredentialBatchView, CredentialView, ProfileView
+
+if settings.ASYNC_API_VIEWS:
+    from .async_views import (AsyncCredentialBatchView, AsyncCredentialView,
+                              AsyncProfileView)
+
+    credential_view = csrf_exempt(AsyncCredentialView.as_view())
+    credential_batch_view = csrf_exempt(AsyncCredentialBatchView.as_view())
+    profile_view = csrf_exempt(AsyncProfileView.as_view())
+else:
+    credential_view = CredentialView.as_view()
+    credential_batch_view = CredentialBatchView.as_view()
+    profile_view = ProfileView.as_view()
 
 urlpatterns = [
-    path("credentials/", CredentialView.as_view(), name="credentials"),
-    path("profiles/", ProfileView.as_view(), name="profiles"),
+    path("credentials/", credential_view, name="credentials"),
+    path(
+        "credentials/batch/",
+        credential_batch_view,
+        name="credentials-batch",
+    ),
+    path("profiles/", profile_view, name="profiles"),
 ]
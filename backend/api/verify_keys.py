@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from nacl.signing import VerifyKey
+
+
+class VerifyKeyCache:
+    """Thread-safe LRU cache of ``VerifyKey`` objects keyed by raw key bytes.
+
+    Entries older than ``ttl`` seconds are rebuilt on access; a ``ttl`` of 0
+    disables expiry. A ``maxsize`` of 0 disables caching altogether.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, public_key):
+        """Return a ``VerifyKey`` for the given raw public key bytes."""
+        if self.maxsize <= 0:
+            self.misses += 1
+            return VerifyKey(public_key)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(public_key)
+            if entry is not None:
+                verify_key, created_at = entry
+                if not self.ttl or now - created_at < self.ttl:
+                    self._entries.move_to_end(public_key)
+                    self.hits += 1
+                    return verify_key
+                del self._entries[public_key]
+            self.misses += 1
+
+        verify_key = VerifyKey(public_key)
+        with self._lock:
+            self._entries[public_key] = (verify_key, now)
+            self._entries.move_to_end(public_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return verify_key
+
+    def clear(self):
+        """Drop all cached keys and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+verify_key_cache = VerifyKeyCache(
+    maxsize=settings.VERIFY_KEY_CACHE_SIZE,
+    ttl=settings.VERIFY_KEY_CACHE_TTL,
+)
+
+
+@receiver(setting_changed)
+def configure_verify_key_cache(setting, **kwargs):
+    """Apply changed cache settings, e.g. under ``override_settings``."""
+    if setting in ("VERIFY_KEY_CACHE_SIZE", "VERIFY_KEY_CACHE_TTL"):
+        verify_key_cache.maxsize = settings.VERIFY_KEY_CACHE_SIZE
+        verify_key_cache.ttl = settings.VERIFY_KEY_CACHE_TTL
+        verify_key_cache.clear()
+
+
+def get_verify_key(public_key):
+    """Return a cached ``VerifyKey`` for the given raw public key bytes."""
+    return verify_key_cache.get(public_key)
@@ -1,20 +1,41 @@
 import base64
 import binascii
+import json
 import logging
-import random
+import math
+from collections import defaultdict
+from contextlib import nullcontext
 from datetime import datetime
 from enum import Enum
 from functools import wraps
-
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import parse_etags
 from nacl.exceptions import BadSignatureError
-from nacl.signing import VerifyKey
 from rest_framework import status
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import APIException, Throttled, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from credentials.models import Credential
-from profiles.models import Profile
+from profiles.cache import invalidate_profile, profile_exists
+from profiles.models import Profile, ServicesPatch, hash_patch, hash_services
+from profiles.patches import (MATERIALIZE_ATTEMPTS, InvalidPatch,
+                              compact_services, current_services, parse_patch,
+                              patched_size, pending_patches)
+
+from .compression import CODECS
+from .db_router import pin_to_primary, replica_reads
+from .metrics import CREDENTIAL_EVICTIONS, observe_phase
+from .protectors import generate_protector
+from .ratelimit import create_credential_rate_limiter
+from .replay import create_replay_guard
+from .verify_keys import get_verify_key
 
 logger = logging.getLogger(__name__)
 
@@ -27,39 +48,148 @@ class AuthConfig:
     SIGNATURE_HEADER = "Signature"
     TIMESTAMP_TOLERANCE = 300
     MAX_CREDENTIALS_PER_PROFILE = 10
+    MAX_BATCH_OPERATIONS = 100
+    MAX_BATCH_SIZE = 1024 * 1024
+    MAX_ENTROPY_SIZE = 1024 * 1024
+
+
+replay_guard = create_replay_guard(AuthConfig.TIMESTAMP_TOLERANCE)
+
+credential_rate_limiter = create_credential_rate_limiter()
+
+SIGNED_BODY_HEADER_SIZE = 68
+
+BODY_CHUNK_SIZE = 64 * 1024
+
+NON_BASE64_BYTES = bytes(
+    set(range(256)).difference(
+        b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+    )
+)
 
 
 class HttpMethod(Enum):
     GET = "GET"
     POST = "POST"
+    PATCH = "PATCH"
     DELETE = "DELETE"
 
 
+class BatchOperation(Enum):
+    FETCH = "fetch"
+    DELETE = "delete"
+    CREATE = "create"
+
+
+BATCH_OPERATION_FIELDS = {
+    BatchOperation.FETCH: ("protector", "pin"),
+    BatchOperation.DELETE: ("protector",),
+    BatchOperation.CREATE: ("pin", "entropy"),
+}
+
+
+def etag_matches(if_none_match, etag):
+    """Weakly compare an ETag with an ``If-None-Match`` header.
+
+    Compressed responses carry the weak form of the same ETag.
+    """
+    return any(
+        tag.removeprefix("W/") == etag for tag in parse_etags(if_none_match)
+    )
+
+
 def require_auth_headers(required_headers, verify_signature=False):
-    """Decorator to enforce required headers and optional signature verification."""
+    """Decorator to enforce required headers and optional signature verification.
+
+    Works on both sync and async handlers; for async handlers the signature
+    is verified in a worker thread so the event loop is not blocked. Reads of
+    GET handlers may be served by read replicas; successful writes pin the
+    public key to the primary for a while (see ``api.db_router``).
+    """
+    check_signature = (
+        verify_signature and AuthConfig.SIGNATURE_HEADER in required_headers
+    )
+
+    @observe_phase("decode")
+    def get_auth_data(view, request):
+        header_data = {}
+        for header in required_headers:
+            header_data[header] = view.get_header_data(request, header)
+
+        if AuthConfig.TIMESTAMP_HEADER in required_headers:
+            view.validate_timestamp(header_data[AuthConfig.TIMESTAMP_HEADER])
+        return header_data
+
+    def get_signed_message(request, header_data):
+        public_key = header_data[AuthConfig.PUBLIC_KEY_HEADER]
+        signature = header_data[AuthConfig.SIGNATURE_HEADER]
+        timestamp = header_data[AuthConfig.TIMESTAMP_HEADER]
+        message = timestamp + (request.body or b"")
+        return get_verify_key(public_key), message, signature
+
+    def route_reads(request, header_data):
+        """Serve the reads of a GET from the read replicas, if any."""
+        if request.method != HttpMethod.GET.value:
+            return nullcontext()
+        return replica_reads(header_data[AuthConfig.PUBLIC_KEY_HEADER])
+
+    def route_writes(request, header_data, response):
+        """Pin the public key of a successful write to the primary."""
+        if request.method != HttpMethod.GET.value and status.is_success(
+            response.status_code
+        ):
+            pin_to_primary(header_data[AuthConfig.PUBLIC_KEY_HEADER])
+
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(self, request, *args, **kwargs):
+                header_data = get_auth_data(self, request)
+                if check_signature:
+                    await sync_to_async(
+                        self.verify_signature, thread_sensitive=False
+                    )(*get_signed_message(request, header_data))
+
+                request.auth_data = header_data
+                with route_reads(request, header_data):
+                    response = await view_func(self, request, *args, **kwargs)
+                route_writes(request, header_data, response)
+                return response
+            return async_wrapper
+
         @wraps(view_func)
         def wrapper(self, request, *args, **kwargs):
-            header_data = {}
-            for header in required_headers:
-                header_data[header] = self.get_header_data(request, header)
-
-            if AuthConfig.TIMESTAMP_HEADER in required_headers:
-                self.validate_timestamp(header_data[AuthConfig.TIMESTAMP_HEADER])
-
-            if verify_signature and AuthConfig.SIGNATURE_HEADER in required_headers:
-                public_key = header_data[AuthConfig.PUBLIC_KEY_HEADER]
-                signature = header_data[AuthConfig.SIGNATURE_HEADER]
-                timestamp = header_data[AuthConfig.TIMESTAMP_HEADER]
-                message = timestamp + (request.body or b"")
-                self.verify_signature(VerifyKey(public_key), message, signature)
+            header_data = get_auth_data(self, request)
+            if check_signature:
+                self.verify_signature(*get_signed_message(request, header_data))
 
             request.auth_data = header_data
-            return view_func(self, request, *args, **kwargs)
+            with route_reads(request, header_data):
+                response = view_func(self, request, *args, **kwargs)
+            route_writes(request, header_data, response)
+            return response
         return wrapper
     return decorator
 
 
+class PayloadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Payload is too large"
+    default_code = "payload_too_large"
+
+
+class VersionConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Services have changed since the base version"
+    default_code = "version_conflict"
+
+
+class UnsupportedEncoding(APIException):
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    default_detail = "Unsupported Content-Encoding"
+    default_code = "unsupported_encoding"
+
+
 class BaseAuthMixin:
     """Mixin providing base64 encoding/decoding and authentication utilities."""
 
@@ -84,6 +214,7 @@ class BaseAuthMixin:
             raise ValidationError({header_name: f"{header_name} is required"})
         return self.decode_base64(data, header_name)
 
+    @observe_phase("decode")
     def get_body(self, request):
         """Retrieve and decode the request body."""
         body = request.body
@@ -93,6 +224,68 @@ class BaseAuthMixin:
             raise ValidationError({"Body": "Body is too short"})
         return self.decode_base64(body, "Body")
 
+    def get_body_stream(self, request):
+        """Return a reader of the request body undoing its Content-Encoding.
+
+        Returns:
+            tuple: The reader and the exceptions it raises on corrupt data.
+        """
+        encoding = request.headers.get("Content-Encoding", "identity").lower()
+        if encoding == "identity":
+            return request, ()
+        codec = CODECS.get(encoding)
+        if codec is None:
+            raise UnsupportedEncoding()
+        return codec.reader(request), codec.errors
+
+    @observe_phase("decode")
+    def read_body(self, request, max_size):
+        """Stream and decode a base64 request body of signature + timestamp + payload.
+
+        The body is read, decompressed (see ``get_body_stream``) and decoded
+        chunk by chunk, so neither the encoded nor the compressed request is
+        held in memory as a whole. Bodies whose payload would exceed
+        ``max_size`` decoded bytes are rejected before anything is read, or
+        as soon as they decompress past it. Signatures cover the
+        decompressed payload.
+        """
+        max_length = 4 * -(-(SIGNED_BODY_HEADER_SIZE + max_size) // 3)
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        if content_length > max_length:
+            raise PayloadTooLarge()
+
+        stream, errors = self.get_body_stream(request)
+        chunks = []
+        pending = b""
+        read = 0
+        while chunk := self._read_chunk(stream, errors):
+            read += len(chunk)
+            if read > max_length:
+                raise PayloadTooLarge()
+            pending += chunk.translate(None, NON_BASE64_BYTES)
+            usable = len(pending) - len(pending) % 4
+            try:
+                chunks.append(binascii.a2b_base64(pending[:usable]))
+            except binascii.Error:
+                raise ValidationError({"Body": "Invalid Body format"})
+            pending = pending[usable:]
+
+        if not read:
+            raise ValidationError({"Body": "Body is required"})
+        if pending:
+            raise ValidationError({"Body": "Invalid Body format"})
+
+        body = b"".join(chunks)
+        if len(body) < SIGNED_BODY_HEADER_SIZE:
+            raise ValidationError({"Body": "Body is too short"})
+        return body
+
+    def _read_chunk(self, stream, errors):
+        try:
+            return stream.read(BODY_CHUNK_SIZE)
+        except errors:
+            raise ValidationError({"Body": "Invalid Body encoding"})
+
     def validate_timestamp(self, timestamp):
         """Validate that the timestamp is within tolerance."""
         try:
@@ -103,53 +296,134 @@ class BaseAuthMixin:
         except ValueError:
             raise ValidationError({"Timestamp": "Malformed timestamp"})
 
-    def verify_signature(self, verify_key, message, signature):
-        """Verify a cryptographic signature."""
+    @observe_phase("verify")
+    def verify_signature(self, verify_key, message, signature=None):
+        """Verify a cryptographic signature and reject replays.
+
+        Without ``signature``, ``message`` must be a signed message, i.e. the
+        signature followed by the signed data. Signed data always starts with
+        the 4-byte timestamp.
+        """
         try:
             verify_key.verify(message, signature)
         except BadSignatureError:
             raise ValidationError({"Signature": "Invalid signature"})
 
+        if signature is None:
+            signature, timestamp = message[:64], message[64:68]
+        else:
+            timestamp = message[:4]
+        self.check_replay(signature, timestamp)
 
-class CredentialView(BaseAuthMixin, APIView):
-    """API view for managing credentials."""
+    def check_replay(self, signature, timestamp):
+        """Reject a verified signature that has already been accepted."""
+        if replay_guard is None:
+            return
+        timestamp_int = int.from_bytes(timestamp, byteorder="little")
+        if replay_guard.is_replay(bytes(signature), timestamp_int):
+            raise ValidationError({"Signature": "Replayed signature"})
 
-    allowed_methods = [
-        HttpMethod.GET.value,
-        HttpMethod.POST.value,
-        HttpMethod.DELETE.value,
-    ]
 
-    def dispatch(self, request, *args, **kwargs):
-        """Override dispatch to enforce allowed methods."""
-        if request.method not in self.allowed_methods:
-            return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
-        return super().dispatch(request, *args, **kwargs)
+class CredentialMixin(BaseAuthMixin):
+    """Credential lookup and rotation shared by the sync and async views."""
+
+    def encode_entropy(self, entropy):
+        """Encode stored entropy for a response; missing entropy stays None."""
+        if entropy is None:
+            return None
+        return self.encode_base64(entropy, "entropy")
 
-    def generate_protector(self):
-        """Generate a random 32-byte protector encoded in base64."""
-        random_bytes = bytes([random.randint(0, 255) for _ in range(32)])
-        return self.encode_base64(random_bytes, "random_bytes")
+    def _credential_queryset(self, public_key, protector, hashed_pin=None):
+        """Build a queryset matching a single credential.
+
+        Keys, protectors and PINs are stored as raw bytes, so the decoded
+        headers are used as is. Profiles are keyed by their public key, so
+        filtering on ``profile_id`` is served by the ``(profile, protector)``
+        unique index in one query.
+        """
+        filters = {"profile_id": public_key, "protector": protector}
+        if hashed_pin is not None:
+            filters["pin"] = hashed_pin
+
+        return Credential.objects.filter(**filters)
 
     def _get_credential(self, public_key, protector, hashed_pin=None):
-        """Retrieve a credential based on provided data."""
-        profile = Profile.objects.filter(
-            public_key=self.encode_base64(public_key, "public_key")
+        """Retrieve an unexpired credential based on provided data."""
+        return self._credential_queryset(
+            public_key, protector, hashed_pin
+        ).live().first()
+
+    def check_rate_limit(self, public_key, protector):
+        """Take an unlock attempt, answering 429 with Retry-After if exhausted."""
+        if credential_rate_limiter is None:
+            return
+        wait = credential_rate_limiter.acquire(public_key, protector)
+        if wait:
+            raise Throttled(wait=math.ceil(wait))
+
+    def record_unlock(self, public_key, protector, unlocked):
+        """Track an unlock attempt; failures are charged to the public key.
+
+        Returns:
+            bool: True if the credential must be deleted after too many
+            mismatches.
+        """
+        if credential_rate_limiter is None:
+            return False
+        if unlocked:
+            credential_rate_limiter.record_success(public_key, protector)
+            return False
+        return credential_rate_limiter.record_failure(public_key, protector)
+
+    async def acheck_rate_limit(self, public_key, protector):
+        """``check_rate_limit`` in a worker thread.
+
+        The cache store makes network round trips, which would block the
+        event loop.
+        """
+        if credential_rate_limiter is not None:
+            await sync_to_async(self.check_rate_limit, thread_sensitive=False)(
+                public_key, protector
+            )
+
+    async def arecord_unlock(self, public_key, protector, unlocked):
+        """``record_unlock`` in a worker thread, see ``acheck_rate_limit``."""
+        if credential_rate_limiter is None:
+            return False
+        return await sync_to_async(self.record_unlock, thread_sensitive=False)(
+            public_key, protector, unlocked
+        )
+
+    def _lock_profile(self, public_key):
+        """Retrieve a profile by public key and lock its row.
+
+        Must be called inside a transaction; concurrent credential writes for
+        the same profile are serialized on this lock.
+        """
+        return Profile.objects.select_for_update().only("public_key").filter(
+            public_key=public_key
         ).first()
-        if not profile:
-            return None
 
-        filters = {
-            "profile": profile,
-            "protector": self.encode_base64(protector, "protector"),
-        }
-        if hashed_pin is not None:
-            filters["pin"] = self.encode_base64(hashed_pin, "hashed_pin")
+    def _rotate_credential(self, public_key, hashed_pin, entropy):
+        """Atomically evict stale credentials and create a new one.
+
+        Returns:
+            str | None: Base64-encoded protector, or None if there is no
+            profile for ``public_key``.
+        """
+        with transaction.atomic():
+            profile = self._lock_profile(public_key)
+            if not profile:
+                invalidate_profile(public_key)
+                return None
 
-        return Credential.objects.filter(**filters).first()
+            return self._create_credential(profile, hashed_pin, entropy)
 
     def _create_credential(self, profile, hashed_pin, entropy):
-        """Create or retrieve a credential, enforcing a max of 10 credentials per profile.
+        """Create a credential, enforcing a max of 10 credentials per profile.
+
+        The caller must hold the profile lock (see ``_lock_profile``) so that
+        the eviction and the insert are applied atomically.
 
         Args:
             profile (Profile): The associated profile.
@@ -159,20 +433,166 @@ class CredentialView(BaseAuthMixin, APIView):
         Returns:
             str: Base64-encoded protector.
         """
-        protector = self.generate_protector()
-
-        credentials = Credential.objects.filter(profile=profile)
-        if credentials.count() >= AuthConfig.MAX_CREDENTIALS_PER_PROFILE:
-            oldest_credential = credentials.order_by('created_at').first()
-            oldest_credential.delete()
+        protector = generate_protector()
 
+        self._evict_credentials(
+            profile, AuthConfig.MAX_CREDENTIALS_PER_PROFILE - 1
+        )
         Credential.objects.create(
             profile=profile,
-            pin=self.encode_base64(hashed_pin, "hashed_pin"),
+            pin=hashed_pin,
             protector=protector,
-            entropy=self.encode_base64(entropy, "entropy"),
+            entropy=entropy,
         )
-        return protector
+        return self.encode_base64(protector, "protector")
+
+    def _evict_credentials(self, profile, keep):
+        """Delete all but the ``keep`` newest credentials of a profile.
+
+        Returns:
+            int: Number of evicted credentials.
+        """
+        evicted = Credential.objects.evict(profile, keep)
+        if evicted:
+            CREDENTIAL_EVICTIONS.inc(evicted)
+        return evicted
+
+    def _parse_batch(self, payload):
+        """Parse and validate a JSON list of batch operations.
+
+        Each operation is an object with an ``op`` (see ``BatchOperation``)
+        and the base64 fields listed in ``BATCH_OPERATION_FIELDS``.
+
+        Returns:
+            list: ``(BatchOperation, fields)`` pairs with decoded fields.
+        """
+        try:
+            operations = json.loads(payload)
+        except (UnicodeDecodeError, ValueError):
+            raise ValidationError({"Body": "Invalid Body format"})
+        if not isinstance(operations, list) or not operations:
+            raise ValidationError({"Body": "Operations are required"})
+        if len(operations) > AuthConfig.MAX_BATCH_OPERATIONS:
+            raise ValidationError({"Body": "Too many operations"})
+
+        parsed = []
+        for operation in operations:
+            try:
+                op = BatchOperation(operation["op"])
+            except (KeyError, TypeError, ValueError):
+                raise ValidationError({"op": "Invalid op"})
+            fields = {}
+            for field in BATCH_OPERATION_FIELDS[op]:
+                value = operation.get(field)
+                if not isinstance(value, str):
+                    raise ValidationError({field: f"{field} is required"})
+                fields[field] = self.decode_base64(value, field)
+            parsed.append((op, fields))
+
+        creates = sum(op is BatchOperation.CREATE for op, _ in parsed)
+        if creates > AuthConfig.MAX_CREDENTIALS_PER_PROFILE:
+            raise ValidationError({"Body": "Too many credentials"})
+        return parsed
+
+    def _apply_batch(self, public_key, operations):
+        """Apply batch operations atomically under the profile lock.
+
+        Fetches run first, then deletes, then creates, each as one query
+        regardless of the number of items.
+
+        Returns:
+            list | None: Per-operation results in request order, or None if
+            there is no profile for ``public_key``.
+        """
+        grouped = defaultdict(list)
+        for index, (op, fields) in enumerate(operations):
+            grouped[op].append((index, fields))
+        results = [None] * len(operations)
+
+        with transaction.atomic():
+            profile = self._lock_profile(public_key)
+            if not profile:
+                invalidate_profile(public_key)
+                return None
+            credentials = Credential.objects.filter(profile=profile)
+
+            fetches = grouped[BatchOperation.FETCH]
+            if fetches:
+                now = timezone.now()
+                stored = {
+                    bytes(credential.protector): credential
+                    for credential in credentials.live(now).filter(
+                        protector__in=[f["protector"] for _, f in fetches]
+                    ).only("protector", "pin", "entropy", "last_used_at")
+                }
+                touched = set()
+                for index, fields in fetches:
+                    credential = stored.get(fields["protector"])
+                    if credential and bytes(credential.pin) == fields["pin"]:
+                        results[index] = {
+                            "status": status.HTTP_200_OK,
+                            "entropy": self.encode_entropy(credential.entropy),
+                        }
+                        if credential.touch_due(now):
+                            touched.add(credential.pk)
+                    else:
+                        results[index] = {"status": status.HTTP_403_FORBIDDEN}
+                if touched:
+                    credentials.filter(pk__in=touched).update(last_used_at=now)
+
+            deletes = grouped[BatchOperation.DELETE]
+            if deletes:
+                existing = {bytes(protector) for protector in credentials.filter(
+                    protector__in=[f["protector"] for _, f in deletes]
+                ).values_list("protector", flat=True)}
+                credentials.filter(protector__in=existing).delete()
+                for index, fields in deletes:
+                    results[index] = {
+                        "status": status.HTTP_200_OK
+                        if fields["protector"] in existing
+                        else status.HTTP_403_FORBIDDEN
+                    }
+
+            creates = grouped[BatchOperation.CREATE]
+            if creates:
+                new_credentials = [
+                    Credential(
+                        profile=profile,
+                        pin=fields["pin"],
+                        protector=generate_protector(),
+                        entropy=fields["entropy"],
+                    )
+                    for _, fields in creates
+                ]
+                Credential.objects.bulk_create(new_credentials)
+                self._evict_credentials(
+                    profile, AuthConfig.MAX_CREDENTIALS_PER_PROFILE
+                )
+                for (index, _), credential in zip(creates, new_credentials):
+                    results[index] = {
+                        "status": status.HTTP_200_OK,
+                        "protector": self.encode_base64(
+                            credential.protector, "protector"
+                        ),
+                    }
+
+        return results
+
+
+class CredentialView(CredentialMixin, APIView):
+    """API view for managing credentials."""
+
+    allowed_methods = [
+        HttpMethod.GET.value,
+        HttpMethod.POST.value,
+        HttpMethod.DELETE.value,
+    ]
+
+    def dispatch(self, request, *args, **kwargs):
+        """Override dispatch to enforce allowed methods."""
+        if request.method not in self.allowed_methods:
+            return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+        return super().dispatch(request, *args, **kwargs)
 
     @require_auth_headers([
         AuthConfig.PUBLIC_KEY_HEADER,
@@ -186,13 +606,22 @@ class CredentialView(BaseAuthMixin, APIView):
         public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
         hashed_pin = auth_data[AuthConfig.HASHED_PIN_HEADER]
         protector = auth_data[AuthConfig.PROTECTOR_HEADER]
+        self.check_rate_limit(public_key, protector)
 
         credential = self._get_credential(public_key, protector, hashed_pin)
+        if self.record_unlock(public_key, protector, credential is not None):
+            self._credential_queryset(public_key, protector).delete()
         if not credential:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
+        now = timezone.now()
+        if credential.touch_due(now):
+            Credential.objects.filter(
+                profile_id=credential.profile_id, pk=credential.pk
+            ).update(last_used_at=now)
+
         return Response(
-            credential.entropy,
+            self.encode_entropy(credential.entropy),
             content_type="application/json",
             status=status.HTTP_200_OK,
         )
@@ -206,22 +635,22 @@ class CredentialView(BaseAuthMixin, APIView):
         auth_data = request.auth_data
         public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
         hashed_pin = auth_data[AuthConfig.HASHED_PIN_HEADER]
-        body = self.get_body(request)
+        body = self.read_body(request, AuthConfig.MAX_ENTROPY_SIZE)
 
         signature = body[:64]
         timestamp = body[64:68]
         entropy = body[68:]
 
         self.validate_timestamp(timestamp)
-        self.verify_signature(VerifyKey(public_key), timestamp + entropy, signature)
+        self.verify_signature(get_verify_key(public_key), timestamp + entropy, signature)
 
-        profile = Profile.objects.filter(
-            public_key=self.encode_base64(public_key, "public_key")
-        ).first()
-        if not profile:
+        if not profile_exists(public_key):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        protector = self._rotate_credential(public_key, hashed_pin, entropy)
+        if not protector:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        protector = self._create_credential(profile, hashed_pin, entropy)
         return Response(
             protector,
             content_type="application/json",
@@ -239,20 +668,225 @@ class CredentialView(BaseAuthMixin, APIView):
         public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
         protector = auth_data[AuthConfig.PROTECTOR_HEADER]
 
-        credential = self._get_credential(public_key, protector)
-        if not credential:
+        deleted, _ = self._credential_queryset(public_key, protector).delete()
+        if not deleted:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        credential.delete()
         return Response(status=status.HTTP_200_OK)
 
 
-class ProfileView(BaseAuthMixin, APIView):
+class CredentialBatchView(CredentialMixin, APIView):
+    """API view for applying many credential operations in one request."""
+
+    allowed_methods = [
+        HttpMethod.POST.value,
+    ]
+
+    def dispatch(self, request, *args, **kwargs):
+        """Override dispatch to enforce allowed methods."""
+        if request.method not in self.allowed_methods:
+            return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+        return super().dispatch(request, *args, **kwargs)
+
+    @require_auth_headers([AuthConfig.PUBLIC_KEY_HEADER])
+    def post(self, request):
+        """Handle POST request with a signed list of credential operations.
+
+        The body is the base64 of signature + timestamp + a JSON list of
+        operations; the response lists a result per operation.
+        """
+        auth_data = request.auth_data
+        public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
+        body = self.read_body(request, AuthConfig.MAX_BATCH_SIZE)
+
+        timestamp = body[64:68]
+
+        self.validate_timestamp(timestamp)
+        self.verify_signature(get_verify_key(public_key), body)
+        operations = self._parse_batch(body[68:])
+
+        results = self._apply_batch(public_key, operations)
+        if results is None:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class ServicesMixin(BaseAuthMixin):
+    """Versioned services storage shared by the sync and async profile views.
+
+    ``services`` holds a snapshot; PATCH requests append signed patches on top
+    of it (see ``profiles.patches``), which are folded into the snapshot by
+    compaction. Every change increments ``services_version``.
+    """
+
+    VERSION_FIELDS = ("services_hash", "services_version", "snapshot_version")
+
+    def _get_profile(self, public_key, *fields):
+        """Retrieve a profile by public key, optionally loading only ``fields``.
+
+        Unknown keys are answered from the profile existence cache without
+        touching the database.
+        """
+        if not profile_exists(public_key):
+            return None
+        profiles = Profile.objects.filter(public_key=public_key)
+        if fields:
+            profiles = profiles.only(*fields)
+        profile = profiles.first()
+        if not profile:
+            invalidate_profile(public_key)
+        return profile
+
+    def get_since(self, request):
+        """Parse the optional ``since`` version of a delta request."""
+        since = request.GET.get("since")
+        if since is None:
+            return None
+        if not since.isdigit():
+            raise ValidationError({"since": "Invalid since"})
+        return int(since)
+
+    def _get_services(self, public_key):
+        """Retrieve a profile with its services, pending patches applied.
+
+        Returns:
+            tuple: The profile, or None if there is none, and its base64
+            services.
+        """
+        profile = self._get_profile(public_key)
+        if not profile:
+            return None, None
+        return current_services(profile)
+
+    def _get_services_delta(self, public_key, since):
+        """Retrieve the changes to a profile's services after ``since``.
+
+        Clients at a version whose patches were compacted away (or unknown to
+        the server) get the snapshot and the patches on top of it instead.
+
+        Returns:
+            tuple: The profile, or None if there is none, and a dict with the
+            current ``version``, the base64 signed ``patches`` in order and,
+            if needed, the base64 ``snapshot`` at ``snapshot_version``.
+        """
+        for _ in range(MATERIALIZE_ATTEMPTS):
+            profile = self._get_profile(public_key, *self.VERSION_FIELDS)
+            if not profile or not profile.services_hash:
+                return profile, None
+
+            delta = {"version": profile.services_version}
+            start = since
+            if not profile.snapshot_version <= since <= profile.services_version:
+                # One query for the snapshot and the versions it goes with.
+                profile = self._get_profile(public_key)
+                if not profile:
+                    return None, None
+                start = profile.snapshot_version
+                delta = {
+                    "version": profile.services_version,
+                    "snapshot": profile.services,
+                    "snapshot_version": start,
+                }
+
+            patches = pending_patches(profile, start)
+            if patches is not None:
+                delta["patches"] = [
+                    self.encode_base64(bytes(signature) + bytes(patch), "patch")
+                    for signature, patch in patches
+                ]
+                return profile, delta
+        raise RuntimeError("Services changed while being read")
+
+    def _replace_services(self, public_key, services):
+        """Replace the services snapshot and drop all patches.
+
+        Args:
+            public_key (bytes): Raw public key.
+            services (bytes | None): Decoded services, None to clear them.
+
+        Returns:
+            bool: False if there is no profile for ``public_key``.
+        """
+        encoded_services = None
+        if services:
+            encoded_services = self.encode_base64(services, "services")
+        with transaction.atomic():
+            updated = Profile.objects.filter(public_key=public_key).update(
+                services=encoded_services,
+                services_hash=hash_services(encoded_services),
+                services_size=len(services) if services else 0,
+                services_version=F("services_version") + 1,
+                snapshot_version=F("services_version") + 1,
+            )
+            if updated:
+                ServicesPatch.objects.filter(profile_id=public_key).delete()
+        if not updated:
+            invalidate_profile(public_key)
+        return bool(updated)
+
+    def _append_patch(self, public_key, body):
+        """Append a signed patch under the profile lock.
+
+        The patch must apply to the current version (optimistic concurrency);
+        once ``SERVICES_MAX_PENDING_PATCHES`` are pending they are compacted
+        right away.
+
+        Args:
+            public_key (bytes): Raw public key.
+            body (bytes): Verified signature + timestamp + patch.
+
+        Returns:
+            Profile | None: The updated profile, or None if there is no
+            profile for ``public_key``.
+        """
+        signature = body[:SIGNED_BODY_HEADER_SIZE]
+        patch = body[SIGNED_BODY_HEADER_SIZE:]
+        try:
+            base_version, splices = parse_patch(patch)
+        except InvalidPatch:
+            raise ValidationError({"Body": "Invalid patch"})
+
+        with transaction.atomic():
+            profile = Profile.objects.select_for_update().only(
+                *self.VERSION_FIELDS, "services_size"
+            ).filter(public_key=public_key).first()
+            if not profile:
+                invalidate_profile(public_key)
+                return None
+            if base_version != profile.services_version:
+                raise VersionConflict()
+            try:
+                size = patched_size(profile.services_size, splices)
+            except InvalidPatch:
+                raise ValidationError({"Body": "Invalid patch"})
+            if size > settings.PROFILE_SERVICES_MAX_SIZE:
+                raise PayloadTooLarge()
+
+            profile.services_version += 1
+            profile.services_hash = hash_patch(profile.services_hash, patch)
+            profile.services_size = size
+            ServicesPatch.objects.create(
+                profile=profile,
+                version=profile.services_version,
+                signature=bytes(signature),
+                patch=bytes(patch),
+            )
+            profile.save(update_fields=[
+                "services_version", "services_hash", "services_size"
+            ])
+            if profile.pending_patches >= settings.SERVICES_MAX_PENDING_PATCHES:
+                compact_services(public_key)
+        return profile
+
+
+class ProfileView(ServicesMixin, APIView):
     """API view for managing profiles."""
 
     allowed_methods = [
         HttpMethod.GET.value,
         HttpMethod.POST.value,
+        HttpMethod.PATCH.value,
         HttpMethod.DELETE.value,
     ]
 
@@ -262,57 +896,106 @@ class ProfileView(BaseAuthMixin, APIView):
             return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
         return super().dispatch(request, *args, **kwargs)
 
-    def _get_profile(self, public_key):
-        """Retrieve a profile by public key."""
-        return Profile.objects.filter(
-            public_key=self.encode_base64(public_key, "public_key")
-        ).first()
-
     @require_auth_headers([
         AuthConfig.PUBLIC_KEY_HEADER,
         AuthConfig.TIMESTAMP_HEADER,
         AuthConfig.SIGNATURE_HEADER,
     ], verify_signature=True)
     def get(self, request):
-        """Handle GET request to retrieve profile services."""
+        """Handle GET request to retrieve profile services.
+
+        The services version hash is sent as an ``ETag``; a matching
+        ``If-None-Match`` is answered with 304 without reading the services
+        blob. With ``?since=N`` only the changes after version N are sent.
+        """
         auth_data = request.auth_data
         public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
-
-        profile = self._get_profile(public_key)
+        if_none_match = request.headers.get("If-None-Match")
+        since = self.get_since(request)
+
+        if if_none_match:
+            profile = self._get_profile(public_key, *self.VERSION_FIELDS)
+            if not profile:
+                return Response(status=status.HTTP_403_FORBIDDEN)
+            etag = f'"{profile.services_hash}"'
+            if profile.services_hash and etag_matches(if_none_match, etag):
+                return Response(
+                    headers={"ETag": etag},
+                    status=status.HTTP_304_NOT_MODIFIED,
+                )
+
+        if since is None:
+            profile, data = self._get_services(public_key)
+        else:
+            profile, data = self._get_services_delta(public_key, since)
         if not profile:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        if not profile.services:
+        if not profile.services_hash:
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         return Response(
-            profile.services,
+            data,
+            headers={"ETag": f'"{profile.services_hash}"'},
             content_type="application/json",
             status=status.HTTP_200_OK,
         )
 
     @require_auth_headers([AuthConfig.PUBLIC_KEY_HEADER])
     def post(self, request):
-        """Handle POST request to update profile services."""
+        """Handle POST request to replace profile services.
+
+        The body is streamed and the signed message is verified in place;
+        ``services`` is a zero-copy view into the decoded body.
+        """
         auth_data = request.auth_data
         public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
-        body = self.get_body(request)
+        body = self.read_body(request, settings.PROFILE_SERVICES_MAX_SIZE)
 
-        signature = body[:64]
         timestamp = body[64:68]
-        services = body[68:]
+        services = memoryview(body)[68:]
 
         self.validate_timestamp(timestamp)
-        self.verify_signature(VerifyKey(public_key), timestamp + services, signature)
+        self.verify_signature(get_verify_key(public_key), body)
 
-        profile = self._get_profile(public_key)
-        if not profile:
+        if not profile_exists(public_key):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        if not self._replace_services(public_key, services):
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        profile.services = self.encode_base64(services, "services")
-        profile.save()
         return Response(status=status.HTTP_200_OK)
 
+    @require_auth_headers([AuthConfig.PUBLIC_KEY_HEADER])
+    def patch(self, request):
+        """Handle PATCH request to change profile services incrementally.
+
+        The body is the base64 of signature + timestamp + patch, the patch
+        naming the version it applies to; a stale version is answered with
+        409. The response holds the new version.
+        """
+        auth_data = request.auth_data
+        public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
+        body = self.read_body(request, settings.SERVICES_PATCH_MAX_SIZE)
+
+        timestamp = body[64:68]
+
+        self.validate_timestamp(timestamp)
+        self.verify_signature(get_verify_key(public_key), body)
+
+        if not profile_exists(public_key):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        profile = self._append_patch(public_key, memoryview(body))
+        if not profile:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        return Response(
+            {"version": profile.services_version},
+            headers={"ETag": f'"{profile.services_hash}"'},
+            status=status.HTTP_200_OK,
+        )
+
     @require_auth_headers([
         AuthConfig.PUBLIC_KEY_HEADER,
         AuthConfig.TIMESTAMP_HEADER,
@@ -323,13 +1006,13 @@ class ProfileView(BaseAuthMixin, APIView):
         auth_data = request.auth_data
         public_key = auth_data[AuthConfig.PUBLIC_KEY_HEADER]
 
-        profile = self._get_profile(public_key)
+        profile = self._get_profile(public_key, "services_hash")
         if not profile:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        if not profile.services:
+        if not profile.services_hash:
             return Response(status=status.HTTP_204_NO_CONTENT)
 
-        profile.services = None
-        profile.save()
+        if not self._replace_services(public_key, None):
+            return Response(status=status.HTTP_403_FORBIDDEN)
         return Response(status=status.HTTP_200_OK)
@@ -1,13 +1,21 @@
+import copy
 import os
 from pathlib import Path
 
 from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 load_dotenv()
 
+
+def env_bool(name, default=False):
+    """Read a boolean flag from the environment."""
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
 
@@ -34,6 +42,13 @@ CORS_ALLOW_HEADERS = list(default_headers) + [
     "Protector",
     "Timestamp",
     "Signature",
+    "If-None-Match",
+    "Content-Encoding",
+]
+
+CORS_EXPOSE_HEADERS = [
+    "ETag",
+    "Retry-After",
 ]
 
 # Application definition
@@ -54,15 +69,77 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "api.middleware.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "api.middleware.WebOnlyMiddleware",
+]
+
+# Applied by WebOnlyMiddleware to every request outside API_PATH_PREFIX.
+# The API authenticates with signed headers and needs none of these.
+
+WEB_ONLY_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+API_PATH_PREFIX = "/api/"
+
+# Request metrics, exposed at /metrics/ (not routed by the gateway). Set
+# PROMETHEUS_MULTIPROC_DIR to aggregate them across gunicorn workers.
+
+METRICS_ENABLED = env_bool("METRICS_ENABLED")
+
+# Management commands (e.g. purge_expired_credentials) do not serve /metrics/.
+# Run with the workers' PROMETHEUS_MULTIPROC_DIR, and their counters are
+# served with the workers' metrics. Otherwise, set PROMETHEUS_PUSHGATEWAY
+# (host:port) to push them to a Prometheus Pushgateway after each run.
+
+PROMETHEUS_PUSHGATEWAY = os.getenv("PROMETHEUS_PUSHGATEWAY", "")
+
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, "api.metrics.MetricsMiddleware")
+
+# The admin checks only look at MIDDLEWARE; the session, auth and messages
+# middleware it needs are applied through WEB_ONLY_MIDDLEWARE instead.
+
+SILENCED_SYSTEM_CHECKS = [
+    "admin.E408",
+    "admin.E409",
+    "admin.E410",
+]
+
+ADMIN_ENABLED = env_bool("ADMIN_ENABLED")
+
+# Admin changelists show the planner's row estimate for tables estimated
+# above this many rows instead of counting them (PostgreSQL and MySQL).
+
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv("ADMIN_EXACT_COUNT_LIMIT", 10000))
+
+# Lean configuration for API workers: drop the apps and middleware only the
+# admin and static files need, so that workers boot faster and smaller.
+# Management commands such as migrate and collectstatic need the full setup.
+
+API_ONLY = env_bool("API_ONLY")
+
+WEB_ONLY_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+]
+
+if API_ONLY:
+    if ADMIN_ENABLED:
+        raise ImproperlyConfigured("ADMIN_ENABLED requires API_ONLY to be off")
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in WEB_ONLY_APPS]
+    WEB_ONLY_MIDDLEWARE = []
+
 ROOT_URLCONF = "backend.urls"
 
 TEMPLATES = [
@@ -83,6 +160,15 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "backend.wsgi.application"
 
+ASGI_APPLICATION = "backend.asgi.application"
+
+# SERVER_MODE (read by gunicorn.conf.py) selects the WSGI or ASGI server.
+# Under ASGI the API uses async views and the connection pool by default.
+
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
+
+ASYNC_API_VIEWS = env_bool("ASYNC_API_VIEWS", SERVER_MODE == "asgi")
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -101,9 +187,138 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
         "HOST": os.getenv("DB_HOST", ""),
         "PORT": os.getenv("DB_PORT", 5432),
+        "CONN_MAX_AGE": int(
+            os.getenv("DB_CONN_MAX_AGE", 0 if SERVER_MODE == "asgi" else 60)
+        ),
+        "CONN_HEALTH_CHECKS": env_bool("DB_CONN_HEALTH_CHECKS", True),
+        "OPTIONS": {},
     }
 }
 
+# Connection pooling (psycopg 3), on by default under ASGI. There every
+# request runs its queries in a new thread: persistent connections are never
+# reused and pile up, and without them each request in flight holds its own
+# connection, so concurrent clients run into PostgreSQL's max_connections.
+# The pool caps connections at DB_POOL_MAX_SIZE per worker. Django requires
+# persistent connections to be off when the pool is enabled.
+
+if env_bool("DB_POOL", SERVER_MODE == "asgi"):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+        "timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),
+    }
+
+# Read replicas
+# Each host (or host:port) in the comma-separated DB_REPLICA_HOSTS becomes a
+# "replicaN" database with the primary's credentials. GET requests of the API
+# read from a random replica; everything else uses the primary. A public key
+# that wrote through the API reads from the primary for the next
+# DB_REPLICA_STICKY_SECONDS, which should exceed the replication lag. The
+# marker is kept in CACHES, so use a shared backend with several workers.
+
+DATABASE_REPLICAS = []
+
+for index, replica_host in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), 1
+):
+    host, _, port = replica_host.strip().partition(":")
+    alias = f"replica{index}"
+    DATABASES[alias] = copy.deepcopy(DATABASES["default"])
+    DATABASES[alias].update(HOST=host, TEST={"MIRROR": "default"})
+    if port:
+        DATABASES[alias]["PORT"] = port
+    DATABASE_REPLICAS.append(alias)
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ["api.db_router.ReplicaRouter"]
+
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", 10))
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory is per process, out of reach of management commands: it only
+# caches existing profiles. Use the file-based backend (or a shared one) to
+# also cache unknown public keys, which the add_public_key command then
+# invalidates for the API workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "passcryptum"),
+    }
+}
+
+# Compressed responses get their own cache, and are not cached unless
+# COMPRESSION_CACHE_BACKEND is set: they are large, and the default local
+# memory cache would hold them in every worker.
+
+if os.getenv("COMPRESSION_CACHE_BACKEND"):
+    CACHES["compression"] = {
+        "BACKEND": os.getenv("COMPRESSION_CACHE_BACKEND"),
+        "LOCATION": os.getenv("COMPRESSION_CACHE_LOCATION", ""),
+    }
+
+PROFILE_CACHE_TIMEOUT = int(os.getenv("PROFILE_CACHE_TIMEOUT", 300))
+
+# Largest decoded services payload accepted by POST /api/profiles/, in bytes.
+
+PROFILE_SERVICES_MAX_SIZE = int(
+    os.getenv("PROFILE_SERVICES_MAX_SIZE", 50 * 1024 * 1024)
+)
+
+# Compression of API responses of at least COMPRESSION_MIN_SIZE bytes, as
+# negotiated through Accept-Encoding: zstd (with the optional zstandard
+# package installed) or gzip. Compressed services of at least
+# COMPRESSION_CACHE_MIN_SIZE bytes are cached per ETag in the COMPRESSION_CACHE
+# alias of CACHES (None disables), unless they compress to more than
+# COMPRESSION_CACHE_MAX_SIZE bytes. Request bodies may be sent with
+# Content-Encoding whatever these settings.
+
+COMPRESSION_ENABLED = env_bool("COMPRESSION_ENABLED", True)
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+
+COMPRESSION_CACHE_MIN_SIZE = int(
+    os.getenv("COMPRESSION_CACHE_MIN_SIZE", 64 * 1024)
+)
+
+# The default maximum item size of memcached.
+
+COMPRESSION_CACHE_MAX_SIZE = int(
+    os.getenv("COMPRESSION_CACHE_MAX_SIZE", 1024 * 1024)
+)
+
+COMPRESSION_CACHE = "compression" if "compression" in CACHES else None
+
+COMPRESSION_CACHE_TIMEOUT = int(os.getenv("COMPRESSION_CACHE_TIMEOUT", 3600))
+
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+
+# Payloads are mostly base64 of encrypted data, with no repeated strings to
+# find: Huffman coding alone compresses them as well, several times faster.
+
+COMPRESSION_GZIP_HUFFMAN_ONLY = env_bool("COMPRESSION_GZIP_HUFFMAN_ONLY", True)
+
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+
+# Versioned services: largest decoded PATCH /api/profiles/ payload, and the
+# number of pending patches at which a write compacts them into the snapshot
+# right away. The compact_services command folds smaller backlogs.
+
+SERVICES_PATCH_MAX_SIZE = int(os.getenv("SERVICES_PATCH_MAX_SIZE", 1024 * 1024))
+
+SERVICES_MAX_PENDING_PATCHES = int(
+    os.getenv("SERVICES_MAX_PENDING_PATCHES", 100)
+)
+
+SERVICES_COMPACT_MIN_PATCHES = int(
+    os.getenv("SERVICES_COMPACT_MIN_PATCHES", 10)
+)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -141,13 +356,122 @@ STATIC_URL = "/static/"
 
 STATIC_ROOT = BASE_DIR / "collected_static"
 
+# collectstatic writes content-hashed names (mapped in staticfiles.json) with
+# .gz siblings, which the gateway serves as immutable. Pages using
+# {% static %} need collectstatic to have run.
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "api.staticfiles.CompressedManifestStaticFilesStorage",
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Signature verification
+# Decoded Ed25519 verify keys are kept in a per-process LRU cache.
+
+VERIFY_KEY_CACHE_SIZE = int(os.getenv("VERIFY_KEY_CACHE_SIZE", 1024))
+
+VERIFY_KEY_CACHE_TTL = int(os.getenv("VERIFY_KEY_CACHE_TTL", 3600))
+
+# Replay protection for signed requests: "memory" (per process), "cache"
+# (shared through CACHES) or empty to disable. Ed25519 signatures are
+# deterministic, so clients must not resend identical signed requests
+# within the same second once this is enabled.
+
+REPLAY_GUARD = os.getenv("REPLAY_GUARD", "")
+
+REPLAY_GUARD_BUCKET_SECONDS = int(os.getenv("REPLAY_GUARD_BUCKET_SECONDS", 10))
+
+# The memory guard keeps a fixed-size Bloom filter per bucket, sized for
+# REPLAY_GUARD_BUCKET_CAPACITY signatures (10k req/s per process with 10 s
+# buckets) at the given rate of fresh requests wrongly rejected. With the
+# 300 s timestamp tolerance the defaults take about 22 MB per process.
+
+REPLAY_GUARD_BUCKET_CAPACITY = int(
+    os.getenv("REPLAY_GUARD_BUCKET_CAPACITY", 100000)
+)
+
+REPLAY_GUARD_FALSE_POSITIVE_RATE = float(
+    os.getenv("REPLAY_GUARD_FALSE_POSITIVE_RATE", 1e-6)
+)
+
+# Credential protectors
+# Optional per-process pool of pre-generated protectors for burst creation;
+# a size of 0 generates each protector on demand. The pool is topped up once
+# it holds no more than the threshold, half its size by default.
+
+PROTECTOR_POOL_SIZE = int(os.getenv("PROTECTOR_POOL_SIZE", 0))
+
+PROTECTOR_POOL_REFILL_THRESHOLD = int(
+    os.getenv("PROTECTOR_POOL_REFILL_THRESHOLD", PROTECTOR_POOL_SIZE // 2)
+)
+
+# Credential expiry
+# Credentials not used for CREDENTIAL_TTL seconds are treated as absent and
+# removed by the purge_expired_credentials command; 0 disables expiry. Without
+# usage tracking, the TTL counts from creation.
+
+CREDENTIAL_TTL = int(os.getenv("CREDENTIAL_TTL", 0))
+
+CREDENTIAL_TTL_TRACK_USAGE = env_bool("CREDENTIAL_TTL_TRACK_USAGE")
+
+CREDENTIAL_PURGE_BATCH_SIZE = int(os.getenv("CREDENTIAL_PURGE_BATCH_SIZE", 1000))
+
+# Hash partitions of the credentials table by profile (PostgreSQL only; 0
+# keeps one table). Applied by the credentials migrations when set before the
+# first migrate; convert a live table with manage.py partition_credentials.
+
+CREDENTIAL_PARTITIONS = int(os.getenv("CREDENTIAL_PARTITIONS", 0))
+
+# Rate limiting of credential unlocks (GET /api/credentials/): "memory" (per
+# process), "cache" (shared through CACHES) or empty to disable. Each attempt
+# takes a token from a per-protector bucket; failed attempts also take one
+# from a per-public-key bucket, so successful unlocks never exhaust it.
+# Exhausted buckets answer 429 with Retry-After. After
+# CREDENTIAL_MAX_PIN_FAILURES mismatches within CREDENTIAL_PIN_FAILURE_WINDOW
+# seconds the credential is deleted (0 disables).
+
+CREDENTIAL_RATE_LIMIT = os.getenv("CREDENTIAL_RATE_LIMIT", "")
+
+CREDENTIAL_RATE_LIMIT_BURST = int(os.getenv("CREDENTIAL_RATE_LIMIT_BURST", 10))
+
+CREDENTIAL_RATE_LIMIT_PER_MINUTE = float(
+    os.getenv("CREDENTIAL_RATE_LIMIT_PER_MINUTE", 5)
+)
+
+CREDENTIAL_RATE_LIMIT_KEY_BURST = int(
+    os.getenv("CREDENTIAL_RATE_LIMIT_KEY_BURST", 30)
+)
+
+CREDENTIAL_RATE_LIMIT_KEY_PER_MINUTE = float(
+    os.getenv("CREDENTIAL_RATE_LIMIT_KEY_PER_MINUTE", 15)
+)
+
+CREDENTIAL_RATE_LIMIT_MAX_KEYS = int(
+    os.getenv("CREDENTIAL_RATE_LIMIT_MAX_KEYS", 100000)
+)
+
+CREDENTIAL_MAX_PIN_FAILURES = int(os.getenv("CREDENTIAL_MAX_PIN_FAILURES", 0))
+
+CREDENTIAL_PIN_FAILURE_WINDOW = int(
+    os.getenv("CREDENTIAL_PIN_FAILURE_WINDOW", 86400)
+)
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',  # Оставляем только JSON-рендерер
     ],
+    # The API authenticates with signed headers, not sessions or users.
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+    'EXCEPTION_HANDLER': 'api.metrics.api_exception_handler',
 }
@@ -1,7 +1,15 @@
-# from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin
 from django.urls import include, path
 
 urlpatterns = [
-    # path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
 ]
+
+if settings.ADMIN_ENABLED:
+    urlpatterns.append(path("admin/", admin.site.urls))
+
+if settings.METRICS_ENABLED:
+    from api.metrics import metrics_view
+
+    urlpatterns.append(path("metrics/", metrics_view, name="metrics"))
@@ -0,0 +1,32 @@
+"""Load-testing and benchmark suite for the passcryptum API.
+
+Run from the backend directory, against the configured database::
+
+    python -m benchmarks --profiles 1000 --requests 20000 --output run.json
+
+By default requests go through Django's test client in-process, which also
+reports SQL queries per request. ``--url`` targets a running server instead
+(e.g. to compare the WSGI and ASGI modes under concurrency).
+
+``--stale-credentials`` bloats the table with long-expired rows to measure
+lookup latency against it; with ``CREDENTIAL_TTL`` set, compare runs with and
+without ``--purge``.
+
+Focused benchmarks, run as ``python -m benchmarks.<name>``:
+
+- ``limiter``: overhead of the rate limiter;
+- ``verify_keys``: cold and warm verify key cache;
+- ``protectors``: protector generation, pooled and not;
+- ``middleware``: time each middleware adds to an API request;
+- ``batch``: batched credential operations against single requests;
+- ``replay``: the in-memory replay guard at 10k requests per second;
+- ``lookup``: credential lookups on a table of a million rows;
+- ``sync``: full services uploads against patches;
+- ``upload``: memory traced while a services upload is handled;
+- ``compression``: compression CPU against bytes saved;
+- ``admin``: admin changelists on large tables;
+- ``static``: what a cold load of the app shell transfers through the
+  gateway;
+- ``partitioning``: credential queries on a hash-partitioned table
+  (PostgreSQL).
+"""
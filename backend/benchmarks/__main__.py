@@ -0,0 +1,134 @@
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Seed signed clients and drive API traffic against them.",
+    )
+    parser.add_argument("--profiles", type=int, default=100)
+    parser.add_argument("--credentials-per-profile", type=int, default=3)
+    parser.add_argument(
+        "--services-size",
+        type=int,
+        default=4096,
+        help="Size in bytes of seeded and uploaded services blobs.",
+    )
+    parser.add_argument(
+        "--stale-credentials",
+        type=int,
+        default=0,
+        help="Long-expired credentials to add to the seeded profiles.",
+    )
+    parser.add_argument(
+        "--purge",
+        action="store_true",
+        help="Purge expired credentials before driving traffic.",
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--mix",
+        help="Traffic mix as name=weight,... (see benchmarks.scenarios).",
+    )
+    parser.add_argument(
+        "--url",
+        help="Base URL of a running server; in-process when omitted.",
+    )
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to a file.")
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the seeded profiles instead of deleting them afterwards.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+
+    from api.verify_keys import verify_key_cache
+    from credentials.models import Credential
+
+    from . import runner
+    from .scenarios import DEFAULT_MIX, parse_mix
+    from .seed import cleanup, seed, seed_stale
+    from .storage import table_sizes
+    from .transports import HttpTransport, InProcessTransport
+
+    mix = parse_mix(options.mix) if options.mix else DEFAULT_MIX
+    transport = HttpTransport(options.url) if options.url else InProcessTransport()
+
+    identities = seed(
+        options.profiles,
+        options.credentials_per_profile,
+        options.services_size,
+    )
+    purge = None
+    try:
+        if options.stale_credentials:
+            seed_stale(identities, options.stale_credentials)
+        if options.purge:
+            purge = {"rows": Credential.objects.expired().count()}
+            start = time.perf_counter()
+            call_command("purge_expired_credentials", stdout=io.StringIO())
+            purge["duration_s"] = time.perf_counter() - start
+        if options.warmup:
+            runner.run(
+                transport,
+                identities,
+                mix,
+                argparse.Namespace(**dict(vars(options), requests=options.warmup)),
+            )
+        report = runner.run(transport, identities, mix, options)
+        report["invariants"] = runner.invariants(identities)
+        report["storage"] = table_sizes()
+        if purge:
+            report["purge"] = purge
+    finally:
+        if not options.keep:
+            cleanup(identities)
+
+    report["meta"] = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "transport": transport.name,
+        "url": options.url,
+        "database": connection.vendor,
+        "async_api_views": settings.ASYNC_API_VIEWS,
+        "credential_ttl": settings.CREDENTIAL_TTL,
+        "credential_rate_limit": settings.CREDENTIAL_RATE_LIMIT,
+        "python": platform.python_version(),
+        "options": vars(options),
+        "mix": mix,
+    }
+    if not options.url:
+        report["caches"] = {"verify_key": verify_key_cache.stats()}
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Benchmark of admin changelist rendering on large tables.
+
+Seeds profiles with credentials, then renders the Profile and Credential
+changelists with the registered admins and with their previous definitions
+(a ``list_filter`` over every public key and services blob, ``COUNT(*)``
+and ``OFFSET`` pagination)::
+
+    python manage.py collectstatic --noinput
+    ADMIN_ENABLED=1 python -m benchmarks.admin --profiles 100000
+
+Reported per page: render time, SQL queries and response size. The first
+page, a page halfway through the table and a search by key prefix are
+rendered; the previous admins had no search.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.admin")
+    parser.add_argument("--profiles", type=int, default=20000)
+    parser.add_argument("--credentials-per-profile", type=int, default=2)
+    parser.add_argument(
+        "--services-size",
+        type=int,
+        default=4096,
+        help="Size in bytes of seeded services blobs.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--skip-legacy",
+        action="store_true",
+        help="Only render the registered admins.",
+    )
+    return parser.parse_args(argv)
+
+
+def legacy_admins(site):
+    """The admins as defined before they were made to scale."""
+    from django.contrib import admin
+    from django.contrib.admin.utils import quote
+    from django.contrib.admin.views.main import ChangeList
+    from django.urls import reverse
+
+    from api.admin import encode_base64
+    from credentials.models import Credential
+    from profiles.models import Profile
+
+    class LegacyBase64ChangeList(ChangeList):
+        def url_for_result(self, result):
+            return reverse(
+                f"admin:{self.opts.app_label}_{self.opts.model_name}_change",
+                args=(quote(encode_base64(result.pk)),),
+                current_app=self.model_admin.admin_site.name,
+            )
+
+    class LegacyProfileAdmin(admin.ModelAdmin):
+        list_display = ("encoded_public_key",)
+        list_filter = ("public_key", "services")
+        ordering = ("public_key",)
+
+        def get_changelist(self, request, **kwargs):
+            return LegacyBase64ChangeList
+
+        @admin.display(description="Public key", ordering="public_key")
+        def encoded_public_key(self, obj):
+            return encode_base64(obj.public_key)
+
+    class LegacyCredentialAdmin(admin.ModelAdmin):
+        list_display = (
+            "encoded_profile",
+            "encoded_pin",
+            "encoded_protector",
+            "encoded_entropy",
+        )
+        ordering = ("profile",)
+
+        @admin.display(description="Profile", ordering="profile")
+        def encoded_profile(self, obj):
+            return encode_base64(obj.profile_id)
+
+        @admin.display(description="Pin")
+        def encoded_pin(self, obj):
+            return encode_base64(obj.pin)
+
+        @admin.display(description="Protector")
+        def encoded_protector(self, obj):
+            return encode_base64(obj.protector)
+
+        @admin.display(description="Entropy")
+        def encoded_entropy(self, obj):
+            return encode_base64(obj.entropy)
+
+    return {
+        Profile: LegacyProfileAdmin(Profile, site),
+        Credential: LegacyCredentialAdmin(Credential, site),
+    }
+
+
+def render(model_admin, params, options):
+    """Render a changelist ``options.repeat`` times and report the median."""
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext
+
+    request = RequestFactory().get("/", params)
+    request.user = User(is_active=True, is_staff=True, is_superuser=True)
+    durations = []
+    for _ in range(options.repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = model_admin.changelist_view(request)
+            response.render()
+            durations.append(time.perf_counter() - start)
+    if response.status_code != 200:
+        raise RuntimeError(f"Changelist failed: {response.status_code}")
+    return {
+        "render_ms_p50": 1000 * statistics.median(durations),
+        "queries": len(queries),
+        "bytes": len(response.content),
+    }
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+    os.environ.setdefault("ADMIN_ENABLED", "1")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.contrib import admin
+    from django.db import connection
+
+    from api.admin import KEYSET_VAR
+    from credentials.models import Credential
+    from profiles.models import Profile
+
+    from .seed import cleanup, seed
+
+    if not settings.ADMIN_ENABLED:
+        raise SystemExit("The admin benchmark needs ADMIN_ENABLED=1")
+
+    identities = seed(
+        options.profiles,
+        credentials_per_profile=options.credentials_per_profile,
+        services_size=options.services_size,
+    )
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE profiles_profile, credentials_credential")
+    legacy = legacy_admins(admin.site)
+    report = {}
+    try:
+        for model, search in (
+            (Profile, identities[0].public_key[:4]),
+            (Credential, identities[0].protectors[0][:4]),
+        ):
+            model_admin = admin.site._registry[model]
+            total = model.objects.count()
+            middle = model.objects.order_by("pk").values_list("pk", flat=True)[
+                total // 2
+            ]
+            pages = {
+                "first_page": {},
+                "middle_page": {
+                    KEYSET_VAR: model._meta.pk.value_to_string(
+                        model(pk=middle)
+                    ),
+                },
+                "search": {"q": search},
+            }
+            results = report[model._meta.model_name] = {"rows": total}
+            for page, params in pages.items():
+                results[page] = render(model_admin, params, options)
+
+            if options.skip_legacy:
+                continue
+            legacy_pages = {
+                "first_page": {},
+                "middle_page": {
+                    "p": str(total // 2 // model_admin.list_per_page + 1),
+                },
+            }
+            for page, params in legacy_pages.items():
+                results[f"legacy_{page}"] = render(
+                    legacy[model], params, options
+                )
+    finally:
+        cleanup(identities)
+
+    report["meta"] = {
+        "database": connection.vendor,
+        "admin_exact_count_limit": settings.ADMIN_EXACT_COUNT_LIMIT,
+        "options": vars(options),
+    }
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Benchmark of batched credential operations against single requests.
+
+For each of ``--sizes`` operation counts, runs ``--rounds`` rounds of that
+many credential fetches (unlocks) and creations on seeded profiles, once as
+one request per operation and once as a single signed request to
+``/api/credentials/batch/``::
+
+    python -m benchmarks.batch --sizes 1 5 10 --rounds 200
+
+Reported per size and mode: operations per second, p50/p99 latency of a
+round and the SQL queries a round takes, through Django's test client.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.batch")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--profiles", type=int, default=100)
+    return parser.parse_args(argv)
+
+
+def check(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"Request failed: {response.status_code}")
+    return response
+
+
+def fetch_single(client, identity, protectors):
+    from .signing import encode
+
+    for protector in protectors:
+        check(client.get(
+            "/api/credentials/",
+            headers={
+                "Public-Key": identity.public_key,
+                "Hashed-Pin": identity.pin,
+                "Protector": protector,
+                "Timestamp": encode(identity.timestamp()),
+            },
+        ))
+
+
+def create_single(client, identity, count):
+    for _ in range(count):
+        check(client.post(
+            "/api/credentials/",
+            identity.signed_body(os.urandom(32)),
+            content_type="text/plain",
+            headers={"Public-Key": identity.public_key, "Hashed-Pin": identity.pin},
+        ))
+
+
+def post_batch(client, identity, operations):
+    check(client.post(
+        "/api/credentials/batch/",
+        identity.signed_body(json.dumps(operations).encode("ascii")),
+        content_type="text/plain",
+        headers={"Public-Key": identity.public_key},
+    ))
+
+
+def fetch_batch(client, identity, protectors):
+    post_batch(client, identity, [
+        {"op": "fetch", "protector": protector, "pin": identity.pin}
+        for protector in protectors
+    ])
+
+
+def create_batch(client, identity, count):
+    from .signing import encode
+
+    post_batch(client, identity, [
+        {"op": "create", "pin": identity.pin, "entropy": encode(os.urandom(32))}
+        for _ in range(count)
+    ])
+
+
+def measure(run, identities, size, options):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    from .runner import percentile
+
+    client = Client()
+    durations = []
+    for _ in range(options.rounds):
+        identity = random.choice(identities)
+        start = time.perf_counter()
+        run(client, identity, size)
+        durations.append(time.perf_counter() - start)
+    with CaptureQueriesContext(connection) as queries:
+        run(client, identities[0], size)
+    durations.sort()
+    return {
+        "ops_per_s": size * len(durations) / sum(durations),
+        "p50_ms": 1000 * percentile(durations, 50),
+        "p99_ms": 1000 * percentile(durations, 99),
+        "queries": len(queries),
+    }
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+
+    from api.views import AuthConfig
+
+    from .seed import cleanup, seed
+
+    identities = seed(
+        options.profiles,
+        credentials_per_profile=AuthConfig.MAX_CREDENTIALS_PER_PROFILE,
+    )
+    # Creations evict seeded credentials, so fetches use their own profiles.
+    fetched = identities[:len(identities) // 2]
+    created = identities[len(identities) // 2:]
+
+    def fetches(fetch):
+        return lambda client, identity, size: fetch(
+            client, identity, identity.protectors[:size]
+        )
+
+    report = {}
+    try:
+        for size in options.sizes:
+            report[str(size)] = {
+                "fetch_single": measure(
+                    fetches(fetch_single), fetched, size, options
+                ),
+                "fetch_batch": measure(
+                    fetches(fetch_batch), fetched, size, options
+                ),
+                "create_single": measure(create_single, created, size, options),
+                "create_batch": measure(create_batch, created, size, options),
+            }
+    finally:
+        cleanup(identities)
+
+    report["meta"] = {"database": connection.vendor, "options": vars(options)}
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
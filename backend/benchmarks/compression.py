@@ -0,0 +1,187 @@
+"""Benchmark of response compression: CPU cost against bytes saved.
+
+Payloads are JSON strings of base64 random bytes, like the encrypted
+services the API serves. For every size, each codec (and level) reports the
+compressed size and the compression and decompression times; then a seeded
+profile is fetched in-process without compression, and per coding with the
+compressed representation cached and without the cache::
+
+    python -m benchmarks.compression --sizes 1024,65536,1048576,10485760
+"""
+import argparse
+import base64
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+import zlib
+
+from .scenarios import PROFILES_PATH
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compression")
+    parser.add_argument(
+        "--sizes",
+        default="1024,16384,262144,1048576,10485760",
+        help="Comma-separated decoded payload sizes in bytes.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--gzip-levels",
+        default="1,6,9",
+        help="Comma-separated gzip levels to compare.",
+    )
+    parser.add_argument(
+        "--zstd-levels",
+        default="1,3,9",
+        help="Comma-separated zstd levels to compare.",
+    )
+    return parser.parse_args(argv)
+
+
+def timed(function, repeat):
+    """Median duration of ``function`` in milliseconds and its result."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return 1000 * statistics.median(durations), result
+
+
+def deflate(level, strategy):
+    def compress(data):
+        compressor = zlib.compressobj(
+            level, zlib.DEFLATED, 16 + zlib.MAX_WBITS, strategy=strategy
+        )
+        return compressor.compress(data) + compressor.flush()
+    return compress
+
+
+def codecs(options):
+    for level in map(int, options.gzip_levels.split(",")):
+        yield (
+            f"gzip-{level}",
+            deflate(level, zlib.Z_DEFAULT_STRATEGY),
+            gzip.decompress,
+        )
+    yield "gzip-huffman", deflate(6, zlib.Z_HUFFMAN_ONLY), gzip.decompress
+    try:
+        import zstandard
+    except ImportError:
+        return
+    yield from (
+        (
+            f"zstd-{level}",
+            zstandard.ZstdCompressor(level=int(level)).compress,
+            zstandard.ZstdDecompressor().decompress,
+        )
+        for level in options.zstd_levels.split(",")
+    )
+
+
+def measure_codecs(payload, options):
+    report = {}
+    for name, compress, decompress in codecs(options):
+        compress_ms, compressed = timed(lambda: compress(payload), options.repeat)
+        decompress_ms, _ = timed(lambda: decompress(compressed), options.repeat)
+        report[name] = {
+            "bytes": len(compressed),
+            "saved_ratio": 1 - len(compressed) / len(payload),
+            "compress_ms": compress_ms,
+            "compress_mb_s": len(payload) / compress_ms / 1000,
+            "decompress_ms": decompress_ms,
+        }
+    return report
+
+
+def measure_requests(identity, transport, options):
+    from django.conf import settings
+    from django.test.utils import override_settings
+
+    from api.compression import CODECS
+
+    cached = {}
+    if not settings.COMPRESSION_CACHE:
+        # Without COMPRESSION_CACHE_BACKEND, cache in local memory.
+        cached = {
+            "CACHES": {
+                **settings.CACHES,
+                "compression": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "benchmarks-compression",
+                },
+            },
+            "COMPRESSION_CACHE": "compression",
+        }
+    runs = {"uncompressed": ("identity", {})}
+    for coding in CODECS:
+        runs[f"{coding}_cached"] = (coding, cached)
+        runs[f"{coding}_uncached"] = (coding, {"COMPRESSION_CACHE": None})
+
+    report = {}
+    for run, (coding, overrides) in runs.items():
+        durations = []
+        with override_settings(**overrides):
+            for _ in range(options.repeat):
+                headers = dict(
+                    identity.signed_headers(), **{"Accept-Encoding": coding}
+                )
+                start = time.perf_counter()
+                result = transport.request("GET", PROFILES_PATH, headers)
+                durations.append(time.perf_counter() - start)
+        report[run] = {
+            "bytes": len(result.content),
+            "latency_ms_p50": 1000 * statistics.median(durations),
+        }
+    return report
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+
+    from .seed import cleanup, seed
+    from .transports import InProcessTransport
+
+    transport = InProcessTransport()
+    report = {}
+    for size in map(int, options.sizes.split(",")):
+        payload = json.dumps(
+            base64.b64encode(os.urandom(size)).decode("ascii")
+        ).encode("ascii")
+        results = report[f"{size}_bytes"] = {
+            "payload_bytes": len(payload),
+            "codecs": measure_codecs(payload, options),
+        }
+        identities = seed(1, services_size=size)
+        try:
+            results["requests"] = measure_requests(
+                identities[0], transport, options
+            )
+        finally:
+            cleanup(identities)
+
+    report["meta"] = {
+        "compression_min_size": settings.COMPRESSION_MIN_SIZE,
+        "compression_cache_min_size": settings.COMPRESSION_CACHE_MIN_SIZE,
+        "compression_cache_max_size": settings.COMPRESSION_CACHE_MAX_SIZE,
+        "gzip_level": settings.COMPRESSION_GZIP_LEVEL,
+        "gzip_huffman_only": settings.COMPRESSION_GZIP_HUFFMAN_ONLY,
+        "zstd_level": settings.COMPRESSION_ZSTD_LEVEL,
+        "options": vars(options),
+    }
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Micro-benchmark of the credential rate limiter on the happy path.
+
+Times ``CredentialRateLimiter.acquire`` plus ``record_success`` for each
+store, with buckets large enough to never deny::
+
+    python -m benchmarks.limiter --iterations 100000
+
+For the end-to-end cost, run ``python -m benchmarks --mix credential_get=1``
+with and without ``CREDENTIAL_RATE_LIMIT`` (and generous bursts).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.limiter")
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument(
+        "--keys",
+        type=int,
+        default=1000,
+        help="Distinct public key/protector pairs to cycle through.",
+    )
+    parser.add_argument(
+        "--max-failures",
+        type=int,
+        default=0,
+        help="Also reset the failure counter on each unlock.",
+    )
+    return parser.parse_args(argv)
+
+
+def measure(limiter, pairs, iterations):
+    start = time.perf_counter()
+    for number in range(iterations):
+        public_key, protector = pairs[number % len(pairs)]
+        if limiter.acquire(public_key, protector):
+            raise RuntimeError("Benchmark buckets must not deny requests")
+        limiter.record_success(public_key, protector)
+    elapsed = time.perf_counter() - start
+    return {
+        "per_call_us": 1e6 * elapsed / iterations,
+        "calls_per_s": iterations / elapsed,
+    }
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+
+    from api.ratelimit import (CacheRateLimitStore, CredentialRateLimiter,
+                               MemoryRateLimitStore)
+
+    pairs = [(os.urandom(32), os.urandom(32)) for _ in range(options.keys)]
+    unlimited = (options.iterations + 1, 1e9)
+    stores = {
+        "memory": MemoryRateLimitStore(2 * options.keys),
+        "cache": CacheRateLimitStore(),
+    }
+    report = {
+        store_name: measure(
+            CredentialRateLimiter(
+                store, unlimited, unlimited, options.max_failures, 3600
+            ),
+            pairs,
+            options.iterations,
+        )
+        for store_name, store in stores.items()
+    }
+    report["meta"] = {
+        "cache_backend": settings.CACHES["default"]["BACKEND"],
+        "options": vars(options),
+    }
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark of credential lookups on a large credentials table.
+
+Seeds profiles with credentials, pads the table with filler credentials up
+to ``--rows``, then times the unlock lookup as the API resolves it (one
+query on ``profile_id`` and protector, served by the ``(profile,
+protector)`` index) and as it was resolved before (fetching the profile,
+then filtering its credentials)::
+
+    python -m benchmarks.lookup --rows 1000000
+
+Reported per lookup: p50/p99 latency and SQL queries, and the plan of the
+current query. Seeded rows are deleted afterwards.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.lookup")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--profiles", type=int, default=1000)
+    parser.add_argument("--credentials-per-profile", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=5000)
+    return parser.parse_args(argv)
+
+
+def current_lookup(view, identity, protector):
+    return view._get_credential(identity.raw_public_key, protector, identity.raw_pin)
+
+
+def previous_lookup(view, identity, protector):
+    """The lookup before it was resolved in one query."""
+    from credentials.models import Credential
+    from profiles.models import Profile
+
+    profile = Profile.objects.filter(public_key=identity.raw_public_key).first()
+    if not profile:
+        return None
+    return Credential.objects.filter(
+        profile=profile, protector=protector, pin=identity.raw_pin
+    ).first()
+
+
+def measure(lookup, view, pairs, options):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from .runner import percentile
+
+    durations = []
+    for _ in range(options.lookups):
+        identity, protector = random.choice(pairs)
+        start = time.perf_counter()
+        credential = lookup(view, identity, protector)
+        durations.append(time.perf_counter() - start)
+        if credential is None:
+            raise RuntimeError("Seeded credential not found")
+    with CaptureQueriesContext(connection) as queries:
+        lookup(view, *pairs[0])
+    durations.sort()
+    return {
+        "p50_ms": 1000 * percentile(durations, 50),
+        "p99_ms": 1000 * percentile(durations, 99),
+        "queries": len(queries),
+    }
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+
+    from api.views import CredentialMixin
+    from credentials.models import Credential
+
+    from .seed import cleanup, seed, seed_stale
+
+    identities = seed(
+        options.profiles,
+        credentials_per_profile=options.credentials_per_profile,
+    )
+    try:
+        seed_stale(
+            identities,
+            max(options.rows - Credential.objects.count(), 0),
+        )
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE credentials_credential, profiles_profile")
+        pairs = [
+            (identity, protector)
+            for identity in identities
+            for protector in Credential.objects.filter(
+                profile_id=identity.raw_public_key, pin=identity.raw_pin
+            ).values_list("protector", flat=True)
+        ]
+        view = CredentialMixin()
+        report = {
+            "rows": Credential.objects.count(),
+            "current": measure(current_lookup, view, pairs, options),
+            "previous": measure(previous_lookup, view, pairs, options),
+            "plan": view._credential_queryset(
+                pairs[0][0].raw_public_key, pairs[0][1], pairs[0][0].raw_pin
+            ).explain(),
+        }
+    finally:
+        cleanup(identities)
+
+    report["meta"] = {"database": connection.vendor, "options": vars(options)}
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Benchmark of the time each middleware adds to an API request.
+
+Runs signed ``GET /api/profiles/`` requests through Django's test client
+with a timer around every middleware of ``MIDDLEWARE``, and reports the
+time spent in each one, excluding the layers below it::
+
+    python -m benchmarks.middleware --requests 5000
+
+``current`` is the configured stack, where ``WebOnlyMiddleware`` skips the
+session, CSRF, auth, messages and clickjacking middleware on the API.
+``previous`` runs those for every request, as before, with DRF's default
+session and basic authentication. ``view`` covers URL resolution and the
+view itself, DRF authentication included.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+# Inclusive time spent below each timer, by position in the stack.
+inclusive = defaultdict(float)
+
+
+def timer(position):
+    class Timer:
+        def __init__(self, get_response):
+            self.get_response = get_response
+
+        def __call__(self, request):
+            start = time.perf_counter()
+            try:
+                return self.get_response(request)
+            finally:
+                inclusive[position] += time.perf_counter() - start
+
+    Timer.__name__ = Timer.__qualname__ = f"Timer{position}"
+    globals()[Timer.__name__] = Timer
+    return f"{__name__}.{Timer.__name__}"
+
+
+def timed(middleware):
+    """``middleware`` with a timer in front of each one and of the view."""
+    stack = []
+    for position, path in enumerate(middleware):
+        stack += [timer(position), path]
+    return stack + [timer(len(middleware))]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.middleware")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    return parser.parse_args(argv)
+
+
+def measure(middleware, rest_framework, identity, options):
+    from django.test import Client, override_settings
+
+    with override_settings(
+        MIDDLEWARE=timed(middleware), REST_FRAMEWORK=rest_framework
+    ):
+        client = Client()
+        headers = identity.signed_headers()
+        for _ in range(options.warmup):
+            client.get("/api/profiles/", headers=headers)
+        inclusive.clear()
+        for _ in range(options.requests):
+            response = client.get("/api/profiles/", headers=headers)
+            if response.status_code != 200:
+                raise RuntimeError(f"Request failed: {response.status_code}")
+
+    per_request = {
+        position: 1e6 * elapsed / options.requests
+        for position, elapsed in inclusive.items()
+    }
+    own = {
+        path.rpartition(".")[2]: per_request[position]
+        - per_request[position + 1]
+        for position, path in enumerate(middleware)
+    }
+    return {
+        "middleware_us": own,
+        "view_us": per_request[len(middleware)],
+        "total_us": per_request[0],
+    }
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+
+    from .seed import cleanup, seed
+
+    previous_middleware = []
+    for path in settings.MIDDLEWARE:
+        if path == "api.middleware.WebOnlyMiddleware":
+            previous_middleware += settings.WEB_ONLY_MIDDLEWARE
+        else:
+            previous_middleware.append(path)
+    previous_rest_framework = {
+        key: value
+        for key, value in settings.REST_FRAMEWORK.items()
+        if key not in (
+            "DEFAULT_AUTHENTICATION_CLASSES",
+            "DEFAULT_PERMISSION_CLASSES",
+            "UNAUTHENTICATED_USER",
+        )
+    }
+
+    (identity,) = seed(1, services_size=4096)
+    try:
+        report = {
+            "current": measure(
+                settings.MIDDLEWARE, settings.REST_FRAMEWORK, identity, options
+            ),
+            "previous": measure(
+                previous_middleware, previous_rest_framework, identity, options
+            ),
+        }
+    finally:
+        cleanup([identity])
+
+    report["meta"] = {"options": vars(options)}
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Benchmark of hash partitioning the credentials table by profile.
+
+Copies the layout of the credentials table to a scratch table, seeds it and
+times the credential queries of the API, then converts the table with
+``credentials.partitioning`` and times them again (PostgreSQL only)::
+
+    python -m benchmarks.partitioning --profiles 200000 --partitions 16
+
+Reported for both tables: p50/p95 latency of creating a credential
+(evicting the oldest of a full profile, then inserting), of a lookup by
+profile and protector and of the eviction alone, plus table and index sizes
+and how long the online conversion took. The scratch table is dropped
+afterwards; ``credentials_credential`` itself is not touched.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+TABLE = "bench_partitioning_credential"
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.partitioning")
+    parser.add_argument("--profiles", type=int, default=50000)
+    parser.add_argument("--credentials-per-profile", type=int, default=10)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    return parser.parse_args(argv)
+
+
+def percentiles(durations):
+    durations = sorted(durations)
+    return {
+        "p50_ms": 1000 * statistics.median(durations),
+        "p95_ms": 1000 * durations[int(0.95 * (len(durations) - 1))],
+    }
+
+
+def drop_tables(cursor, qn):
+    from credentials import partitioning
+
+    for table in (
+        TABLE,
+        partitioning.shadow_table(TABLE),
+        partitioning.unpartitioned_table(TABLE),
+    ):
+        cursor.execute(f"DROP TABLE IF EXISTS {qn(table)} CASCADE")
+
+
+def create_table(cursor, qn):
+    """A scratch table laid out as migrations create the credentials table.
+
+    The foreign key to profiles is left out, so that seeding needs no
+    profiles.
+    """
+    drop_tables(cursor, qn)
+    cursor.execute(
+        f"""
+        CREATE TABLE {qn(TABLE)} (
+            id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            profile_id bytea NOT NULL,
+            pin bytea NOT NULL,
+            protector bytea NOT NULL,
+            entropy bytea NULL,
+            created_at timestamp with time zone NOT NULL,
+            last_used_at timestamp with time zone NOT NULL,
+            UNIQUE (profile_id, protector)
+        )
+        """
+    )
+    for columns in (
+        "profile_id", "profile_id, created_at", "last_used_at", "protector"
+    ):
+        cursor.execute(f"CREATE INDEX ON {qn(TABLE)} ({columns})")
+
+
+def seed(cursor, qn, options):
+    """Insert the credentials of ``options.profiles`` random profiles.
+
+    Returns:
+        list: The profile keys.
+    """
+    profiles = [os.urandom(32) for _ in range(options.profiles)]
+    for start in range(0, len(profiles), 1000):
+        cursor.execute(
+            f"""
+            INSERT INTO {qn(TABLE)}
+                (profile_id, pin, protector, entropy, created_at, last_used_at)
+            SELECT profile_id, sha512(random()::text::bytea),
+                   sha256(random()::text::bytea), sha256(random()::text::bytea),
+                   now() - n * interval '1 minute', now()
+            FROM unnest(%s::bytea[]) AS profile_id,
+                 generate_series(1, %s) AS n
+            """,
+            [profiles[start:start + 1000], options.credentials_per_profile],
+        )
+    cursor.execute(f"ANALYZE {qn(TABLE)}")
+    return profiles
+
+
+def measure(cursor, qn, profiles, options):
+    """Time the API's credential statements on random profiles."""
+    evict = (
+        f"DELETE FROM {qn(TABLE)} WHERE profile_id = %s AND id IN ("
+        f"SELECT id FROM {qn(TABLE)} WHERE profile_id = %s "
+        f"ORDER BY created_at DESC, id DESC OFFSET %s)"
+    )
+    insert = (
+        f"INSERT INTO {qn(TABLE)} "
+        f"(profile_id, pin, protector, entropy, created_at, last_used_at) "
+        f"VALUES (%s, %s, %s, %s, now(), now()) RETURNING id"
+    )
+    lookup = (
+        f"SELECT id, pin, entropy, last_used_at FROM {qn(TABLE)} "
+        f"WHERE profile_id = %s AND protector = %s ORDER BY id LIMIT 1"
+    )
+    keep = options.credentials_per_profile - 1
+    durations = {"create": [], "lookup": [], "evict": []}
+    for _ in range(options.operations):
+        profile = random.choice(profiles)
+
+        start = time.perf_counter()
+        cursor.execute(evict, [profile, profile, keep])
+        cursor.execute(
+            insert, [profile, os.urandom(64), os.urandom(32), os.urandom(32)]
+        )
+        durations["create"].append(time.perf_counter() - start)
+
+        cursor.execute(
+            f"SELECT protector FROM {qn(TABLE)} WHERE profile_id = %s",
+            [profile],
+        )
+        protector = random.choice(cursor.fetchall())[0]
+        start = time.perf_counter()
+        cursor.execute(lookup, [profile, protector])
+        cursor.fetchone()
+        durations["lookup"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        cursor.execute(evict, [profile, profile, keep])
+        durations["evict"].append(time.perf_counter() - start)
+        # Refill the profile for the next draw.
+        cursor.execute(
+            insert, [profile, os.urandom(64), os.urandom(32), os.urandom(32)]
+        )
+    return {name: percentiles(values) for name, values in durations.items()}
+
+
+def sizes(cursor):
+    from .storage import _postgresql_sizes
+
+    table_bytes, indexes_bytes, _ = _postgresql_sizes(cursor, TABLE)
+    return {"table_bytes": table_bytes, "indexes_bytes": indexes_bytes}
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+
+    from credentials import partitioning
+
+    if connection.vendor != "postgresql":
+        raise SystemExit("The partitioning benchmark needs PostgreSQL")
+
+    qn = connection.ops.quote_name
+    report = {}
+    try:
+        with connection.cursor() as cursor:
+            create_table(cursor, qn)
+            profiles = seed(cursor, qn, options)
+            report["unpartitioned"] = dict(
+                measure(cursor, qn, profiles, options), **sizes(cursor)
+            )
+
+        start = time.perf_counter()
+        copied = partitioning.partition(
+            connection,
+            options.partitions,
+            table=TABLE,
+            batch_size=options.batch_size,
+        )
+        report["conversion"] = {
+            "rows": copied,
+            "seconds": time.perf_counter() - start,
+        }
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {qn(TABLE)}")
+            report["partitioned"] = dict(
+                measure(cursor, qn, profiles, options), **sizes(cursor)
+            )
+    finally:
+        with connection.cursor() as cursor:
+            drop_tables(cursor, qn)
+
+    report["meta"] = {
+        "server_version": connection.pg_version,
+        "options": vars(options),
+    }
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Micro-benchmark of protector generation.
+
+Times the generator protectors came from before (32 ``random.randint``
+calls, base64-encoded), ``secrets.token_bytes`` alone, and the protector
+pool at its default threshold, in one sustained run and in bursts that
+drain the pool::
+
+    python -m benchmarks.protectors --iterations 100000 --pool-size 1024
+
+Bursts of ``--burst`` protectors are separated by a pause long enough for
+the background refill to finish, as between bursts of credential creation.
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import secrets
+import sys
+import time
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.protectors")
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--pool-size", type=int, default=1024)
+    parser.add_argument("--burst", type=int, default=256)
+    parser.add_argument("--pause", type=float, default=0.01)
+    return parser.parse_args(argv)
+
+
+def previous_protector():
+    """The generator before protectors came from a CSPRNG."""
+    random_bytes = bytes([random.randint(0, 255) for _ in range(32)])
+    return base64.b64encode(random_bytes).decode("ascii")
+
+
+def measure(generate, iterations, burst, pause):
+    """Time ``iterations`` calls of ``generate``, pausing between bursts."""
+    elapsed = 0.0
+    for start in range(0, iterations, burst):
+        calls = range(min(burst, iterations - start))
+        started = time.perf_counter()
+        for _ in calls:
+            generate()
+        elapsed += time.perf_counter() - started
+        if pause:
+            time.sleep(pause)
+    return {
+        "per_call_us": 1e6 * elapsed / iterations,
+        "calls_per_s": iterations / elapsed,
+    }
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from api.protectors import PROTECTOR_SIZE, ProtectorPool
+
+    pool = ProtectorPool(options.pool_size)
+    pool.get()
+    time.sleep(options.pause)
+
+    generators = {
+        "previous": previous_protector,
+        "token_bytes": lambda: secrets.token_bytes(PROTECTOR_SIZE),
+        "pool": pool.get,
+    }
+    report = {}
+    for name, generate in generators.items():
+        report[name] = {
+            "sustained": measure(
+                generate, options.iterations, options.iterations, 0
+            ),
+            "bursts": measure(
+                generate, options.iterations, options.burst, options.pause
+            ),
+        }
+
+    report["meta"] = {
+        "refill_threshold": pool.refill_threshold,
+        "options": vars(options),
+    }
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.db.models import Count
+
+from credentials.models import Credential
+
+from .scenarios import SCENARIOS
+
+SUCCESS_STATUSES = {200, 204, 304}
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    index = max(math.ceil(percent / 100 * len(values)) - 1, 0)
+    return values[index]
+
+
+def summarize(samples, duration):
+    """Aggregate ``(status, latency, queries)`` samples into a report entry."""
+    latencies = sorted(latency for _, latency, _ in samples)
+    statuses = Counter(status for status, _, _ in samples)
+    queries = [count for _, _, count in samples if count is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(
+            count for status, count in statuses.items()
+            if status not in SUCCESS_STATUSES
+        ),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": len(samples) / duration if duration else None,
+        "latency_ms": {
+            "mean": 1000 * sum(latencies) / len(latencies) if latencies else None,
+            "p50": _ms(percentile(latencies, 50)),
+            "p95": _ms(percentile(latencies, 95)),
+            "p99": _ms(percentile(latencies, 99)),
+            "max": _ms(latencies[-1] if latencies else None),
+        },
+        "queries_per_request": sum(queries) / len(queries) if queries else None,
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else 1000 * seconds
+
+
+def _worker(transport, identities, plan, options):
+    samples = []
+    try:
+        for scenario, index in plan:
+            identity = identities[index % len(identities)]
+            start = time.perf_counter()
+            try:
+                result = SCENARIOS[scenario](transport, identity, options)
+                status, queries = result.status, result.queries
+            except OSError:
+                status, queries = 0, None
+            samples.append(
+                (scenario, status, time.perf_counter() - start, queries)
+            )
+    finally:
+        connections.close_all()
+    return samples
+
+
+def run(transport, identities, mix, options):
+    """Drive ``options.requests`` requests of the given mix and build a report.
+
+    Identities are partitioned between workers, so no two threads ever touch
+    the same client state.
+    """
+    rng = random.Random(options.random_seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    concurrency = max(1, min(options.concurrency, len(identities)))
+    partitions = [identities[i::concurrency] for i in range(concurrency)]
+    plans = [[] for _ in range(concurrency)]
+    for number, scenario in enumerate(
+        rng.choices(names, weights, k=options.requests)
+    ):
+        worker = number % concurrency
+        plans[worker].append(
+            (scenario, rng.randrange(len(partitions[worker])))
+        )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(_worker, transport, partitions[i], plans[i], options)
+            for i in range(concurrency)
+        ]
+        results = [sample for future in futures for sample in future.result()]
+    duration = time.perf_counter() - start
+
+    by_scenario = defaultdict(list)
+    for scenario, status, latency, queries in results:
+        by_scenario[scenario].append((status, latency, queries))
+
+    return {
+        "summary": dict(
+            summarize([sample[1:] for sample in results], duration),
+            duration_s=duration,
+            concurrency=concurrency,
+        ),
+        "scenarios": {
+            scenario: summarize(samples, duration)
+            for scenario, samples in sorted(by_scenario.items())
+        },
+    }
+
+
+def invariants(identities):
+    """Check properties the API must keep under load."""
+    public_keys = [identity.raw_public_key for identity in identities]
+    per_profile = Credential.objects.live().filter(
+        profile_id__in=public_keys
+    ).values("profile_id").annotate(count=Count("pk"))
+    return {
+        "max_credentials_per_profile": max(
+            per_profile.values_list("count", flat=True), default=0
+        ),
+    }
@@ -0,0 +1,121 @@
+import json
+import os
+import random
+
+from .signing import encode
+
+MAX_TRACKED_PROTECTORS = 10
+
+PROFILES_PATH = "/api/profiles/"
+CREDENTIALS_PATH = "/api/credentials/"
+CREDENTIALS_BATCH_PATH = "/api/credentials/batch/"
+
+
+def profile_get(transport, identity, options):
+    """Fetch the services blob and remember its ETag."""
+    result = transport.request("GET", PROFILES_PATH, identity.signed_headers())
+    identity.etag = result.headers.get("ETag") or identity.etag
+    return result
+
+
+def profile_get_conditional(transport, identity, options):
+    """Poll the services blob with If-None-Match, as the frontend does."""
+    headers = identity.signed_headers()
+    if identity.etag:
+        headers["If-None-Match"] = identity.etag
+    return transport.request("GET", PROFILES_PATH, headers)
+
+
+def profile_post(transport, identity, options):
+    """Upload a new services blob."""
+    body = identity.signed_body(os.urandom(options.services_size))
+    result = transport.request(
+        "POST", PROFILES_PATH, {"Public-Key": identity.public_key}, body
+    )
+    identity.etag = None
+    return result
+
+
+def credential_post(transport, identity, options):
+    """Create a credential and track its protector."""
+    headers = {"Public-Key": identity.public_key, "Hashed-Pin": identity.pin}
+    body = identity.signed_body(os.urandom(32))
+    result = transport.request("POST", CREDENTIALS_PATH, headers, body)
+    if result.status == 200:
+        identity.protectors.append(json.loads(result.content))
+        del identity.protectors[:-MAX_TRACKED_PROTECTORS]
+    return result
+
+
+def credential_get(transport, identity, options):
+    """Unlock with a known protector and PIN."""
+    if not identity.protectors:
+        return credential_post(transport, identity, options)
+    headers = {
+        "Public-Key": identity.public_key,
+        "Hashed-Pin": identity.pin,
+        "Protector": random.choice(identity.protectors),
+        "Timestamp": encode(identity.timestamp()),
+    }
+    return transport.request("GET", CREDENTIALS_PATH, headers)
+
+
+def credential_delete(transport, identity, options):
+    """Revoke a known protector."""
+    if not identity.protectors:
+        return credential_post(transport, identity, options)
+    headers = {
+        "Public-Key": identity.public_key,
+        "Protector": identity.protectors.pop(),
+        "Timestamp": encode(identity.timestamp()),
+    }
+    return transport.request("DELETE", CREDENTIALS_PATH, headers)
+
+
+def credential_batch(transport, identity, options):
+    """Fetch every known protector in one batch request."""
+    if not identity.protectors:
+        return credential_post(transport, identity, options)
+    operations = [
+        {"op": "fetch", "protector": protector, "pin": identity.pin}
+        for protector in identity.protectors
+    ]
+    body = identity.signed_body(json.dumps(operations).encode("ascii"))
+    return transport.request(
+        "POST",
+        CREDENTIALS_BATCH_PATH,
+        {"Public-Key": identity.public_key},
+        body,
+    )
+
+
+SCENARIOS = {
+    "profile_get": profile_get,
+    "profile_get_conditional": profile_get_conditional,
+    "profile_post": profile_post,
+    "credential_get": credential_get,
+    "credential_post": credential_post,
+    "credential_delete": credential_delete,
+    "credential_batch": credential_batch,
+}
+
+DEFAULT_MIX = {
+    "profile_get": 20,
+    "profile_get_conditional": 30,
+    "profile_post": 5,
+    "credential_get": 30,
+    "credential_post": 10,
+    "credential_delete": 5,
+}
+
+
+def parse_mix(value):
+    """Parse a ``name=weight,...`` traffic mix."""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name}")
+        mix[name] = float(weight or 1)
+    return mix
@@ -0,0 +1,89 @@
+import os
+from datetime import timedelta
+
+from django.utils import timezone
+
+from credentials.models import Credential
+from profiles.cache import invalidate_profiles
+from profiles.models import Profile, hash_services
+
+from .signing import Identity, encode
+
+BATCH_SIZE = 1000
+
+STALE_AGE = timedelta(days=3650)
+
+
+def seed(profiles, credentials_per_profile=0, services_size=0):
+    """Create ``profiles`` identities with their profiles and credentials.
+
+    Rows are written with chunked ``bulk_create`` instead of one
+    ``add_public_key`` run per key, and the profile cache is invalidated
+    since bulk writes send no signals.
+
+    Returns:
+        list: The seeded ``Identity`` objects.
+    """
+    identities = [Identity() for _ in range(profiles)]
+    for start in range(0, profiles, BATCH_SIZE):
+        chunk = identities[start:start + BATCH_SIZE]
+        profiles_chunk = []
+        for identity in chunk:
+            services = encode(os.urandom(services_size)) or None
+            profiles_chunk.append(
+                Profile(
+                    public_key=identity.raw_public_key,
+                    services=services,
+                    services_hash=hash_services(services),
+                    services_version=1 if services else 0,
+                    snapshot_version=1 if services else 0,
+                    services_size=services_size,
+                )
+            )
+        Profile.objects.bulk_create(profiles_chunk, ignore_conflicts=True)
+        invalidate_profiles([identity.raw_public_key for identity in chunk])
+
+        credentials = []
+        for identity in chunk:
+            for _ in range(credentials_per_profile):
+                protector = os.urandom(32)
+                identity.protectors.append(encode(protector))
+                credentials.append(
+                    Credential(
+                        profile_id=identity.raw_public_key,
+                        pin=identity.raw_pin,
+                        protector=protector,
+                        entropy=os.urandom(32),
+                    )
+                )
+        Credential.objects.bulk_create(credentials, batch_size=BATCH_SIZE)
+    return identities
+
+
+def seed_stale(identities, count):
+    """Add ``count`` long-expired credentials spread over ``identities``.
+
+    Their protectors are not tracked, so the traffic never touches them; they
+    only grow the table and its indexes.
+    """
+    last_used_at = timezone.now() - STALE_AGE
+    for start in range(0, count, BATCH_SIZE):
+        Credential.objects.bulk_create([
+            Credential(
+                profile_id=identities[number % len(identities)].raw_public_key,
+                pin=os.urandom(32),
+                protector=os.urandom(32),
+                entropy=os.urandom(32),
+                last_used_at=last_used_at,
+            )
+            for number in range(start, min(start + BATCH_SIZE, count))
+        ])
+
+
+def cleanup(identities):
+    """Delete the profiles (and cascading credentials) of seeded identities."""
+    public_keys = [identity.raw_public_key for identity in identities]
+    for start in range(0, len(public_keys), BATCH_SIZE):
+        chunk = public_keys[start:start + BATCH_SIZE]
+        Profile.objects.filter(public_key__in=chunk).delete()
+        invalidate_profiles(chunk)
@@ -0,0 +1,46 @@
+import base64
+import os
+import time
+
+from nacl.signing import SigningKey
+
+
+def encode(data):
+    """Encode bytes to a base64 ASCII string."""
+    return base64.b64encode(data).decode("ascii")
+
+
+class Identity:
+    """A client keypair able to build correctly signed API requests.
+
+    Mirrors what the frontend sends: base64 headers, a little-endian 4-byte
+    timestamp and bodies of base64(signature + timestamp + payload).
+    """
+
+    def __init__(self, signing_key=None):
+        self.signing_key = signing_key or SigningKey.generate()
+        self.raw_public_key = bytes(self.signing_key.verify_key)
+        self.raw_pin = os.urandom(32)
+        self.public_key = encode(self.raw_public_key)
+        self.pin = encode(self.raw_pin)
+        self.protectors = []
+        self.etag = None
+
+    @staticmethod
+    def timestamp():
+        return int(time.time()).to_bytes(4, byteorder="little")
+
+    def signed_headers(self):
+        """Headers for requests signed over the timestamp alone."""
+        timestamp = self.timestamp()
+        return {
+            "Public-Key": self.public_key,
+            "Timestamp": encode(timestamp),
+            "Signature": encode(self.signing_key.sign(timestamp).signature),
+        }
+
+    def signed_body(self, payload):
+        """Body carrying ``payload`` signed together with a fresh timestamp."""
+        timestamp = self.timestamp()
+        signed = self.signing_key.sign(timestamp + payload)
+        return encode(signed.signature + timestamp + payload)
@@ -0,0 +1,216 @@
+"""Check of what loading the app shell costs a browser, through the gateway.
+
+Fetches a page and, recursively, the same-origin assets it references
+(scripts, stylesheets, icons, the web app manifest and ``url()``/``@import``
+references in stylesheets, including images a page may not use) the way a
+browser accepting brotli and gzip would. A cold load fetches everything; a
+warm load skips responses still fresh under their ``Cache-Control`` and
+revalidates the others::
+
+    python -m benchmarks.static --url http://localhost:8000/ \\
+        --path / --path /admin/login/ --max-cold-bytes 300000
+
+Reported per page: requests and transferred body bytes of both loads, and
+every asset with its status, encoding and caching; ``--accept-encoding
+identity`` measures the same without compression. Exits with status 1 when
+a cold load exceeds ``--max-cold-bytes`` or ``--max-cold-requests``.
+"""
+import argparse
+import gzip
+import json
+import re
+import sys
+import urllib.error
+import urllib.request
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ACCEPT_ENCODING = "gzip" if brotli is None else "br, gzip"
+
+# <link rel=...> values a browser fetches while loading the page.
+FETCHED_LINKS = {"stylesheet", "icon", "manifest", "preload", "modulepreload"}
+
+CSS_REFERENCE = re.compile(
+    r"""@import\s+(?:url\()?\s*["']?([^"')\s]+)|url\(\s*["']?([^"')]+?)["']?\s*\)"""
+)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.static")
+    parser.add_argument(
+        "--url",
+        default="http://localhost:8000/",
+        help="Base URL of the gateway.",
+    )
+    parser.add_argument(
+        "--path",
+        action="append",
+        dest="paths",
+        help="Page to load (repeatable, default /).",
+    )
+    parser.add_argument("--accept-encoding", default=ACCEPT_ENCODING)
+    parser.add_argument("--max-cold-bytes", type=int)
+    parser.add_argument("--max-cold-requests", type=int)
+    return parser.parse_args(argv)
+
+
+class ReferenceParser(HTMLParser):
+    """Collect the URLs an HTML page makes the browser fetch."""
+
+    def __init__(self):
+        super().__init__()
+        self.references = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "link" and FETCHED_LINKS & set(
+            (attrs.get("rel") or "").lower().split()
+        ):
+            self.references.append(attrs.get("href"))
+        elif tag in ("script", "img") and attrs.get("src"):
+            self.references.append(attrs["src"])
+
+
+def references(url, content_type, body):
+    """Absolute URLs referenced by a decoded response body."""
+    if "html" in content_type:
+        parser = ReferenceParser()
+        parser.feed(body.decode("utf-8", "replace"))
+        found = parser.references
+    elif "css" in content_type:
+        found = [
+            "".join(match)
+            for match in CSS_REFERENCE.findall(body.decode("utf-8", "replace"))
+        ]
+    elif "manifest" in content_type or url.endswith(
+        ("manifest.json", ".webmanifest")
+    ):
+        found = [icon.get("src") for icon in json.loads(body).get("icons", [])]
+    else:
+        found = []
+    return [
+        urljoin(url, reference).partition("#")[0]
+        for reference in found
+        if reference and not reference.startswith("data:")
+    ]
+
+
+def decode(body, encoding):
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br":
+        return brotli.decompress(body)
+    return body
+
+
+def fetch(url, headers):
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers, error.read()
+
+
+def is_fresh(cache_control):
+    """Whether a browser reuses a response without asking the server."""
+    directives = {
+        name.strip().lower(): value
+        for name, _, value in (
+            item.partition("=") for item in (cache_control or "").split(",")
+        )
+    }
+    if "no-cache" in directives or "no-store" in directives:
+        return False
+    return "immutable" in directives or int(directives.get("max-age") or 0) > 0
+
+
+def load(page, accept_encoding):
+    """Cold-load ``page`` and its assets, then load it again warm."""
+    origin = urlsplit(page)[:2]
+    assets = []
+    pending = [page]
+    seen = set(pending)
+    while pending:
+        url = pending.pop(0)
+        status, headers, body = fetch(url, {"Accept-Encoding": accept_encoding})
+        encoding = headers.get("Content-Encoding")
+        asset = {
+            "url": url,
+            "status": status,
+            "bytes": len(body),
+            "encoding": encoding,
+            "cache_control": headers.get("Cache-Control"),
+            "validators": {
+                name: headers[header]
+                for name, header in (
+                    ("If-None-Match", "ETag"),
+                    ("If-Modified-Since", "Last-Modified"),
+                )
+                if headers.get(header)
+            },
+        }
+        assets.append(asset)
+        if status != 200:
+            continue
+        for reference in references(
+            url, headers.get("Content-Type", ""), decode(body, encoding)
+        ):
+            if urlsplit(reference)[:2] == origin and reference not in seen:
+                seen.add(reference)
+                pending.append(reference)
+
+    warm = {"requests": 0, "bytes": 0}
+    for asset in assets:
+        if is_fresh(asset["cache_control"]):
+            continue
+        status, _, body = fetch(
+            asset["url"],
+            dict(asset.pop("validators"), **{"Accept-Encoding": accept_encoding}),
+        )
+        asset["warm_status"] = status
+        warm["requests"] += 1
+        warm["bytes"] += len(body)
+    for asset in assets:
+        asset.pop("validators", None)
+
+    return {
+        "cold": {
+            "requests": len(assets),
+            "bytes": sum(asset["bytes"] for asset in assets),
+        },
+        "warm": warm,
+        "assets": assets,
+    }
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    report = {
+        path: load(urljoin(options.url, path), options.accept_encoding)
+        for path in options.paths or ["/"]
+    }
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+
+    failed = False
+    for path, result in report.items():
+        for limit, value, name in (
+            (options.max_cold_bytes, result["cold"]["bytes"], "bytes"),
+            (options.max_cold_requests, result["cold"]["requests"], "requests"),
+        ):
+            if limit is not None and value > limit:
+                sys.stderr.write(
+                    f"{path}: cold load takes {value} {name}, over {limit}\n"
+                )
+                failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from django.db import connection
+
+from credentials.models import Credential
+from profiles.models import Profile
+
+MODELS = (Profile, Credential)
+
+
+def _postgresql_sizes(cursor, table):
+    # The partitions of a partitioned table, and of its indexes, hold the
+    # data; the parents are empty.
+    relations = (
+        "SELECT %s::regclass UNION ALL SELECT inhrelid FROM pg_inherits "
+        "WHERE inhparent = %s::regclass"
+    )
+    cursor.execute(
+        "SELECT SUM(pg_relation_size(oid)), SUM(pg_indexes_size(oid)) "
+        f"FROM ({relations}) AS relations (oid)",
+        [table, table],
+    )
+    table_bytes, indexes_bytes = cursor.fetchone()
+    cursor.execute(
+        "SELECT indexrelid::regclass::text, pg_relation_size(indexrelid) + "
+        "COALESCE((SELECT SUM(pg_relation_size(inhrelid)) FROM pg_inherits "
+        "WHERE inhparent = indexrelid), 0) "
+        "FROM pg_index WHERE indrelid = %s::regclass",
+        [table],
+    )
+    return int(table_bytes), int(indexes_bytes), {
+        name: int(size) for name, size in cursor.fetchall()
+    }
+
+
+def _sqlite_sizes(cursor, table):
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s",
+        [table],
+    )
+    indexes = {}
+    for (name,) in cursor.fetchall():
+        cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [name])
+        indexes[name] = cursor.fetchone()[0] or 0
+    cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [table])
+    return cursor.fetchone()[0] or 0, sum(indexes.values()), indexes
+
+
+def table_sizes():
+    """On-disk size of the API tables and each of their indexes, in bytes.
+
+    Supported on PostgreSQL and on SQLite builds with the ``dbstat`` table;
+    returns None elsewhere.
+    """
+    sizes = {
+        "postgresql": _postgresql_sizes,
+        "sqlite": _sqlite_sizes,
+    }.get(connection.vendor)
+    if sizes is None:
+        return None
+    report = {}
+    with connection.cursor() as cursor:
+        for model in MODELS:
+            table = model._meta.db_table
+            table_bytes, indexes_bytes, indexes = sizes(cursor, table)
+            report[table] = {
+                "rows": model.objects.count(),
+                "table_bytes": table_bytes,
+                "indexes_bytes": indexes_bytes,
+                "indexes": indexes,
+            }
+    return report
@@ -0,0 +1,195 @@
+"""Benchmark of small edits to large vaults: full uploads versus patches.
+
+For each vault size, a seeded profile gets ``--edits`` small changes, each
+followed by a second device catching up. Full mode uploads and downloads the
+whole blob (POST, GET); delta mode sends a patch (PATCH) and fetches the
+changes since the last known version (GET ?since=N)::
+
+    python -m benchmarks.sync --sizes 1048576,10485760 --edits 50
+
+Reported per edit: bytes sent and received, bytes written to the database
+(the parameters of INSERT/UPDATE statements; WAL bytes on PostgreSQL) and
+latency, plus the cost of one compaction of the delta run.
+"""
+import argparse
+import base64
+import json
+import os
+import statistics
+import struct
+import sys
+import time
+from contextlib import contextmanager
+
+from .scenarios import PROFILES_PATH
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sync")
+    parser.add_argument(
+        "--sizes",
+        default="1048576,10485760",
+        help="Comma-separated vault sizes in bytes.",
+    )
+    parser.add_argument("--edits", type=int, default=50)
+    parser.add_argument(
+        "--edit-size",
+        type=int,
+        default=256,
+        help="Bytes replaced by each edit.",
+    )
+    return parser.parse_args(argv)
+
+
+class WriteVolume:
+    """Count the bytes sent to the database by write statements."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.bytes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith(WRITE_STATEMENTS):
+            for row in params if many else [params]:
+                self.bytes += sum(
+                    len(value)
+                    for value in row or ()
+                    if isinstance(value, (bytes, memoryview, str))
+                )
+        return execute(sql, params, many, context)
+
+    def wal_position(self):
+        if self.connection.vendor != "postgresql":
+            return None
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT pg_current_wal_lsn()")
+            return cursor.fetchone()[0]
+
+    def wal_bytes(self, start):
+        if start is None:
+            return None
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s)", [start]
+            )
+            return int(cursor.fetchone()[0])
+
+
+@contextmanager
+def measure_writes(connection, totals):
+    volume = WriteVolume(connection)
+    wal_start = volume.wal_position()
+    with connection.execute_wrapper(volume):
+        yield
+    totals["db_write_bytes"] += volume.bytes
+    wal = volume.wal_bytes(wal_start)
+    if wal is not None:
+        totals["wal_bytes"] = totals.get("wal_bytes", 0) + wal
+
+
+def make_patch(base_version, offset, inserted):
+    """A patch replacing ``len(inserted)`` bytes at ``offset``."""
+    return struct.pack("<Q", base_version) + struct.pack(
+        "<III", offset, len(inserted), len(inserted)
+    ) + inserted
+
+
+def run_mode(mode, identity, transport, connection, vault, options):
+    totals = {"sent_bytes": 0, "received_bytes": 0, "db_write_bytes": 0}
+    latencies = []
+    version = 1
+    for _ in range(options.edits):
+        offset = int.from_bytes(os.urandom(4), "little") % (
+            len(vault) - options.edit_size
+        )
+        inserted = os.urandom(options.edit_size)
+        vault[offset:offset + options.edit_size] = inserted
+
+        start = time.perf_counter()
+        with measure_writes(connection, totals):
+            if mode == "full":
+                body = identity.signed_body(bytes(vault))
+                write = transport.request(
+                    "POST", PROFILES_PATH, {"Public-Key": identity.public_key}, body
+                )
+            else:
+                body = identity.signed_body(make_patch(version, offset, inserted))
+                write = transport.request(
+                    "PATCH", PROFILES_PATH, {"Public-Key": identity.public_key}, body
+                )
+        path = PROFILES_PATH if mode == "full" else f"{PROFILES_PATH}?since={version}"
+        read = transport.request("GET", path, identity.signed_headers())
+        latencies.append(time.perf_counter() - start)
+        if write.status != 200 or read.status != 200:
+            raise RuntimeError(f"{mode} edit failed: {write.status}, {read.status}")
+
+        totals["sent_bytes"] += len(body)
+        totals["received_bytes"] += len(write.content) + len(read.content)
+        version += 1
+
+    report = {
+        f"{name}_per_edit": value / options.edits for name, value in totals.items()
+    }
+    report["latency_ms_p50"] = 1000 * statistics.median(latencies)
+    return report
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    from profiles.models import Profile
+    from profiles.patches import compact_services
+
+    from .seed import cleanup, seed
+    from .transports import InProcessTransport
+
+    transport = InProcessTransport()
+    report = {}
+    # Keep every patch pending until the explicit compaction below.
+    with override_settings(SERVICES_MAX_PENDING_PATCHES=options.edits + 1):
+        for size in map(int, options.sizes.split(",")):
+            results = report[f"{size}_bytes"] = {}
+            for mode in ("full", "delta"):
+                (identity,) = seed(1, services_size=size)
+                try:
+                    vault = bytearray(base64.b64decode(
+                        Profile.objects.get(
+                            public_key=identity.raw_public_key
+                        ).services
+                    ))
+                    results[mode] = run_mode(
+                        mode, identity, transport, connection, vault, options
+                    )
+                    if mode == "delta":
+                        compaction = {"db_write_bytes": 0}
+                        start = time.perf_counter()
+                        with measure_writes(connection, compaction):
+                            compact_services(identity.raw_public_key)
+                        compaction["duration_ms"] = (
+                            1000 * (time.perf_counter() - start)
+                        )
+                        results["compaction"] = compaction
+                finally:
+                    cleanup([identity])
+
+    report["meta"] = {
+        "database": connection.vendor,
+        "async_api_views": settings.ASYNC_API_VIEWS,
+        "options": vars(options),
+    }
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import http.client
+import threading
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+Result = namedtuple("Result", ["status", "headers", "content", "queries"])
+
+
+class InProcessTransport:
+    """Send requests through Django's test client, counting SQL queries."""
+
+    name = "in-process"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, "client"):
+            self._local.client = Client(SERVER_NAME="localhost")
+        return self._local.client
+
+    def request(self, method, path, headers, body=None):
+        client = self._client()
+        # The log is a bounded deque; start from an empty one so that the
+        # captured slice stays accurate on long runs.
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.generic(
+                method,
+                path,
+                data=body or "",
+                content_type="text/plain",
+                headers=headers,
+            )
+        return Result(
+            response.status_code,
+            response.headers,
+            response.content,
+            len(queries.captured_queries),
+        )
+
+
+class HttpTransport:
+    """Send requests to a running server over keep-alive HTTP connections."""
+
+    name = "http"
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self._local = threading.local()
+
+    def _connection(self):
+        if not hasattr(self._local, "connection"):
+            self._local.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=60
+            )
+        return self._local.connection
+
+    def request(self, method, path, headers, body=None):
+        headers = dict(headers, **{"Content-Type": "text/plain"})
+        conn = self._connection()
+        try:
+            conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = conn.getresponse()
+        except (ConnectionError, http.client.HTTPException):
+            conn.close()
+            del self._local.connection
+            raise
+        content = response.read()
+        return Result(response.status, response.headers, content, None)
@@ -0,0 +1,117 @@
+"""Benchmark of the memory a services upload takes on the server.
+
+Builds signed ``POST /api/profiles/`` requests of ``--sizes`` megabytes and
+traces, with ``tracemalloc``, the Python allocations made while the view
+handles them: decoding the body alone, streamed (``read_body``) and
+buffered whole (``get_body``), then the whole request::
+
+    python -m benchmarks.upload --sizes 1 10 50
+
+Reported per size: peak traced memory in MB and as a multiple of the
+payload, and the time taken. The request body itself is built before
+tracing starts; allocations of the database driver outside the Python
+allocator are not traced.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+MB = 1024 * 1024
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.upload")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1, 10, 50],
+        help="Payload sizes in MB.",
+    )
+    return parser.parse_args(argv)
+
+
+def traced(function, size):
+    """Run ``function`` and report its peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        function()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_mb": peak / MB,
+        "peak_per_payload": peak / size,
+        "seconds": elapsed,
+    }
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.test import RequestFactory, override_settings
+
+    from api.views import ProfileView
+
+    from .seed import cleanup, seed
+
+    factory = RequestFactory()
+    view = ProfileView.as_view()
+    (identity,) = seed(1)
+    report = {}
+    try:
+        for megabytes in options.sizes:
+            size = megabytes * MB
+            body = identity.signed_body(os.urandom(size)).encode("ascii")
+
+            def request():
+                return factory.post(
+                    "/api/profiles/",
+                    body,
+                    content_type="text/plain",
+                    headers={"Public-Key": identity.public_key},
+                )
+
+            def buffered(request):
+                # request.body refuses bodies this large by default.
+                with override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=None):
+                    ProfileView().get_body(request)
+
+            def upload(request):
+                response = view(request)
+                if response.status_code != 200:
+                    raise RuntimeError(f"Upload failed: {response.status_code}")
+
+            results = report[f"{megabytes}MB"] = {}
+            for name, function in (
+                ("read_body", lambda request: ProfileView().read_body(
+                    request, settings.PROFILE_SERVICES_MAX_SIZE
+                )),
+                ("get_body", buffered),
+                ("post", upload),
+            ):
+                pending = request()
+                results[name] = traced(lambda: function(pending), size)
+    finally:
+        cleanup([identity])
+
+    report["meta"] = {
+        "database": django.db.connection.vendor,
+        "options": vars(options),
+    }
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Micro-benchmark of the verify key cache.
+
+Times ``get_verify_key`` on keys never seen before (cold: a miss building
+the ``VerifyKey``) and on cached keys (warm: a hit), alone and followed by
+the signature check of a signed request::
+
+    python -m benchmarks.verify_keys --iterations 100000
+
+The cache is sized from ``VERIFY_KEY_CACHE_SIZE``; warm runs cycle through
+``--keys`` keys, which should fit in it.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.verify_keys")
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument(
+        "--keys",
+        type=int,
+        default=1000,
+        help="Distinct keys to cycle through when warm.",
+    )
+    return parser.parse_args(argv)
+
+
+def measure(requests, verify):
+    start = time.perf_counter()
+    for public_key, message in requests:
+        verify(public_key, message)
+    elapsed = time.perf_counter() - start
+    return {
+        "per_call_us": 1e6 * elapsed / len(requests),
+        "calls_per_s": len(requests) / elapsed,
+    }
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+
+    from api.verify_keys import get_verify_key, verify_key_cache
+
+    from .signing import Identity
+
+    identities = [Identity() for _ in range(options.keys)]
+    signed = [
+        (
+            identity.raw_public_key,
+            identity.signing_key.sign(Identity.timestamp()),
+        )
+        for identity in identities
+    ]
+    warm_requests = [
+        signed[number % len(signed)] for number in range(options.iterations)
+    ]
+    # Building a VerifyKey does not check the key, so random bytes do.
+    cold_requests = [
+        (os.urandom(32), None) for _ in range(options.iterations)
+    ]
+
+    def lookup(public_key, message):
+        get_verify_key(public_key)
+
+    def verify(public_key, message):
+        get_verify_key(public_key).verify(message)
+
+    verify_key_cache.clear()
+    report = {"cold_lookup": measure(cold_requests, lookup)}
+    verify_key_cache.clear()
+    measure(signed, lookup)
+    report["warm_lookup"] = measure(warm_requests, lookup)
+
+    # Each key once on an empty cache, then the warm cycle.
+    verify_key_cache.clear()
+    report["cold_verify"] = measure(signed, verify)
+    report["warm_verify"] = measure(warm_requests, verify)
+
+    report["meta"] = {
+        "cache": verify_key_cache.stats(),
+        "cache_size": settings.VERIFY_KEY_CACHE_SIZE,
+        "options": vars(options),
+    }
+    sys.stdout.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
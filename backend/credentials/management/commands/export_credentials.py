@@ -0,0 +1,15 @@
+from credentials.models import Credential
+from profiles.management.bulk import BulkExportCommand
+
+
+class Command(BulkExportCommand):
+    help = (
+        "Export credentials as NDJSON or CSV "
+        "(profile, pin, protector, entropy), oldest first"
+    )
+
+    fields = ("profile", "pin", "protector", "entropy")
+    binary_fields = ("profile", "pin", "protector", "entropy")
+
+    def get_queryset(self):
+        return Credential.objects.order_by("created_at", "pk")
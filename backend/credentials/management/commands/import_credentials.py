@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.db.models import Count
+
+from api.views import AuthConfig
+from credentials.models import Credential
+from profiles.management.bulk import BulkImportCommand
+from profiles.models import Profile
+
+
+class Command(BulkImportCommand):
+    help = (
+        "Import credentials from NDJSON or CSV "
+        "(profile, pin, protector, entropy); rows for unknown profiles "
+        "and already known protectors are skipped. Imported credentials "
+        "count as the newest of their profile: as when the API creates "
+        "one, the oldest are evicted beyond the per-profile limit"
+    )
+
+    fields = ("profile", "pin", "protector", "entropy")
+    binary_fields = ("profile", "pin", "protector", "entropy")
+
+    def handle(self, *args, **options):
+        self.evicted = 0
+        super().handle(*args, **options)
+        if self.evicted:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Evicted {self.evicted} older credentials to keep "
+                    f"{AuthConfig.MAX_CREDENTIALS_PER_PROFILE} per profile"
+                )
+            )
+
+    def import_chunk(self, records):
+        with transaction.atomic():
+            # Locked in a fixed order, as the API locks a profile to write
+            # its credentials.
+            known_profiles = {
+                bytes(public_key)
+                for public_key in Profile.objects.select_for_update()
+                .filter(public_key__in={record["profile"] for record in records})
+                .order_by("pk")
+                .values_list("public_key", flat=True)
+            }
+            credentials = [
+                Credential(
+                    profile_id=record["profile"],
+                    pin=record["pin"],
+                    protector=record["protector"],
+                    entropy=record["entropy"],
+                )
+                for record in records
+                if record["profile"] in known_profiles
+                and record["pin"]
+                and record["protector"]
+            ]
+            protectors = [credential.protector for credential in credentials]
+            existing = {
+                bytes(protector)
+                for protector in Credential.objects.filter(
+                    protector__in=protectors
+                ).values_list("protector", flat=True)
+            }
+            Credential.objects.bulk_create(credentials, ignore_conflicts=True)
+            self.evicted += self.enforce_limit(
+                {credential.profile_id for credential in credentials}
+            )
+        return len(set(protectors) - existing)
+
+    def enforce_limit(self, profile_ids):
+        """Evict the oldest credentials of profiles above the limit.
+
+        Returns:
+            int: Number of evicted credentials.
+        """
+        limit = AuthConfig.MAX_CREDENTIALS_PER_PROFILE
+        full_profiles = (
+            Credential.objects.filter(profile_id__in=profile_ids)
+            .order_by()
+            .values("profile_id")
+            .annotate(count=Count("pk"))
+            .filter(count__gt=limit)
+            .values_list("profile_id", flat=True)
+        )
+        return sum(
+            Credential.objects.evict(profile_id, limit)
+            for profile_id in full_profiles
+        )
@@ -0,0 +1,88 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from credentials import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert the credentials table to hash partitions by profile online, "
+        "copying existing rows in batches (PostgreSQL)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=settings.CREDENTIAL_PARTITIONS,
+            help="Number of partitions (default: CREDENTIAL_PARTITIONS)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=partitioning.BATCH_SIZE,
+            help="Rows copied per transaction",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches",
+        )
+        parser.add_argument(
+            "--abort",
+            action="store_true",
+            help="Drop the partitioned copy of an unfinished conversion",
+        )
+        parser.add_argument(
+            "--drop-unpartitioned",
+            action="store_true",
+            help="Drop the previous table left by a finished conversion",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning requires PostgreSQL")
+
+        if options["abort"]:
+            partitioning.abort(connection)
+            self.stdout.write(self.style.SUCCESS("Conversion aborted"))
+            return
+
+        if partitioning.is_partitioned(connection):
+            if options["drop_unpartitioned"]:
+                if partitioning.drop_unpartitioned(connection):
+                    self.stdout.write(
+                        self.style.SUCCESS("Dropped the unpartitioned table")
+                    )
+                return
+            self.stdout.write(
+                self.style.WARNING("The credentials table is already partitioned")
+            )
+            return
+
+        if options["partitions"] < 2:
+            raise CommandError(
+                "Set --partitions or CREDENTIAL_PARTITIONS to at least 2"
+            )
+
+        start = time.perf_counter()
+        copied = partitioning.partition(
+            connection,
+            options["partitions"],
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            progress=lambda copied: self.stdout.write(f"Copied {copied} rows"),
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Partitioned {copied} credentials into {options['partitions']} "
+                f"partitions in {elapsed:.2f}s; the previous table is kept as "
+                f"{partitioning.unpartitioned_table(partitioning.TABLE)} "
+                f"until --drop-unpartitioned"
+            )
+        )
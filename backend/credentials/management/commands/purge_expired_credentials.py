@@ -0,0 +1,96 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.metrics import CREDENTIAL_PURGE_ROWS, CREDENTIALS_PURGED, push_metrics
+from credentials.models import Credential
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete credentials older than CREDENTIAL_TTL in bounded batches; "
+        "with --interval, keep running as a scheduler. Counters are pushed "
+        "to PROMETHEUS_PUSHGATEWAY after each run, if set"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CREDENTIAL_PURGE_BATCH_SIZE,
+            help="Rows deleted per statement",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.0,
+            help="Repeat the purge every N seconds (0 runs once)",
+        )
+
+    def purge(self, batch_size, pause):
+        """Delete expired credentials batch by batch.
+
+        Each batch is its own short DELETE ... WHERE id IN (...) statement on
+        the ``last_used_at`` index, so no lock is held across the whole run.
+
+        Returns:
+            int: Number of deleted credentials.
+        """
+        cutoff = timezone.now()
+        purged = 0
+        while True:
+            batch = list(
+                Credential.objects.expired(cutoff)
+                .order_by("last_used_at")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            deleted, _ = Credential.objects.filter(pk__in=batch).delete()
+            purged += deleted
+            CREDENTIALS_PURGED.inc(deleted)
+            if pause:
+                time.sleep(pause)
+        CREDENTIAL_PURGE_ROWS.observe(purged)
+        return purged
+
+    def push_metrics(self):
+        try:
+            push_metrics(
+                "purge_expired_credentials",
+                CREDENTIALS_PURGED,
+                CREDENTIAL_PURGE_ROWS,
+            )
+        except OSError as exc:
+            self.stderr.write(
+                self.style.WARNING(f"Could not push metrics: {exc}")
+            )
+
+    def handle(self, *args, **options):
+        if not settings.CREDENTIAL_TTL:
+            self.stdout.write(
+                self.style.WARNING("CREDENTIAL_TTL is not set, nothing to purge")
+            )
+            return
+
+        while True:
+            start = time.perf_counter()
+            purged = self.purge(options["batch_size"], options["pause"])
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Purged {purged} expired credentials in {elapsed:.2f}s"
+                )
+            )
+            self.push_metrics()
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credentials", "0004_alter_credential_protector"),
+        ("profiles", "0002_alter_profile_options"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="credential",
+            constraint=models.UniqueConstraint(
+                fields=("profile", "protector"),
+                name="unique_credential_profile_protector",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credentials", "0005_credential_unique_profile_protector"),
+        ("profiles", "0002_alter_profile_options"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="credential",
+            index=models.Index(
+                fields=["profile", "created_at"],
+                name="credential_profile_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credentials", "0006_credential_profile_created_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="credential",
+            name="protector",
+            field=models.CharField(max_length=256, unique=True),
+        ),
+    ]
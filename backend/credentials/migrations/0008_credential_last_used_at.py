@@ -0,0 +1,38 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:49
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, Max
+
+BATCH_SIZE = 5000
+
+
+def fill_last_used_at(apps, schema_editor):
+    Credential = apps.get_model("credentials", "Credential")
+    last_pk = Credential.objects.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+    for start in range(0, last_pk + 1, BATCH_SIZE):
+        Credential.objects.filter(
+            pk__gte=start, pk__lt=start + BATCH_SIZE
+        ).update(last_used_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credentials", "0007_credential_protector_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="credential",
+            name="last_used_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(fill_last_used_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="credential",
+            index=models.Index(
+                fields=["last_used_at"], name="credential_last_used_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,161 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:10
+
+import base64
+import binascii
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+BATCH_SIZE = 5000
+
+
+def b64decode(value):
+    return base64.b64decode(value, validate=True)
+
+
+def b64encode(value):
+    return base64.b64encode(value).decode("ascii")
+
+
+def copy_credentials(apps, schema_editor):
+    """Copy credentials into the binary table, decoding base64 columns.
+
+    Rows are copied in primary key order so that the new ids keep the
+    creation order. Aborts, before copying, if a row is not valid base64:
+    it can never match a request, but is only dropped by hand, not lost
+    here.
+    """
+    Credential = apps.get_model("credentials", "Credential")
+    BinaryCredential = apps.get_model("credentials", "BinaryCredential")
+    rows = Credential.objects.order_by("pk").values_list(
+        "pk", "profile_id", "pin", "protector", "entropy"
+    )
+    invalid = []
+    for pk, *values in rows.iterator(chunk_size=BATCH_SIZE):
+        try:
+            for value in values:
+                if value is not None:
+                    b64decode(value)
+        except (binascii.Error, ValueError):
+            invalid.append(pk)
+    if invalid:
+        raise ValueError(
+            f"{len(invalid)} credentials are not valid base64; delete them "
+            f"and migrate again: ids {', '.join(map(str, invalid))}"
+        )
+
+    batch = []
+    for profile_id, pin, protector, entropy, created_at, last_used_at in (
+        rows.values_list(
+            "profile_id",
+            "pin",
+            "protector",
+            "entropy",
+            "created_at",
+            "last_used_at",
+        ).iterator(chunk_size=BATCH_SIZE)
+    ):
+        batch.append(
+            BinaryCredential(
+                profile_id=b64decode(profile_id),
+                pin=b64decode(pin),
+                protector=b64decode(protector),
+                entropy=None if entropy is None else b64decode(entropy),
+                created_at=created_at,
+                last_used_at=last_used_at,
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            BinaryCredential.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        BinaryCredential.objects.bulk_create(batch)
+
+
+def restore_credentials(apps, schema_editor):
+    """Copy the binary credentials back, encoding their columns in base64.
+
+    The profiles are already back: profiles ``0005_binary_public_key``
+    restores them first.
+    """
+    Credential = apps.get_model("credentials", "Credential")
+    BinaryCredential = apps.get_model("credentials", "BinaryCredential")
+    # Keep the original creation times rather than the time of the copy.
+    Credential._meta.get_field("created_at").auto_now_add = False
+    batch = []
+    for profile_id, pin, protector, entropy, created_at, last_used_at in (
+        BinaryCredential.objects.order_by("pk").values_list(
+            "profile_id",
+            "pin",
+            "protector",
+            "entropy",
+            "created_at",
+            "last_used_at",
+        ).iterator(chunk_size=BATCH_SIZE)
+    ):
+        batch.append(
+            Credential(
+                profile_id=b64encode(profile_id),
+                pin=b64encode(pin),
+                protector=b64encode(protector),
+                entropy=None if entropy is None else b64encode(entropy),
+                created_at=created_at,
+                last_used_at=last_used_at,
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            Credential.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Credential.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credentials", "0008_credential_last_used_at"),
+        ("profiles", "0004_binaryprofile"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BinaryCredential",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("pin", models.BinaryField(max_length=192)),
+                ("protector", models.BinaryField(max_length=32, unique=True)),
+                ("entropy", models.BinaryField(blank=True, null=True)),
+                # auto_now_add is set once the rows are copied, so that
+                # bulk_create keeps the original creation times.
+                ("created_at", models.DateTimeField()),
+                (
+                    "last_used_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="profiles.binaryprofile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Credential",
+                "verbose_name_plural": "Credentials",
+            },
+        ),
+        migrations.RunPython(copy_credentials, restore_credentials),
+        migrations.DeleteModel(
+            name="Credential",
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credentials", "0009_binarycredential"),
+        ("profiles", "0005_binary_public_key"),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name="BinaryCredential",
+            new_name="Credential",
+        ),
+        migrations.AlterField(
+            model_name="credential",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AddConstraint(
+            model_name="credential",
+            constraint=models.UniqueConstraint(
+                fields=("profile", "protector"),
+                name="unique_credential_profile_protector",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="credential",
+            index=models.Index(
+                fields=["profile", "created_at"],
+                name="credential_profile_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="credential",
+            index=models.Index(
+                fields=["last_used_at"], name="credential_last_used_idx"
+            ),
+        ),
+    ]
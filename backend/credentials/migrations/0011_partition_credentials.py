@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_credentials(apps, schema_editor):
+    """Hash-partition the credentials table if CREDENTIAL_PARTITIONS is set.
+
+    PostgreSQL only. Runs in the migration transaction, which suits new or
+    small tables; live tables are converted online beforehand with
+    ``manage.py partition_credentials``, and then left as they are.
+    """
+    from credentials import partitioning
+
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or settings.CREDENTIAL_PARTITIONS < 2:
+        return
+    if partitioning.is_partitioned(connection):
+        return
+    # The table as of this migration, not as the current model has it.
+    partitioning.partition(
+        connection,
+        settings.CREDENTIAL_PARTITIONS,
+        model=apps.get_model("credentials", "Credential"),
+    )
+    partitioning.drop_unpartitioned(connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credentials", "0010_binary_credential_columns"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_credentials, migrations.RunPython.noop),
+    ]
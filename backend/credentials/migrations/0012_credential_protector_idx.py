@@ -0,0 +1,90 @@
+from django.db import migrations, models
+
+PROTECTOR_INDEX = models.Index(
+    fields=["protector"], name="credential_protector_idx"
+)
+
+# Name migration 0011 gave the protector index of a partitioned table.
+PARTITIONED_PROTECTOR_INDEX = "credentials_credential_partitioned_protector_idx"
+
+
+def is_partitioned(schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass('credentials_credential'))"
+        )
+        return cursor.fetchone()[0]
+
+
+def protector_field(unique):
+    field = models.BinaryField(max_length=32, unique=unique)
+    field.set_attributes_from_name("protector")
+    return field
+
+
+def index_protectors(apps, schema_editor):
+    """Index protectors as ``credential_protector_idx``.
+
+    The model only requires protectors to be unique per profile, which is
+    all a partitioned table can enforce. Other tables keep them globally
+    unique: the index replacing the unique constraint is a unique one.
+    """
+    Credential = apps.get_model("credentials", "Credential")
+    qn = schema_editor.quote_name
+    if is_partitioned(schema_editor):
+        schema_editor.execute(
+            f"ALTER INDEX IF EXISTS {qn(PARTITIONED_PROTECTOR_INDEX)} "
+            f"RENAME TO {qn(PROTECTOR_INDEX.name)}"
+        )
+        return
+    schema_editor.alter_field(
+        Credential, protector_field(unique=True), protector_field(unique=False)
+    )
+    schema_editor.execute(
+        f"CREATE UNIQUE INDEX {qn(PROTECTOR_INDEX.name)} "
+        f"ON {qn(Credential._meta.db_table)} ({qn('protector')})"
+    )
+
+
+def unindex_protectors(apps, schema_editor):
+    Credential = apps.get_model("credentials", "Credential")
+    if is_partitioned(schema_editor):
+        schema_editor.execute(
+            f"ALTER INDEX {schema_editor.quote_name(PROTECTOR_INDEX.name)} "
+            f"RENAME TO {schema_editor.quote_name(PARTITIONED_PROTECTOR_INDEX)}"
+        )
+        return
+    schema_editor.remove_index(Credential, PROTECTOR_INDEX)
+    schema_editor.alter_field(
+        Credential, protector_field(unique=False), protector_field(unique=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credentials", "0011_partition_credentials"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(index_protectors, unindex_protectors),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="credential",
+                    name="protector",
+                    field=models.BinaryField(max_length=32),
+                ),
+                migrations.AddIndex(
+                    model_name="credential",
+                    index=PROTECTOR_INDEX,
+                ),
+            ],
+        ),
+    ]
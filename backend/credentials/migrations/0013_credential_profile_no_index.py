@@ -0,0 +1,63 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+PROTECTOR_INDEX = "credential_protector_idx"
+
+
+def is_partitioned(schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass('credentials_credential'))"
+        )
+        return cursor.fetchone()[0]
+
+
+def restore_unique_protectors(apps, schema_editor):
+    """Make ``credential_protector_idx`` unique again on unpartitioned tables.
+
+    Altering a field remakes the table on SQLite, recreating the index from
+    the model state, where it cannot be unique (see migration 0012).
+    """
+    if is_partitioned(schema_editor):
+        return
+    Credential = apps.get_model("credentials", "Credential")
+    table = Credential._meta.db_table
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    if constraints.get(PROTECTOR_INDEX, {}).get("unique", True):
+        return
+    qn = schema_editor.quote_name
+    schema_editor.execute(f"DROP INDEX {qn(PROTECTOR_INDEX)}")
+    schema_editor.execute(
+        f"CREATE UNIQUE INDEX {qn(PROTECTOR_INDEX)} "
+        f"ON {qn(table)} ({qn('protector')})"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credentials', '0012_credential_protector_idx'),
+        ('profiles', '0006_services_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, restore_unique_protectors
+        ),
+        migrations.AlterField(
+            model_name='credential',
+            name='profile',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='profiles.profile'),
+        ),
+        migrations.RunPython(
+            restore_unique_protectors, migrations.RunPython.noop
+        ),
+    ]
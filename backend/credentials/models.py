@@ -1,21 +1,107 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 from profiles.models import Profile
 
 
+class CredentialQuerySet(models.QuerySet):
+    """Credential lookups aware of ``settings.CREDENTIAL_TTL``."""
+
+    def expiry_cutoff(self, now=None):
+        """Oldest ``last_used_at`` still considered live, or None without TTL."""
+        if not settings.CREDENTIAL_TTL:
+            return None
+        return (now or timezone.now()) - timedelta(seconds=settings.CREDENTIAL_TTL)
+
+    def live(self, now=None):
+        """Exclude expired credentials."""
+        cutoff = self.expiry_cutoff(now)
+        if cutoff is None:
+            return self
+        return self.filter(last_used_at__gte=cutoff)
+
+    def expired(self, now=None):
+        """Only expired credentials; empty when no TTL is configured."""
+        cutoff = self.expiry_cutoff(now)
+        if cutoff is None:
+            return self.none()
+        return self.filter(last_used_at__lt=cutoff)
+
+    def evict(self, profile, keep):
+        """Delete all but the ``keep`` newest credentials of a profile.
+
+        Runs as a single DELETE ... WHERE id IN (SELECT ... OFFSET n)
+        statement, scoped to the profile so that a partitioned table only
+        reads its partition.
+
+        Returns:
+            int: Number of evicted credentials.
+        """
+        credentials = self.filter(profile=profile)
+        stale_credentials = credentials.order_by(
+            "-created_at", "-pk"
+        ).values("pk")[keep:]
+        evicted, _ = credentials.filter(pk__in=stale_credentials).delete()
+        return evicted
+
+
 class Credential(models.Model):
+    # Indexed by credential_profile_created_idx and the profile/protector
+    # unique constraint, which both lead with it.
     profile = models.ForeignKey(
         Profile,
         on_delete=models.CASCADE,
+        db_index=False,
     )
-    pin = models.CharField(max_length=256)
-    protector = models.CharField(max_length=256)
-    entropy = models.TextField(
+    pin = models.BinaryField(max_length=192)
+    # Random 32 bytes, unique per profile: a partitioned table cannot
+    # enforce uniqueness without the partition key. Unpartitioned tables
+    # keep them globally unique, credential_protector_idx being a unique
+    # index there (migration 0012).
+    protector = models.BinaryField(max_length=32)
+    entropy = models.BinaryField(
         null=True,
         blank=True,
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    objects = CredentialQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Credential"
         verbose_name_plural = "Credentials"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "protector"],
+                name="unique_credential_profile_protector",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["profile", "created_at"],
+                name="credential_profile_created_idx",
+            ),
+            models.Index(
+                fields=["last_used_at"],
+                name="credential_last_used_idx",
+            ),
+            models.Index(
+                fields=["protector"],
+                name="credential_protector_idx",
+            ),
+        ]
+
+    def touch_due(self, now):
+        """Whether an unlock at ``now`` should refresh ``last_used_at``.
+
+        Only with ``CREDENTIAL_TTL_TRACK_USAGE``, and at most once per tenth
+        of the TTL so that unlocks do not turn into a write each.
+        """
+        if not (settings.CREDENTIAL_TTL and settings.CREDENTIAL_TTL_TRACK_USAGE):
+            return False
+        interval = timedelta(seconds=settings.CREDENTIAL_TTL / 10)
+        return self.last_used_at < now - interval
@@ -0,0 +1,372 @@
+"""Hash partitioning of the credentials table by profile, on PostgreSQL.
+
+Every credential query filters on ``profile_id``, so it reads a single
+partition, and vacuum and index maintenance work on partitions a fraction
+of the size of the table.
+
+The layout of the partitioned table comes from a model, the current one or
+the historical one a migration passes. PostgreSQL requires the unique
+constraints of a partitioned table to include the partition key: the
+primary key becomes ``(id, profile_id)``, and other unique constraints
+without it become plain indexes.
+
+A table is converted online:
+
+1. ``start`` creates the partitioned shadow table and a trigger mirroring
+   every write to the table into it;
+2. ``copy_batch`` copies the rows that existed before the trigger in
+   primary key order, one batch per transaction. The rows are share-locked
+   while copied, so a concurrent update or delete waits and is mirrored
+   after the copy, never before it;
+3. ``swap`` locks both tables briefly, moves the identity sequence past the
+   current ids and renames the shadow table into place.
+
+The previous table is kept as ``<table>_unpartitioned`` until
+``drop_unpartitioned``.
+"""
+import time
+
+from django.db import models, transaction
+
+from credentials.models import Credential
+
+TABLE = Credential._meta.db_table
+
+PARTITION_KEY = "profile_id"
+
+BATCH_SIZE = 5000
+
+
+def layout(model):
+    """Columns, indexes and unique constraints of ``model`` once partitioned.
+
+    Returns:
+        tuple: The columns, then ``(columns, name)`` pairs of the indexes
+        and of the unique constraints. ``name`` is the name in the model's
+        Meta, or None for indexes that stand in for a unique constraint
+        without the partition key.
+    """
+    opts = model._meta
+
+    def columns(fields):
+        return tuple(opts.get_field(name.lstrip("-")).column for name in fields)
+
+    indexes = [(columns(index.fields), index.name) for index in opts.indexes]
+    unique = []
+    for constraint in opts.constraints:
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields:
+            fields = columns(constraint.fields)
+            if PARTITION_KEY in fields:
+                unique.append((fields, constraint.name))
+            else:
+                indexes.append((fields, None))
+    for field in opts.local_concrete_fields:
+        if field.unique and not field.primary_key:
+            indexes.append(((field.column,), None))
+    return (
+        tuple(field.column for field in opts.local_concrete_fields),
+        indexes,
+        unique,
+    )
+
+
+def shadow_table(table):
+    return f"{table}_partitioned"
+
+
+def unpartitioned_table(table):
+    return f"{table}_unpartitioned"
+
+
+def mirror_name(table):
+    return f"{table}_mirror"
+
+
+def index_name(table, columns, suffix="idx"):
+    return f"{table}_{'_'.join(columns)}_{suffix}"
+
+
+def is_partitioned(connection, table=TABLE):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(%s))",
+            [table],
+        )
+        return cursor.fetchone()[0]
+
+
+def exists(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [table])
+        return cursor.fetchone()[0]
+
+
+def start(connection, partitions, table=TABLE, model=Credential):
+    """Create the partitioned shadow of ``table`` and start mirroring to it.
+
+    Does nothing if the shadow already exists, so that an interrupted
+    conversion resumes.
+    """
+    shadow = shadow_table(table)
+    if exists(connection, shadow):
+        return
+    qn = connection.ops.quote_name
+    columns, indexes, unique = layout(model)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {qn(shadow)} (LIKE {qn(table)} "
+            f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY HASH ({PARTITION_KEY})"
+        )
+        # An identity column, as migrations create, even if ``table`` has a
+        # serial one.
+        cursor.execute(
+            f"ALTER TABLE {qn(shadow)} ALTER COLUMN id DROP DEFAULT, "
+            f"ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY"
+        )
+        for remainder in range(partitions):
+            cursor.execute(
+                f"CREATE TABLE {qn(f'{table}_p{remainder}')} "
+                f"PARTITION OF {qn(shadow)} "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            )
+        cursor.execute(
+            f"ALTER TABLE {qn(shadow)} ADD PRIMARY KEY (id, {PARTITION_KEY})"
+        )
+        for fields, _ in unique:
+            cursor.execute(
+                f"ALTER TABLE {qn(shadow)} "
+                f"ADD CONSTRAINT {qn(index_name(shadow, fields, 'uniq'))} "
+                f"UNIQUE ({', '.join(map(qn, fields))})"
+            )
+        for fields, _ in indexes:
+            cursor.execute(
+                f"CREATE INDEX {qn(index_name(shadow, fields))} "
+                f"ON {qn(shadow)} ({', '.join(map(qn, fields))})"
+            )
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [table],
+        )
+        for name, definition in cursor.fetchall():
+            cursor.execute(
+                f"ALTER TABLE {qn(shadow)} "
+                f"ADD CONSTRAINT {qn(name)} {definition}"
+            )
+
+        cursor.execute(f"""
+            CREATE FUNCTION {qn(mirror_name(table))}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    DELETE FROM {qn(shadow)}
+                    WHERE id = OLD.id
+                    AND {PARTITION_KEY} = OLD.{PARTITION_KEY};
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO {qn(shadow)} ({', '.join(map(qn, columns))})
+                    VALUES ({', '.join(f'NEW.{qn(column)}' for column in columns)})
+                    ON CONFLICT DO NOTHING;
+                END IF;
+                RETURN NULL;
+            END
+            $$
+        """)
+        cursor.execute(
+            f"CREATE TRIGGER {qn(mirror_name(table))} "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {qn(table)} "
+            f"FOR EACH ROW EXECUTE FUNCTION {qn(mirror_name(table))}()"
+        )
+
+
+def last_id(connection, table=TABLE):
+    """Highest id of ``table``; rows written after ``start`` are mirrored."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COALESCE(MAX(id), 0) FROM {connection.ops.quote_name(table)}"
+        )
+        return cursor.fetchone()[0]
+
+
+def copy_batch(
+    connection,
+    after,
+    until,
+    batch_size=BATCH_SIZE,
+    table=TABLE,
+    model=Credential,
+):
+    """Copy the next ``batch_size`` rows with an id above ``after``.
+
+    Rows with an id above ``until`` are left to the mirror trigger, so that
+    steady inserts do not keep the copy going.
+
+    Returns:
+        tuple: The last id copied (``after`` when done) and the row count.
+    """
+    qn = connection.ops.quote_name
+    columns = ", ".join(map(qn, layout(model)[0]))
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH batch AS (
+                SELECT {columns} FROM {qn(table)}
+                WHERE id > %s AND id <= %s ORDER BY id LIMIT %s
+                FOR SHARE
+            ), copied AS (
+                INSERT INTO {qn(shadow_table(table))} ({columns})
+                SELECT {columns} FROM batch
+                ON CONFLICT DO NOTHING
+            )
+            SELECT MAX(id), COUNT(*) FROM batch
+            """,
+            [after, until, batch_size],
+        )
+        last, count = cursor.fetchone()
+    return (after if last is None else last), count
+
+
+def swap(connection, table=TABLE, model=Credential):
+    """Put the partitioned shadow in place of ``table``.
+
+    The primary key, the id sequence and the named indexes and constraints
+    of the model move to the shadow, the previous table keeping them with
+    an ``_unpartitioned`` suffix.
+    """
+    qn = connection.ops.quote_name
+    shadow = shadow_table(table)
+    old = unpartitioned_table(table)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            f"LOCK TABLE {qn(table)}, {qn(shadow)} IN ACCESS EXCLUSIVE MODE"
+        )
+        # Renames fail while deferred foreign key checks are pending.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(
+            "SELECT pg_get_serial_sequence(%s, 'id'), "
+            "pg_get_serial_sequence(%s, 'id')",
+            [table, shadow],
+        )
+        sequence, shadow_sequence = cursor.fetchone()
+        # Ids handed out but rolled back are not reused either.
+        cursor.execute(
+            f"SELECT setval(%s, GREATEST("
+            f"(SELECT COALESCE(MAX(id), 0) FROM {qn(shadow)}), "
+            f"(SELECT last_value FROM {sequence}), 1))"
+            if sequence
+            else f"SELECT setval(%s, "
+            f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {qn(shadow)}), false)",
+            [shadow_sequence],
+        )
+        cursor.execute(f"DROP TRIGGER {qn(mirror_name(table))} ON {qn(table)}")
+        cursor.execute(f"DROP FUNCTION {qn(mirror_name(table))}()")
+        cursor.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+            [table],
+        )
+        (primary_key,) = cursor.fetchone()
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(old)}")
+        cursor.execute(f"ALTER TABLE {qn(shadow)} RENAME TO {qn(table)}")
+        cursor.execute(
+            f"ALTER TABLE {qn(old)} RENAME CONSTRAINT {qn(primary_key)} "
+            f"TO {qn(f'{old}_pkey')}"
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} RENAME CONSTRAINT {qn(f'{shadow}_pkey')} "
+            f"TO {qn(f'{table}_pkey')}"
+        )
+        if sequence:
+            cursor.execute(
+                f"ALTER SEQUENCE {sequence} RENAME TO {qn(f'{old}_id_seq')}"
+            )
+        cursor.execute(
+            f"ALTER SEQUENCE {shadow_sequence} RENAME TO {qn(f'{table}_id_seq')}"
+        )
+        if table != model._meta.db_table:
+            return
+        _, indexes, unique = layout(model)
+        for fields, name in unique:
+            cursor.execute(
+                f"ALTER TABLE {qn(old)} RENAME CONSTRAINT {qn(name)} "
+                f"TO {qn(f'{name}_unpartitioned')}"
+            )
+            cursor.execute(
+                f"ALTER TABLE {qn(table)} RENAME CONSTRAINT "
+                f"{qn(index_name(shadow, fields, 'uniq'))} TO {qn(name)}"
+            )
+        for fields, name in indexes:
+            if name is None:
+                continue
+            # A table converted before migrating has the previous indexes.
+            cursor.execute(
+                f"ALTER INDEX IF EXISTS {qn(name)} "
+                f"RENAME TO {qn(f'{name}_unpartitioned')}"
+            )
+            cursor.execute(
+                f"ALTER INDEX {qn(index_name(shadow, fields))} RENAME TO {qn(name)}"
+            )
+
+
+def abort(connection, table=TABLE):
+    """Stop mirroring and drop the shadow of an unfinished conversion."""
+    qn = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            f"DROP TRIGGER IF EXISTS {qn(mirror_name(table))} ON {qn(table)}"
+        )
+        cursor.execute(f"DROP FUNCTION IF EXISTS {qn(mirror_name(table))}()")
+        cursor.execute(f"DROP TABLE IF EXISTS {qn(shadow_table(table))}")
+
+
+def drop_unpartitioned(connection, table=TABLE):
+    """Drop the table kept by ``swap``.
+
+    Returns:
+        bool: Whether there was one.
+    """
+    old = unpartitioned_table(table)
+    if not exists(connection, old):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {connection.ops.quote_name(old)}")
+    return True
+
+
+def partition(
+    connection,
+    partitions,
+    table=TABLE,
+    batch_size=BATCH_SIZE,
+    pause=0.0,
+    progress=None,
+    model=Credential,
+):
+    """Convert ``table`` to ``partitions`` hash partitions online.
+
+    Args:
+        progress: Called with the number of rows copied so far.
+        model: Model whose layout the partitioned table gets; migrations
+            pass their historical model.
+
+    Returns:
+        int: Number of rows copied by batches.
+    """
+    start(connection, partitions, table, model)
+    until = last_id(connection, table)
+    after, copied = 0, 0
+    while True:
+        after, count = copy_batch(
+            connection, after, until, batch_size, table, model
+        )
+        if not count:
+            break
+        copied += count
+        if progress is not None:
+            progress(copied)
+        if pause:
+            time.sleep(pause)
+    swap(connection, table, model)
+    return copied
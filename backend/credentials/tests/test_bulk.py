@@ -0,0 +1,86 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.views import AuthConfig
+from benchmarks.signing import Identity, encode
+from credentials.models import Credential
+from profiles.models import Profile
+
+
+class BulkCredentialTests(TestCase):
+    def setUp(self):
+        self.identity = Identity()
+        self.profile = Profile.objects.create(
+            public_key=self.identity.raw_public_key
+        )
+        self.stdout, self.stderr = io.StringIO(), io.StringIO()
+
+    def create_credentials(self, count):
+        return Credential.objects.bulk_create(
+            Credential(
+                profile=self.profile,
+                pin=self.identity.raw_pin,
+                protector=os.urandom(32),
+            )
+            for _ in range(count)
+        )
+
+    def import_credentials(self, count):
+        protectors = [os.urandom(32) for _ in range(count)]
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as file:
+            for protector in protectors:
+                record = {
+                    "profile": self.identity.public_key,
+                    "pin": self.identity.pin,
+                    "protector": encode(protector),
+                    "entropy": None,
+                }
+                file.write(json.dumps(record) + "\n")
+            file.flush()
+            call_command(
+                "import_credentials",
+                file.name,
+                chunk_size=4,
+                stdout=self.stdout,
+                stderr=self.stderr,
+            )
+        return protectors
+
+    def test_import_keeps_the_per_profile_limit(self):
+        limit = AuthConfig.MAX_CREDENTIALS_PER_PROFILE
+        self.create_credentials(3)
+        protectors = self.import_credentials(limit + 5)
+
+        kept = {
+            bytes(protector)
+            for protector in Credential.objects.filter(
+                profile=self.profile
+            ).values_list("protector", flat=True)
+        }
+        self.assertEqual(kept, set(protectors[-limit:]))
+        self.assertIn(
+            f"Imported {limit + 5} of {limit + 5} rows", self.stdout.getvalue()
+        )
+        self.assertIn("Evicted 8 older credentials", self.stdout.getvalue())
+
+    def test_import_under_the_limit_evicts_nothing(self):
+        self.create_credentials(3)
+        self.import_credentials(2)
+        self.assertEqual(Credential.objects.count(), 5)
+        self.assertNotIn("Evicted", self.stdout.getvalue())
+
+    def test_export_writes_to_the_command_stdout(self):
+        (credential,) = self.create_credentials(1)
+        call_command(
+            "export_credentials", stdout=self.stdout, stderr=self.stderr
+        )
+        (line,) = self.stdout.getvalue().splitlines()
+        self.assertEqual(
+            json.loads(line)["protector"], encode(credential.protector)
+        )
+        self.assertIn("Exported 1 rows", self.stderr.getvalue())
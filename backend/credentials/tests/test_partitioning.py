@@ -0,0 +1,119 @@
+import os
+import unittest
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from credentials import partitioning
+from credentials.models import Credential
+from profiles.models import Profile
+
+PARTITIONS = 4
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "Partitioning is PostgreSQL only"
+)
+class PartitioningTests(TestCase):
+    """Convert the credentials table, within the test transaction."""
+
+    def setUp(self):
+        self.profiles = [
+            Profile.objects.create(public_key=os.urandom(32)) for _ in range(3)
+        ]
+        self.credentials = [
+            self.create_credential(profile)
+            for profile in self.profiles
+            for _ in range(5)
+        ]
+        if not partitioning.is_partitioned(connection):
+            partitioning.partition(connection, PARTITIONS, batch_size=4)
+            partitioning.drop_unpartitioned(connection)
+
+    def create_credential(self, profile, protector=None):
+        return Credential.objects.create(
+            profile=profile,
+            pin=os.urandom(32),
+            protector=protector or os.urandom(32),
+        )
+
+    def constraints(self):
+        with connection.cursor() as cursor:
+            return connection.introspection.get_constraints(
+                cursor, partitioning.TABLE
+            )
+
+    def test_rows_are_copied(self):
+        self.assertTrue(partitioning.is_partitioned(connection))
+        self.assertQuerySetEqual(
+            Credential.objects.order_by("pk"),
+            self.credentials,
+        )
+
+    def test_indexes_and_constraints_match_the_model(self):
+        constraints = self.constraints()
+        meta = Credential._meta
+        for index in meta.indexes:
+            self.assertEqual(
+                constraints[index.name]["columns"],
+                [meta.get_field(name).column for name in index.fields],
+            )
+        for constraint in meta.constraints:
+            self.assertTrue(constraints[constraint.name]["unique"])
+            self.assertEqual(
+                constraints[constraint.name]["columns"],
+                [meta.get_field(name).column for name in constraint.fields],
+            )
+        self.assertEqual(
+            constraints[f"{partitioning.TABLE}_pkey"]["columns"],
+            ["id", "profile_id"],
+        )
+        self.assertFalse([
+            name
+            for name, constraint in constraints.items()
+            if constraint["unique"] and constraint["columns"] == ["protector"]
+        ])
+
+    def test_ids_are_an_identity_continuing_the_previous_ids(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT is_identity FROM information_schema.columns "
+                "WHERE table_name = %s AND column_name = 'id'",
+                [partitioning.TABLE],
+            )
+            self.assertEqual(cursor.fetchone(), ("YES",))
+            cursor.execute(
+                "SELECT pg_get_serial_sequence(%s, 'id')", [partitioning.TABLE]
+            )
+            self.assertEqual(
+                cursor.fetchone(), (f"public.{partitioning.TABLE}_id_seq",)
+            )
+        credential = self.create_credential(self.profiles[0])
+        self.assertGreater(
+            credential.pk, max(credential.pk for credential in self.credentials)
+        )
+
+    def test_protectors_are_unique_per_profile(self):
+        protector = self.credentials[0].protector
+        self.create_credential(self.profiles[1], protector)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_credential(self.profiles[0], protector)
+
+
+class ProtectorUniquenessTests(TestCase):
+    def test_protectors_are_globally_unique_unless_partitioned(self):
+        if connection.vendor == "postgresql" and partitioning.is_partitioned(
+            connection
+        ):
+            self.skipTest("Partitioned tables only enforce it per profile")
+        profiles = [
+            Profile.objects.create(public_key=os.urandom(32)) for _ in range(2)
+        ]
+        protector = os.urandom(32)
+        Credential.objects.create(
+            profile=profiles[0], pin=os.urandom(32), protector=protector
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Credential.objects.create(
+                profile=profiles[1], pin=os.urandom(32), protector=protector
+            )
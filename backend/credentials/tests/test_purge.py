@@ -0,0 +1,97 @@
+import io
+import os
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from benchmarks.signing import Identity
+from credentials.models import Credential
+from profiles.models import Profile
+
+
+class Pushgateway(HTTPServer):
+    """A Pushgateway stand-in recording the metrics pushed to it."""
+
+    def __init__(self):
+        self.pushes = []
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_PUT(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                gateway.pushes.append((self.path, body.decode()))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        super().__init__(("127.0.0.1", 0), Handler)
+
+    @property
+    def address(self):
+        return "%s:%d" % self.server_address
+
+
+@override_settings(CREDENTIAL_TTL=60)
+class PurgeMetricsTests(TestCase):
+    def setUp(self):
+        identity = Identity()
+        profile = Profile.objects.create(public_key=identity.raw_public_key)
+        expired = timezone.now() - timedelta(hours=1)
+        Credential.objects.bulk_create(
+            Credential(
+                profile=profile,
+                pin=identity.raw_pin,
+                protector=os.urandom(32),
+                created_at=expired,
+                last_used_at=expired,
+            )
+            for _ in range(3)
+        )
+        self.stdout, self.stderr = io.StringIO(), io.StringIO()
+
+    def purge(self):
+        call_command(
+            "purge_expired_credentials", stdout=self.stdout, stderr=self.stderr
+        )
+
+    def test_pushes_counters_to_the_gateway(self):
+        gateway = Pushgateway()
+        thread = threading.Thread(target=gateway.handle_request)
+        thread.start()
+        try:
+            with override_settings(PROMETHEUS_PUSHGATEWAY=gateway.address):
+                self.purge()
+        finally:
+            thread.join(5)
+            gateway.server_close()
+
+        ((path, body),) = gateway.pushes
+        self.assertEqual(path, "/metrics/job/purge_expired_credentials")
+        self.assertIn("passcryptum_credentials_purged_total", body)
+        self.assertIn("passcryptum_credential_purge_rows_count", body)
+        self.assertNotIn("passcryptum_responses_total", body)
+        self.assertFalse(Credential.objects.exists())
+
+    def test_unreachable_gateway_only_warns(self):
+        gateway = Pushgateway()
+        address = gateway.address
+        gateway.server_close()
+        with override_settings(PROMETHEUS_PUSHGATEWAY=address):
+            self.purge()
+        self.assertIn("Could not push metrics", self.stderr.getvalue())
+        self.assertFalse(Credential.objects.exists())
+
+    def test_nothing_is_pushed_in_multiprocess_mode(self):
+        environ = {"PROMETHEUS_MULTIPROC_DIR": "/tmp/metrics"}
+        with mock.patch.dict(os.environ, environ), override_settings(
+            PROMETHEUS_PUSHGATEWAY="127.0.0.1:9"
+        ):
+            self.purge()
+        self.assertEqual(self.stderr.getvalue(), "")
@@ -0,0 +1,52 @@
+import gc
+import os
+import shutil
+
+# SERVER_MODE=asgi serves backend.asgi through uvicorn workers and switches
+# the API to its async views; anything else keeps the sync WSGI setup.
+server_mode = os.getenv("SERVER_MODE", "wsgi")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 1))
+
+# GUNICORN_PRELOAD loads the application in the master before forking, so
+# that workers share its imported modules copy-on-write and start warm.
+preload_app = os.getenv("GUNICORN_PRELOAD", "").lower() in ("1", "true", "yes")
+
+if server_mode == "asgi":
+    wsgi_app = "backend.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "backend.wsgi:application"
+    threads = int(os.getenv("GUNICORN_THREADS", 1))
+
+
+def on_starting(server):
+    """Start every run with an empty multiprocess metrics directory."""
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir)
+
+
+def when_ready(server):
+    """Warm the preloaded application before the first worker is forked.
+
+    Importing the URLconf pulls in the API views, and freezing the garbage
+    collector keeps collections in the workers from writing to (and thereby
+    copying) the pages shared with the master.
+    """
+    if not server.cfg.preload_app:
+        return
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that has exited."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from api.db_router import replica_reads_enabled
+from profiles.models import Profile
+
+PROFILE_CACHE_PREFIX = "profiles:exists:"
+
+
+def _cache_key(public_key):
+    return f"{PROFILE_CACHE_PREFIX}{bytes(public_key).hex()}"
+
+
+def cache_misses():
+    """Whether missing profiles may be cached.
+
+    Not in local memory: the ``add_public_key`` command runs in its own
+    process and cannot invalidate the entries of the API workers. Nor when
+    reading from a replica, since the profile may just not have been
+    replicated yet. Stale "exists" entries are harmless, the views
+    invalidating them when the profile turns out to be gone.
+    """
+    return not (
+        isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
+        or replica_reads_enabled()
+    )
+
+
+def profile_exists(public_key):
+    """Check whether a profile exists, reading through the cache.
+
+    Args:
+        public_key (bytes): Raw public key.
+
+    Returns:
+        bool: True if a profile with this public key exists.
+    """
+    key = _cache_key(public_key)
+    exists = cache.get(key)
+    if exists is None:
+        exists = Profile.objects.filter(public_key=public_key).exists()
+        if exists or cache_misses():
+            cache.set(key, exists, settings.PROFILE_CACHE_TIMEOUT)
+    return exists
+
+
+def invalidate_profile(public_key):
+    """Drop the cached existence flag for a public key."""
+    cache.delete(_cache_key(public_key))
+
+
+def invalidate_profiles(public_keys):
+    """Drop the cached existence flags for many public keys at once.
+
+    Needed after bulk writes, which do not send model signals.
+    """
+    cache.delete_many([_cache_key(public_key) for public_key in public_keys])
+
+
+async def aprofile_exists(public_key):
+    """Async version of ``profile_exists``."""
+    key = _cache_key(public_key)
+    exists = await cache.aget(key)
+    if exists is None:
+        exists = await Profile.objects.filter(public_key=public_key).aexists()
+        if exists or cache_misses():
+            await cache.aset(key, exists, settings.PROFILE_CACHE_TIMEOUT)
+    return exists
+
+
+async def ainvalidate_profile(public_key):
+    """Async version of ``invalidate_profile``."""
+    await cache.adelete(_cache_key(public_key))
@@ -0,0 +1,236 @@
+import base64
+import binascii
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from nacl.bindings import crypto_sign_PUBLICKEYBYTES
+
+FORMATS = ("ndjson", "csv")
+
+
+def decode_base64(value, field_name):
+    """Decode a base64 argument or record field to bytes."""
+    try:
+        return base64.b64decode(value, validate=True)
+    except (TypeError, binascii.Error):
+        raise CommandError(f"Invalid base64 in {field_name}")
+
+
+def decode_public_key(value, field_name="public_key"):
+    """Decode a base64 Ed25519 public key, rejecting any other length."""
+    public_key = decode_base64(value, field_name)
+    if len(public_key) != crypto_sign_PUBLICKEYBYTES:
+        raise CommandError(
+            f"Invalid {field_name}: expected {crypto_sign_PUBLICKEYBYTES} "
+            f"bytes, got {len(public_key)}"
+        )
+    return public_key
+
+
+def encode_base64(value):
+    """Encode stored bytes as base64 text; None stays None."""
+    if value is None:
+        return None
+    return base64.b64encode(value).decode("ascii")
+
+
+def detect_format(path, requested):
+    """Pick the record format from ``--format`` or the file extension."""
+    if requested:
+        return requested
+    if path and path.endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+class ProgressReporter:
+    """Report processed rows and throughput on stderr."""
+
+    def __init__(self, command, verb, every):
+        self.command = command
+        self.verb = verb
+        self.every = every
+        self.rows = 0
+        self.start = time.perf_counter()
+        self._next_report = every
+
+    @property
+    def rate(self):
+        elapsed = time.perf_counter() - self.start
+        return self.rows / elapsed if elapsed else 0.0
+
+    def advance(self, rows):
+        self.rows += rows
+        if self.every and self.rows >= self._next_report:
+            self.command.stderr.write(
+                f"{self.verb} {self.rows} rows ({self.rate:.0f} rows/s)"
+            )
+            self._next_report = self.rows + self.every
+
+
+class BulkImportCommand(BaseCommand):
+    """Base for commands importing NDJSON/CSV records in constant memory.
+
+    Subclasses define ``fields`` and ``import_chunk``; records are streamed
+    from a file or stdin and handed over in chunks of ``--chunk-size``, with
+    the ``binary_fields`` decoded from base64 and the ``public_key_fields``
+    checked to be Ed25519 public keys.
+    """
+
+    fields = ()
+    binary_fields = ()
+    public_key_fields = ()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default="-",
+            help="Input file, or - for stdin",
+        )
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--progress-every",
+            type=int,
+            default=10000,
+            help="Report progress every N rows (0 disables)",
+        )
+
+    def import_chunk(self, records):
+        """Write a chunk of records and return the number of rows created."""
+        raise NotImplementedError
+
+    def decode_record(self, record):
+        for field in self.binary_fields:
+            if record[field] is None:
+                continue
+            if field in self.public_key_fields:
+                record[field] = decode_public_key(record[field], field)
+            else:
+                record[field] = decode_base64(record[field], field)
+        return record
+
+    def read_records(self, file, record_format):
+        if record_format == "csv":
+            csv.field_size_limit(sys.maxsize)
+            reader = csv.DictReader(file)
+            missing = set(self.fields) - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+            for row in reader:
+                yield self.decode_record(
+                    {field: row[field] or None for field in self.fields}
+                )
+            return
+
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise CommandError(f"Invalid JSON on line {number}")
+            yield self.decode_record(
+                {field: record.get(field) for field in self.fields}
+            )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        record_format = detect_format(path, options["format"])
+        progress = ProgressReporter(self, "Read", options["progress_every"])
+        created = 0
+
+        file = sys.stdin if path == "-" else open(path, newline="")
+        try:
+            records = self.read_records(file, record_format)
+            while chunk := list(islice(records, options["chunk_size"])):
+                created += self.import_chunk(chunk)
+                progress.advance(len(chunk))
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {created} of {progress.rows} rows "
+                f"({progress.rate:.0f} rows/s)"
+            )
+        )
+
+
+class BulkExportCommand(BaseCommand):
+    """Base for commands exporting rows as NDJSON/CSV in constant memory.
+
+    Subclasses define ``fields`` and ``get_queryset`` (or ``get_rows``); rows
+    are streamed with ``QuerySet.iterator`` and the ``binary_fields`` are
+    encoded as base64.
+    """
+
+    fields = ()
+    binary_fields = ()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Output file, or - for stdout",
+        )
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--progress-every",
+            type=int,
+            default=10000,
+            help="Report progress every N rows (0 disables)",
+        )
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_rows(self, chunk_size):
+        """Stream the rows to export as tuples of ``fields``."""
+        return self.get_queryset().values_list(*self.fields).iterator(
+            chunk_size=chunk_size
+        )
+
+    def handle(self, *args, **options):
+        path = options["output"]
+        record_format = detect_format(path, options["format"])
+        progress = ProgressReporter(self, "Exported", options["progress_every"])
+        rows = self.get_rows(options["chunk_size"])
+        binary = [field in self.binary_fields for field in self.fields]
+        if any(binary):
+            rows = (
+                [
+                    encode_base64(value) if is_binary else value
+                    for value, is_binary in zip(row, binary)
+                ]
+                for row in rows
+            )
+
+        file = self.stdout if path == "-" else open(path, "w", newline="")
+        try:
+            if record_format == "csv":
+                writer = csv.writer(file)
+                writer.writerow(self.fields)
+                for row in rows:
+                    writer.writerow(row)
+                    progress.advance(1)
+            else:
+                for row in rows:
+                    file.write(json.dumps(dict(zip(self.fields, row))) + "\n")
+                    progress.advance(1)
+        finally:
+            if file is not self.stdout:
+                file.close()
+
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Exported {progress.rows} rows ({progress.rate:.0f} rows/s)"
+            )
+        )
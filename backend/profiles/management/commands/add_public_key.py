@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 
+from profiles.management.bulk import decode_public_key
 from profiles.models import Profile
 
 
@@ -7,12 +8,14 @@ class Command(BaseCommand):
     help = "Add public_key"
 
     def add_arguments(self, parser):
-        parser.add_argument("public_key", type=str, help="Public key")
+        parser.add_argument(
+            "public_key", type=str, help="Base64-encoded public key"
+        )
 
     def handle(self, *args, **kwargs):
         public_key = kwargs["public_key"]
         profile, created = Profile.objects.get_or_create(
-            public_key=public_key
+            public_key=decode_public_key(public_key, "public_key")
         )
 
         if created:
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from profiles.models import ServicesPatch
+from profiles.patches import compact_services
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold pending services patches into the snapshots of their profiles; "
+        "with --interval, keep running as a scheduler"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-patches",
+            type=int,
+            default=settings.SERVICES_COMPACT_MIN_PATCHES,
+            help="Only compact profiles with at least this many patches",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between profiles",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.0,
+            help="Repeat the compaction every N seconds (0 runs once)",
+        )
+
+    def compact(self, min_patches, pause):
+        """Compact every profile with enough pending patches.
+
+        Candidates are found on the patch table, which only holds pending
+        patches; each profile is then compacted in its own transaction.
+
+        Returns:
+            tuple: Number of compacted profiles and of folded patches.
+        """
+        public_keys = list(
+            ServicesPatch.objects.values("profile_id")
+            .annotate(patches=Count("pk"))
+            .filter(patches__gte=max(min_patches, 1))
+            .values_list("profile_id", flat=True)
+        )
+        profiles = patches = 0
+        for public_key in public_keys:
+            folded = compact_services(public_key)
+            profiles += bool(folded)
+            patches += folded
+            if pause:
+                time.sleep(pause)
+        return profiles, patches
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.perf_counter()
+            profiles, patches = self.compact(
+                options["min_patches"], options["pause"]
+            )
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Compacted {patches} patches into {profiles} profiles "
+                    f"in {elapsed:.2f}s"
+                )
+            )
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
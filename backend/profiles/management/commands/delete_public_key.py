@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 
+from profiles.management.bulk import decode_base64
 from profiles.models import Profile
 
 
@@ -7,13 +8,17 @@ class Command(BaseCommand):
     help = "Delete public_key"
 
     def add_arguments(self, parser):
-        parser.add_argument("public_key", type=str, help="Public key")
+        parser.add_argument(
+            "public_key", type=str, help="Base64-encoded public key"
+        )
 
     def handle(self, *args, **kwargs):
         public_key = kwargs["public_key"]
 
         try:
-            profile = Profile.objects.get(public_key=public_key)
+            profile = Profile.objects.get(
+                public_key=decode_base64(public_key, "public_key")
+            )
             profile.delete()
             self.stdout.write(
                 self.style.SUCCESS(
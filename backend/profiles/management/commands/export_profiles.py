@@ -0,0 +1,58 @@
+from profiles.management.bulk import BulkExportCommand
+from profiles.models import Profile
+from profiles.patches import current_services
+
+# Services are loaded at most this many (decoded) bytes at a time; a larger
+# profile is loaded alone.
+SERVICES_BATCH_SIZE = 16 * 1024 * 1024
+
+
+class Command(BulkExportCommand):
+    help = "Export profiles as NDJSON or CSV (public_key, services)"
+
+    fields = ("public_key", "services")
+    binary_fields = ("public_key",)
+
+    def get_queryset(self):
+        return Profile.objects.order_by("public_key")
+
+    def get_rows(self, chunk_size):
+        """Stream profiles with their pending services patches applied.
+
+        Profiles are listed without their services, which are then loaded
+        for up to ``chunk_size`` profiles and ``SERVICES_BATCH_SIZE`` bytes
+        at a time: services may be large enough that a full chunk of them
+        does not fit in memory.
+        """
+        profiles = self.get_queryset().values_list(
+            "public_key", "services_size"
+        ).iterator(chunk_size=chunk_size)
+        batch, batch_size = [], 0
+        for public_key, services_size in profiles:
+            if batch and (
+                len(batch) >= chunk_size
+                or batch_size + services_size > SERVICES_BATCH_SIZE
+            ):
+                yield from self.get_batch_rows(batch)
+                batch, batch_size = [], 0
+            batch.append(bytes(public_key))
+            batch_size += services_size
+        if batch:
+            yield from self.get_batch_rows(batch)
+
+    def get_batch_rows(self, public_keys):
+        """Rows of the given profiles, skipping those deleted meanwhile."""
+        profiles = {
+            bytes(profile.pk): profile
+            for profile in Profile.objects.filter(
+                public_key__in=public_keys
+            ).only(
+                "public_key", "services", "services_version", "snapshot_version"
+            )
+        }
+        for public_key in public_keys:
+            profile = profiles.get(public_key)
+            if profile is not None:
+                profile, services = current_services(profile)
+            if profile is not None:
+                yield profile.public_key, services
@@ -0,0 +1,35 @@
+from profiles.cache import invalidate_profiles
+from profiles.management.bulk import BulkImportCommand
+from profiles.models import Profile, decoded_size, hash_services
+
+
+class Command(BulkImportCommand):
+    help = "Import profiles from NDJSON or CSV (public_key, services)"
+
+    fields = ("public_key", "services")
+    binary_fields = ("public_key",)
+    public_key_fields = ("public_key",)
+
+    def import_chunk(self, records):
+        profiles = [
+            Profile(
+                public_key=record["public_key"],
+                services=record["services"],
+                services_hash=hash_services(record["services"]),
+                services_version=1 if record["services"] else 0,
+                snapshot_version=1 if record["services"] else 0,
+                services_size=decoded_size(record["services"]),
+            )
+            for record in records
+            if record["public_key"]
+        ]
+        public_keys = [profile.public_key for profile in profiles]
+        existing = {
+            bytes(public_key)
+            for public_key in Profile.objects.filter(
+                public_key__in=public_keys
+            ).values_list("public_key", flat=True)
+        }
+        Profile.objects.bulk_create(profiles, ignore_conflicts=True)
+        invalidate_profiles(public_keys)
+        return len(set(public_keys) - existing)
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:36
+
+import hashlib
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def fill_services_hash(apps, schema_editor):
+    Profile = apps.get_model("profiles", "Profile")
+    batch = []
+    profiles = Profile.objects.exclude(services__isnull=True).exclude(services="")
+    for profile in profiles.only("public_key", "services").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        profile.services_hash = hashlib.sha256(
+            profile.services.encode("ascii")
+        ).hexdigest()
+        batch.append(profile)
+        if len(batch) >= BATCH_SIZE:
+            Profile.objects.bulk_update(batch, ["services_hash"])
+            batch = []
+    if batch:
+        Profile.objects.bulk_update(batch, ["services_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0002_alter_profile_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="services_hash",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(fill_services_hash, migrations.RunPython.noop),
+    ]
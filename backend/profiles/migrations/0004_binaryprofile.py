@@ -0,0 +1,87 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:10
+
+import base64
+import binascii
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def b64decode(value):
+    return base64.b64decode(value, validate=True)
+
+
+def copy_profiles(apps, schema_editor):
+    """Copy profiles into the binary table, decoding their public keys.
+
+    Aborts, before copying, if a key is not valid base64: such profiles can
+    never match a request, but are only dropped by hand, not lost here.
+    """
+    Profile = apps.get_model("profiles", "Profile")
+    BinaryProfile = apps.get_model("profiles", "BinaryProfile")
+    invalid = []
+    for public_key in Profile.objects.values_list(
+        "public_key", flat=True
+    ).iterator(chunk_size=BATCH_SIZE):
+        try:
+            b64decode(public_key)
+        except (binascii.Error, ValueError):
+            invalid.append(public_key)
+    if invalid:
+        raise ValueError(
+            f"{len(invalid)} profiles have a public key that is not valid "
+            f"base64; delete them, with their credentials, and migrate "
+            f"again: {', '.join(map(repr, invalid))}"
+        )
+    batch = []
+    for public_key, services, services_hash in Profile.objects.order_by(
+        "pk"
+    ).values_list("public_key", "services", "services_hash").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        batch.append(
+            BinaryProfile(
+                public_key=b64decode(public_key),
+                services=services,
+                services_hash=services_hash,
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            BinaryProfile.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        BinaryProfile.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0003_profile_services_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BinaryProfile",
+            fields=[
+                (
+                    "public_key",
+                    models.BinaryField(
+                        max_length=32, primary_key=True, serialize=False
+                    ),
+                ),
+                ("services", models.TextField(blank=True, null=True)),
+                (
+                    "services_hash",
+                    models.CharField(blank=True, max_length=64, null=True),
+                ),
+            ],
+            options={
+                "verbose_name": "Profile",
+                "verbose_name_plural": "Profiles",
+            },
+        ),
+        # Migration 0005 copies the profiles back when reversed, before the
+        # credentials referencing them are.
+        migrations.RunPython(copy_profiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:10
+
+import base64
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def restore_profiles(apps, schema_editor):
+    """Copy the binary profiles back, encoding their public keys in base64.
+
+    Reverses ``0004_binaryprofile.copy_profiles``. It runs here, once the
+    previous table is recreated, because reversing credentials
+    ``0009_binarycredential`` next needs the profiles its rows reference.
+    """
+    Profile = apps.get_model("profiles", "Profile")
+    BinaryProfile = apps.get_model("profiles", "BinaryProfile")
+    batch = []
+    for public_key, services, services_hash in BinaryProfile.objects.order_by(
+        "pk"
+    ).values_list("public_key", "services", "services_hash").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        batch.append(
+            Profile(
+                public_key=base64.b64encode(public_key).decode("ascii"),
+                services=services,
+                services_hash=services_hash,
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            Profile.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Profile.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credentials", "0009_binarycredential"),
+        ("profiles", "0004_binaryprofile"),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_profiles),
+        migrations.DeleteModel(
+            name="Profile",
+        ),
+        migrations.RenameModel(
+            old_name="BinaryProfile",
+            new_name="Profile",
+        ),
+    ]
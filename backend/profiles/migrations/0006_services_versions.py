@@ -0,0 +1,101 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import Length, Right
+
+BATCH_SIZE = 1000
+
+
+def fill_services_versions(apps, schema_editor):
+    """Start existing services at version 1 and record their decoded size.
+
+    Only the length and padding of each blob are read, not the blob itself.
+    """
+    Profile = apps.get_model("profiles", "Profile")
+    rows = Profile.objects.filter(services__isnull=False).exclude(
+        services=""
+    ).annotate(
+        encoded_length=Length("services"),
+        tail=Right("services", 2),
+    ).values_list("public_key", "encoded_length", "tail").iterator(
+        chunk_size=BATCH_SIZE
+    )
+    batch = []
+    for public_key, encoded_length, tail in rows:
+        batch.append(Profile(
+            public_key=public_key,
+            services_version=1,
+            snapshot_version=1,
+            services_size=encoded_length * 3 // 4 - tail.count("="),
+        ))
+        if len(batch) == BATCH_SIZE:
+            Profile.objects.bulk_update(
+                batch, ["services_version", "snapshot_version", "services_size"]
+            )
+            batch = []
+    if batch:
+        Profile.objects.bulk_update(
+            batch, ["services_version", "snapshot_version", "services_size"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0005_binary_public_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="services_size",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="services_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="snapshot_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="ServicesPatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveBigIntegerField()),
+                ("signature", models.BinaryField(max_length=68)),
+                ("patch", models.BinaryField()),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="patches",
+                        to="profiles.profile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Services patch",
+                "verbose_name_plural": "Services patches",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("profile", "version"),
+                        name="unique_services_patch_profile_version",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_services_versions, migrations.RunPython.noop),
+    ]
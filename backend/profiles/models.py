@@ -1,17 +1,81 @@
+import hashlib
+
 from django.db import models
 
 
+def hash_services(services):
+    """Return the hex SHA-256 of a base64 services blob, or None if empty."""
+    if not services:
+        return None
+    return hashlib.sha256(services.encode("ascii")).hexdigest()
+
+
+def hash_patch(services_hash, patch):
+    """Chain the services hash over a patch.
+
+    The result identifies the services version without reading the blob;
+    compaction keeps it, so ETags survive it.
+    """
+    return hashlib.sha256(
+        (services_hash or "").encode("ascii") + bytes(patch)
+    ).hexdigest()
+
+
+def decoded_size(services):
+    """Number of bytes encoded in a base64 services blob."""
+    if not services:
+        return 0
+    return len(services) * 3 // 4 - services[-2:].count("=")
+
+
 class Profile(models.Model):
-    public_key = models.CharField(
+    public_key = models.BinaryField(
         primary_key=True,
-        max_length=256,
-        unique=True,
+        max_length=32,
     )
     services = models.TextField(
         null=True,
         blank=True,
     )
+    services_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+    )
+    # ``services`` is a snapshot at ``snapshot_version``; the patches above
+    # it up to ``services_version`` are pending until compaction.
+    services_version = models.PositiveBigIntegerField(default=0)
+    snapshot_version = models.PositiveBigIntegerField(default=0)
+    services_size = models.PositiveBigIntegerField(default=0)
 
     class Meta:
         verbose_name = 'Profile'
         verbose_name_plural = 'Profiles'
+
+    @property
+    def pending_patches(self):
+        return self.services_version - self.snapshot_version
+
+
+class ServicesPatch(models.Model):
+    """A signed change to the services of a profile, applied on compaction."""
+
+    profile = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name="patches",
+    )
+    version = models.PositiveBigIntegerField()
+    # Ed25519 signature and timestamp the client signed the patch with.
+    signature = models.BinaryField(max_length=68)
+    patch = models.BinaryField()
+
+    class Meta:
+        verbose_name = "Services patch"
+        verbose_name_plural = "Services patches"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "version"],
+                name="unique_services_patch_profile_version",
+            ),
+        ]
@@ -0,0 +1,164 @@
+import base64
+import struct
+
+from django.db import transaction
+
+from api.metrics import SERVICES_COMPACTIONS
+from profiles.models import Profile, ServicesPatch
+
+# A patch is the base version it applies to, followed by splices of the
+# services bytes at that version: ``offset``, number of bytes deleted there,
+# and the bytes inserted in their place. Splices are ordered by offset and do
+# not overlap. The server never needs to understand the (encrypted) bytes.
+PATCH_HEADER = struct.Struct("<Q")
+SPLICE_HEADER = struct.Struct("<III")
+
+MATERIALIZE_ATTEMPTS = 3
+
+
+class InvalidPatch(ValueError):
+    pass
+
+
+def parse_patch(payload):
+    """Parse a patch payload.
+
+    Returns:
+        tuple: The base version and a list of ``(offset, deleted, inserted)``
+        splices, ``inserted`` being a view into ``payload``.
+
+    Raises:
+        InvalidPatch: If the payload is malformed.
+    """
+    payload = memoryview(payload)
+    if len(payload) < PATCH_HEADER.size:
+        raise InvalidPatch("Patch is too short")
+    (base_version,) = PATCH_HEADER.unpack_from(payload)
+
+    splices = []
+    position = PATCH_HEADER.size
+    end = 0
+    while position < len(payload):
+        if len(payload) - position < SPLICE_HEADER.size:
+            raise InvalidPatch("Truncated splice")
+        offset, deleted, length = SPLICE_HEADER.unpack_from(payload, position)
+        position += SPLICE_HEADER.size
+        if offset < end or length > len(payload) - position:
+            raise InvalidPatch("Invalid splice")
+        splices.append((offset, deleted, payload[position:position + length]))
+        position += length
+        end = offset + deleted
+    if not splices:
+        raise InvalidPatch("Patch is empty")
+    return base_version, splices
+
+
+def patched_size(size, splices):
+    """Size of ``size`` bytes after applying ``splices``.
+
+    Raises:
+        InvalidPatch: If a splice reaches past the end of the data.
+    """
+    offset, deleted, _ = splices[-1]
+    if offset + deleted > size:
+        raise InvalidPatch("Splice out of range")
+    return size + sum(len(inserted) - deleted for _, deleted, inserted in splices)
+
+
+def apply_splices(data, splices):
+    data = memoryview(data)
+    parts = []
+    position = 0
+    for offset, deleted, inserted in splices:
+        parts.append(data[position:offset])
+        parts.append(inserted)
+        position = offset + deleted
+    parts.append(data[position:])
+    return b"".join(parts)
+
+
+def apply_patches(services, patches):
+    """Apply patch payloads in order to base64 ``services``.
+
+    Returns:
+        str | None: Base64 services, or None if they end up empty.
+    """
+    data = base64.b64decode(services or "")
+    for patch in patches:
+        data = apply_splices(data, parse_patch(patch)[1])
+    return base64.b64encode(data).decode("ascii") or None
+
+
+def pending_patches(profile, since=None):
+    """Patches of ``profile`` above ``since`` (default: its snapshot).
+
+    Returns:
+        list | None: ``(signature, patch)`` pairs in version order, or None
+        if some were compacted away meanwhile.
+    """
+    since = profile.snapshot_version if since is None else since
+    patches = list(
+        ServicesPatch.objects.filter(
+            profile_id=profile.pk,
+            version__gt=since,
+            version__lte=profile.services_version,
+        ).order_by("version").values_list("signature", "patch")
+    )
+    if len(patches) != profile.services_version - since:
+        return None
+    return patches
+
+
+def current_services(profile):
+    """Base64 services of ``profile`` with its pending patches applied.
+
+    A compaction running concurrently may delete the pending patches after
+    the profile was read; the profile is then read again.
+
+    Returns:
+        tuple: The (possibly reloaded) profile, or None if it was deleted,
+        and its services.
+    """
+    for _ in range(MATERIALIZE_ATTEMPTS):
+        if not profile.pending_patches:
+            return profile, profile.services
+        patches = pending_patches(profile)
+        if patches is not None:
+            return profile, apply_patches(
+                profile.services, [patch for _, patch in patches]
+            )
+        profile = Profile.objects.filter(public_key=profile.pk).first()
+        if profile is None:
+            return None, None
+    raise RuntimeError("Services changed while being read")
+
+
+def compact_services(public_key):
+    """Fold the pending patches of a profile into its services snapshot.
+
+    Runs under the profile row lock, like patch writes. Readers that loaded
+    the previous snapshot find its patches gone and reload the profile (see
+    ``current_services``).
+
+    Returns:
+        int: Number of patches folded in.
+    """
+    with transaction.atomic():
+        profile = Profile.objects.select_for_update().filter(
+            public_key=public_key
+        ).first()
+        if profile is None or not profile.pending_patches:
+            return 0
+        patches = pending_patches(profile)
+        Profile.objects.filter(public_key=public_key).update(
+            services=apply_patches(
+                profile.services, [patch for _, patch in patches]
+            ),
+            snapshot_version=profile.services_version,
+        )
+        ServicesPatch.objects.filter(
+            profile_id=public_key,
+            version__lte=profile.services_version,
+        ).delete()
+    SERVICES_COMPACTIONS.inc()
+    return len(patches)
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from profiles.cache import invalidate_profile
+from profiles.models import Profile
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_created_profile(sender, instance, created, **kwargs):
+    """Forget a cached "missing" flag once the profile is created."""
+    if created:
+        public_key = instance.public_key
+        transaction.on_commit(lambda: invalidate_profile(public_key))
+
+
+@receiver(post_delete, sender=Profile)
+def invalidate_deleted_profile(sender, instance, **kwargs):
+    """Forget a cached "exists" flag once the profile is deleted."""
+    public_key = instance.public_key
+    transaction.on_commit(lambda: invalidate_profile(public_key))
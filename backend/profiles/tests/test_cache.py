@@ -0,0 +1,129 @@
+import io
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+
+from benchmarks.signing import Identity
+from profiles.cache import profile_exists
+from profiles.models import Profile
+
+FILE_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(tempfile.gettempdir(), "passcryptum-tests"),
+    }
+}
+LOCAL_MEMORY_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "passcryptum-tests",
+    }
+}
+
+
+# Replicas would not see the rows of the test transaction.
+@override_settings(DATABASE_REPLICAS=[])
+class ProfileCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.identity = Identity()
+        self.public_key = self.identity.raw_public_key
+
+    def add_public_key(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "add_public_key", self.identity.public_key, stdout=io.StringIO()
+            )
+
+    def delete_public_key(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "delete_public_key", self.identity.public_key, stdout=io.StringIO()
+            )
+
+
+@override_settings(CACHES=FILE_CACHE)
+class SharedProfileCacheTests(ProfileCacheTestCase):
+    """A cache shared with management commands caches hits and misses."""
+
+    def test_existing_profile_is_cached(self):
+        Profile.objects.create(public_key=self.public_key)
+        with self.assertNumQueries(1):
+            self.assertTrue(profile_exists(self.public_key))
+        with self.assertNumQueries(0):
+            self.assertTrue(profile_exists(self.public_key))
+
+    def test_missing_profile_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertFalse(profile_exists(self.public_key))
+        with self.assertNumQueries(0):
+            self.assertFalse(profile_exists(self.public_key))
+
+    def test_add_public_key_invalidates_miss(self):
+        self.assertFalse(profile_exists(self.public_key))
+        self.add_public_key()
+        self.assertTrue(profile_exists(self.public_key))
+
+    def test_delete_public_key_invalidates_hit(self):
+        self.add_public_key()
+        self.assertTrue(profile_exists(self.public_key))
+        self.delete_public_key()
+        self.assertFalse(profile_exists(self.public_key))
+
+    def test_unknown_key_requests_skip_database(self):
+        client = Client()
+        headers = {
+            "Public-Key": self.identity.public_key,
+            "Hashed-Pin": self.identity.pin,
+        }
+        for queries in (1, 0):
+            with self.assertNumQueries(queries):
+                response = client.post(
+                    "/api/credentials/",
+                    self.identity.signed_body(os.urandom(32)),
+                    content_type="text/plain",
+                    headers=headers,
+                )
+            self.assertEqual(response.status_code, 403)
+
+    def test_stale_hit_is_dropped_by_views(self):
+        self.add_public_key()
+        self.assertTrue(profile_exists(self.public_key))
+        # Deleted behind the cache's back, e.g. by another database client.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Profile._meta.db_table} WHERE public_key = %s",
+                [self.public_key],
+            )
+        response = Client().get(
+            "/api/profiles/", headers=self.identity.signed_headers()
+        )
+        self.assertEqual(response.status_code, 403)
+        with self.assertNumQueries(1):
+            self.assertFalse(profile_exists(self.public_key))
+
+
+@override_settings(CACHES=LOCAL_MEMORY_CACHE)
+class LocalProfileCacheTests(ProfileCacheTestCase):
+    """Local memory, out of reach of management commands, only caches hits."""
+
+    def test_missing_profile_is_not_cached(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertFalse(profile_exists(self.public_key))
+
+    def test_existing_profile_is_cached(self):
+        self.add_public_key()
+        self.assertTrue(profile_exists(self.public_key))
+        with self.assertNumQueries(0):
+            self.assertTrue(profile_exists(self.public_key))
+
+    def test_add_public_key_is_seen_at_once(self):
+        self.assertFalse(profile_exists(self.public_key))
+        # As from another process: no signal reaches this cache.
+        Profile.objects.bulk_create([Profile(public_key=self.public_key)])
+        self.assertTrue(profile_exists(self.public_key))
@@ -0,0 +1,73 @@
+import base64
+import io
+import json
+import os
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from benchmarks.signing import encode
+from profiles.management.commands import export_profiles
+from profiles.models import Profile
+
+
+class AddPublicKeyTests(TestCase):
+    def add_public_key(self, public_key):
+        call_command("add_public_key", encode(public_key), stdout=io.StringIO())
+
+    def test_adds_32_byte_keys(self):
+        public_key = os.urandom(32)
+        self.add_public_key(public_key)
+        self.assertTrue(Profile.objects.filter(public_key=public_key).exists())
+
+    def test_rejects_keys_of_other_lengths(self):
+        for size in (0, 31, 33, 64):
+            with self.subTest(size=size), self.assertRaisesMessage(
+                CommandError, f"expected 32 bytes, got {size}"
+            ):
+                self.add_public_key(os.urandom(size))
+        self.assertFalse(Profile.objects.exists())
+
+
+class ExportProfilesTests(TestCase):
+    def test_loads_services_in_batches_of_bounded_size(self):
+        profiles = []
+        for size in (1, 6, 2, 3):
+            profiles.append(
+                Profile.objects.create(
+                    public_key=os.urandom(32),
+                    services=base64.b64encode(os.urandom(size)).decode(),
+                    services_size=size,
+                )
+            )
+        profiles.sort(key=lambda profile: profile.public_key)
+        sizes = {profile.public_key: profile.services_size for profile in profiles}
+        stdout = io.StringIO()
+        command = export_profiles.Command
+        with mock.patch.object(
+            export_profiles, "SERVICES_BATCH_SIZE", 4
+        ), mock.patch.object(
+            command, "get_batch_rows", autospec=True,
+            side_effect=command.get_batch_rows,
+        ) as get_batch_rows:
+            call_command("export_profiles", stdout=stdout, stderr=io.StringIO())
+
+        self.assertEqual(
+            [json.loads(line) for line in stdout.getvalue().splitlines()],
+            [
+                {
+                    "public_key": encode(profile.public_key),
+                    "services": profile.services,
+                }
+                for profile in profiles
+            ],
+        )
+        for (_, public_keys), _ in get_batch_rows.call_args_list:
+            with self.subTest(public_keys=public_keys):
+                self.assertTrue(
+                    len(public_keys) == 1
+                    or sum(map(sizes.get, public_keys)) <= 4
+                )
+        self.assertGreater(len(get_batch_rows.call_args_list), 1)